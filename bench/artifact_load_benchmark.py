@@ -0,0 +1,120 @@
+"""Cold-start time and per-worker memory of scoring workers loading a stored model.
+
+Run from the repository root:
+    python -m bench.artifact_load_benchmark --workers 4 --trees 100
+
+Each worker loads the model in one of three ways, scores a batch, and reports
+load time, RSS and PSS (proportional set size: shared pages divided among the
+processes mapping them). Lower PSS than RSS means the pages are shared.
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+import warnings
+warnings.filterwarnings('ignore')
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+MODES = ('bundle', 'store', 'store-compiled')
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--train', default="data/NSL_KDD99/KDDTrain+.txt")
+    parser.add_argument('--rows', type=int, default=50000, help="training rows used to grow the forest")
+    parser.add_argument('--trees', type=int, default=100)
+    parser.add_argument('--workers', type=int, default=4)
+    return parser.parse_args()
+
+def _memory_mb():
+    """RSS, PSS and private (unshared) memory of this process in MB, from /proc/self/smaps_rollup"""
+    values = {}
+    with open('/proc/self/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if parts[0].endswith(':') and len(parts) == 3:
+                values[parts[0][:-1]] = int(parts[1]) / 1024
+    return {'rss': values['Rss'], 'pss': values['Pss'],
+            'private': values['Private_Clean'] + values['Private_Dirty']}
+
+def _warm_up():
+    """JIT-compile (or load from cache) the tree kernel on a toy forest, outside the measurement"""
+    from sklearn.tree import DecisionTreeClassifier
+    from src.compiled_trees import CompiledForest
+    X = np.arange(8, dtype=np.float32).reshape(4, 2)
+    CompiledForest.from_model(DecisionTreeClassifier().fit(X, [0, 1, 0, 1])).predict_proba(X)
+
+def _worker(mode, paths, X, ready, done, queue):
+    # Imports happen here so their cost is part of the measured cold start
+    start = time.perf_counter()
+    from src.artifacts import ArtifactStore
+    from src.models import BlackWallModels
+    _warm_up()
+    baseline = _memory_mb()
+    
+    load_start = time.perf_counter()
+    if mode == 'bundle':
+        model, _ = BlackWallModels.load_model(paths['bundle'])
+    else:
+        artifact = ArtifactStore(paths['store']).load('RandomForest', compiled=(mode == 'store-compiled'))
+        model = artifact['model']
+    load_time = time.perf_counter() - load_start
+    model.predict_proba(X)
+    cold_start = time.perf_counter() - start
+    
+    # Measure only once every worker holds its model, so shared pages are split between them
+    ready.wait()
+    memory = _memory_mb()
+    queue.put({'load': load_time, 'cold_start': cold_start, 'rss': memory['rss'], 'pss': memory['pss'],
+               'model_private': memory['private'] - baseline['private']})
+    done.wait()
+
+def main():
+    args = parse_args()
+    from src.data_loader import NSLKDDLoader
+    from src.preprocessor import CyberPreprocessor
+    from src.models import BlackWallModels
+    from src.artifacts import ArtifactStore
+    
+    loader = NSLKDDLoader()
+    df = loader.create_binary_labels(loader.load_file(args.train), verbose=False)
+    df = df.iloc[:args.rows]
+    preprocessor = CyberPreprocessor().fit(df)
+    X = preprocessor.transform(df)
+    model = RandomForestClassifier(n_estimators=args.trees, random_state=42, n_jobs=-1)
+    model.fit(X, df['is_attack'].to_numpy())
+    
+    tmp = tempfile.mkdtemp(prefix='blackwall_artifacts_')
+    paths = {'bundle': os.path.join(tmp, 'bundle.joblib'), 'store': os.path.join(tmp, 'store')}
+    manager = BlackWallModels()
+    manager.models['RandomForest'] = model
+    manager.save_model('RandomForest', paths['bundle'], preprocessor)
+    version = manager.save_to_store(ArtifactStore(paths['store']), preprocessor)['RandomForest']
+    n_nodes = sum(tree.tree_.node_count for tree in model.estimators_)
+    print(f"\n⏱️  RandomForest: {args.trees} trees, {n_nodes:,} nodes | bundle "
+          f"{os.path.getsize(paths['bundle']) / 2**20:.1f} MB | store version {version}")
+    
+    context = multiprocessing.get_context('spawn')
+    batch = np.ascontiguousarray(X[:1000])
+    for mode in MODES:
+        ready, done = context.Barrier(args.workers + 1), context.Barrier(args.workers + 1)
+        queue = context.Queue()
+        workers = [context.Process(target=_worker, args=(mode, paths, batch, ready, done, queue))
+                   for _ in range(args.workers)]
+        for worker in workers:
+            worker.start()
+        ready.wait()
+        stats = [queue.get() for _ in workers]
+        done.wait()
+        for worker in workers:
+            worker.join()
+        
+        mean = {key: np.mean([s[key] for s in stats]) for key in stats[0]}
+        print(f"   {mode:15} | load {mean['load'] * 1e3:7.1f} ms | cold start {mean['cold_start']:5.2f}s | "
+              f"RSS {mean['rss']:6.1f} MB | PSS {mean['pss']:6.1f} MB | "
+              f"model private {mean['model_private']:6.1f} MB | {args.workers} workers")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Check the compiled tree path against sklearn and compare inference latency.
+
+Run from the repository root:
+    python -m bench.compiled_trees_benchmark
+"""
+import argparse
+import time
+import warnings
+warnings.filterwarnings('ignore')
+
+import numpy as np
+
+from src.compiled_trees import CompiledForest, NUMBA_AVAILABLE
+from src.data_loader import NSLKDDLoader
+from src.preprocessor import CyberPreprocessor
+from src.models import BlackWallModels
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--train', default="data/NSL_KDD99/KDDTrain+.txt")
+    parser.add_argument('--test', default="data/NSL_KDD99/KDDTest+.txt")
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 64, 4096])
+    parser.add_argument('--repeats', type=int, default=20)
+    return parser.parse_args()
+
+def latency(predict, X, batch_size, repeats):
+    """Median seconds per predict_proba call over repeats batches"""
+    timings = []
+    for r in range(repeats):
+        start_row = (r * batch_size) % max(1, X.shape[0] - batch_size)
+        batch = X[start_row:start_row + batch_size]
+        start = time.perf_counter()
+        predict(batch)
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings))
+
+def main():
+    args = parse_args()
+    loader = NSLKDDLoader()
+    train_df, test_df = loader.load_data(args.train, args.test)
+    train_df = loader.create_binary_labels(train_df, verbose=False)
+    test_df = loader.create_binary_labels(test_df, verbose=False)
+    X_train, X_test, y_train, y_test = CyberPreprocessor().preprocess_features(train_df, test_df)
+    
+    models = BlackWallModels().initialize_models()
+    print(f"\n⏱️  Compiled tree inference ({'numba' if NUMBA_AVAILABLE else 'numpy'} kernel)")
+    for name in ('DecisionTree', 'RandomForest'):
+        # Single-threaded sklearn accumulates trees in a fixed order, which the kernel reproduces
+        model = models[name]
+        if 'n_jobs' in model.get_params():
+            model.set_params(n_jobs=1)
+        model.fit(X_train, y_train)
+        compiled = CompiledForest.from_model(model)
+        
+        compiled.predict_proba(X_test[:1])  # warm up (JIT compile)
+        exact = np.array_equal(compiled.predict_proba(X_test), model.predict_proba(X_test))
+        print(f"   {name}: {compiled.n_trees} tree(s), {len(compiled.feature):,} nodes | "
+              f"exact predict_proba agreement on {len(y_test):,} rows: {'✅' if exact else '❌'}")
+        
+        for batch_size in args.batch_sizes:
+            sklearn_time = latency(model.predict_proba, X_test, batch_size, args.repeats)
+            compiled_time = latency(compiled.predict_proba, X_test, batch_size, args.repeats)
+            print(f"      batch {batch_size:5} | sklearn {sklearn_time * 1e3:8.3f} ms | "
+                  f"compiled {compiled_time * 1e3:8.3f} ms | {sklearn_time / compiled_time:6.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Fit/predict time and F1 with the fitted feature-selection mask vs every encoded column.
+
+Run from the repository root:
+    python -m bench.feature_selection_benchmark --train train.txt --test test.txt --rows 100000
+"""
+import argparse
+import contextlib
+import copy
+import io
+import time
+import warnings
+warnings.filterwarnings('ignore')
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.tree import DecisionTreeClassifier
+
+from src.data_loader import NSLKDDLoader
+from src.preprocessor import CyberPreprocessor
+from src.feature_selection import FeatureSelector
+from src.serving import BlackWallScorer
+from src.metrics import confusion_counts, metrics_from_confusion
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--train', default="data/NSL_KDD99/KDDTrain+.txt")
+    parser.add_argument('--test', default="data/NSL_KDD99/KDDTest+.txt")
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--importance', choices=['tree', 'mutual_info'], default='tree')
+    parser.add_argument('--min-importance', type=float, default=1e-3)
+    parser.add_argument('--sparse', action='store_true')
+    return parser.parse_args()
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+def f1(y_true, y_pred):
+    return metrics_from_confusion(*confusion_counts(y_true, y_pred))['f1_score']
+
+def main():
+    args = parse_args()
+    loader = NSLKDDLoader(cache_dir=None)
+    with contextlib.redirect_stdout(io.StringIO()):
+        train_df = loader.create_binary_labels(loader.load_file(args.train)).head(args.rows)
+        test_df = loader.create_binary_labels(loader.load_file(args.test))
+    y, y_test = train_df['is_attack'].to_numpy(), test_df['is_attack'].to_numpy()
+    
+    full = CyberPreprocessor(sparse=args.sparse).fit(train_df)
+    X, X_test = full.transform(train_df), full.transform(test_df)
+    selector, select_time = timed(lambda: FeatureSelector(
+        importance=args.importance, min_importance=args.min_importance).fit(X, y, full.feature_columns))
+    selected = copy.deepcopy(full).select_features(selector.support_)
+    
+    print(f"\n⏱️  {len(y):,} training rows | {len(y_test):,} test rows | {args.importance} importance")
+    print(f"   {len(full.feature_columns)} → {len(selected.selected_columns)} columns in {select_time:.2f}s "
+          f"| dropped {selector.summary()} | raw inputs {len(full.input_columns)} → {len(selected.input_columns)}")
+    
+    X_full_test, full_transform = timed(lambda: full.transform(test_df))
+    X_sel_test, sel_transform = timed(lambda: selected.transform(test_df))
+    dense = (lambda M: M.toarray()) if args.sparse else (lambda M: M)
+    same = np.array_equal(dense(X_sel_test), dense(X_full_test)[:, selector.support_])
+    print(f"   {'✅' if same else '❌'} masked transform equals the sliced full matrix | "
+          f"transform {full_transform:.3f}s → {sel_transform:.3f}s ({full_transform / sel_transform:.1f}x)")
+    
+    X_sel = selector.transform(X)
+    for model_name, make_model in (
+        ('LogisticRegression', lambda: LogisticRegression(max_iter=1000, random_state=42)),
+        ('DecisionTree', lambda: DecisionTreeClassifier(random_state=42)),
+        ('RandomForest', lambda: RandomForestClassifier(n_estimators=50, random_state=42)),
+    ):
+        base, base_fit = timed(lambda: make_model().fit(X, y))
+        model, fit_time = timed(lambda: make_model().fit(X_sel, y))
+        base_pred, base_predict = timed(lambda: base.predict(X_test))
+        y_pred, predict_time = timed(lambda: model.predict(X_sel_test))
+        base_f1, sel_f1 = f1(y_test, base_pred), f1(y_test, y_pred)
+        print(f"   {model_name:18} | fit {base_fit:6.2f}s → {fit_time:6.2f}s ({base_fit / fit_time:4.1f}x) | "
+              f"predict {base_predict:5.2f}s → {predict_time:5.2f}s ({base_predict / predict_time:4.1f}x) | "
+              f"F1 {base_f1:.4f} → {sel_f1:.4f} ({sel_f1 - base_f1:+.4f})")
+    
+    # Serving only needs (and only reads) the raw columns the mask keeps
+    records = test_df[selected.input_columns].head(1000).to_dict('records')
+    predictions, _ = BlackWallScorer(model, selected, 'RandomForest').score(records)
+    served = np.array_equal(predictions, y_pred[:1000])
+    print(f"   {'✅' if served else '❌'} BlackWallScorer scores records carrying only the "
+          f"{len(selected.input_columns)} selected raw features")
+
+if __name__ == "__main__":
+    main()
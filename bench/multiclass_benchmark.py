@@ -0,0 +1,74 @@
+"""Multi-class attack-category training: full data vs class weighting vs stratified subsampling.
+
+Run from the repository root (NSL-KDD-like class mix, e.g. from generate_synthetic.py --mix):
+    python -m bench.multiclass_benchmark --train train.txt --test test.txt --max-per-class 20000
+"""
+import argparse
+import time
+import warnings
+warnings.filterwarnings('ignore')
+
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.tree import DecisionTreeClassifier
+
+from src.data_loader import NSLKDDLoader
+from src.preprocessor import CyberPreprocessor
+from src.evaluator import CyberEvaluator
+from src.nsld_kdd_decoder import NSLKDDDecoder
+from src.instrumentation import reset_peak_rss, peak_rss_mb, current_rss_mb
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--train', default="data/NSL_KDD99/KDDTrain+.txt")
+    parser.add_argument('--test', default="data/NSL_KDD99/KDDTest+.txt")
+    parser.add_argument('--max-per-class', type=int, default=20000)
+    parser.add_argument('--trees', type=int, default=50)
+    return parser.parse_args()
+
+def load(loader, path):
+    df = loader.create_category_labels(loader.load_file(path), verbose=False)
+    return df[df['attack_category'].notna()]
+
+def main():
+    args = parse_args()
+    loader = NSLKDDLoader(cache_dir=None)
+    train_df, test_df = load(loader, args.train), load(loader, args.test)
+    preprocessor = CyberPreprocessor().fit(train_df, 'attack_category')
+    X_test = preprocessor.transform(test_df)
+    y_test = preprocessor.target_values(test_df['attack_category'])
+    subsample = loader.stratified_sample(train_df, 'attack_category', args.max_per_class)
+    
+    setups = [
+        ('full', train_df, None),
+        ('full + balanced', train_df, 'balanced'),
+        (f'≤{args.max_per_class:,}/class', subsample, None),
+        (f'≤{args.max_per_class:,}/class + balanced', subsample, 'balanced'),
+    ]
+    counts = train_df['attack_category'].value_counts(sort=False).to_dict()
+    print(f"\n⏱️  Train class counts: {counts} | test rows {len(test_df):,}")
+    
+    names = NSLKDDDecoder.ATTACK_CATEGORIES
+    for model_name, make_model in (
+        ('DecisionTree', lambda weight: DecisionTreeClassifier(random_state=42, class_weight=weight)),
+        ('RandomForest', lambda weight: RandomForestClassifier(n_estimators=args.trees, random_state=42,
+                                                               n_jobs=-1, class_weight=weight)),
+    ):
+        for setup, df, weight in setups:
+            X = preprocessor.transform(df)
+            y = preprocessor.target_values(df['attack_category'])
+            model = make_model(weight)
+            rss_before = current_rss_mb()
+            reset_peak_rss()
+            start = time.perf_counter()
+            model.fit(X, y)
+            fit_time = time.perf_counter() - start
+            peak = peak_rss_mb() - rss_before
+            
+            result = CyberEvaluator(class_names=names).evaluate_model(model_name, model, X_test, y_test)
+            recalls = ' '.join(f"{name} {scores['recall']:.2f}" for name, scores in result['per_class'].items())
+            print(f"   {model_name:12} | {setup:28} | {len(df):>8,} rows | fit {fit_time:6.2f}s | "
+                  f"peak +{peak:6.0f} MB | macro F1 {result['f1_score']:.3f} | recall {recalls}")
+            del X
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""Time every main.py pipeline stage on synthetic NSL-KDD-shaped data.
+
+Run from the repository root:
+    python -m bench.pipeline_benchmark --rows 100000 1000000 --output bench_results.json
+    python -m bench.pipeline_benchmark --compare baseline.json bench_results.json --threshold 0.10
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import warnings
+warnings.filterwarnings('ignore')
+
+import numpy as np
+import sklearn
+
+from src.data_loader import NSLKDDLoader
+from src.preprocessor import CyberPreprocessor
+from src.models import BlackWallModels
+from src.evaluator import CyberEvaluator
+from src.synthetic import SyntheticTrafficGenerator
+from src.instrumentation import reset_peak_rss, peak_rss_mb
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[100000, 1000000],
+                        help="training rows per run (e.g. 100000 1000000 10000000)")
+    parser.add_argument('--test-ratio', type=float, default=0.2, help="test rows as a fraction of train rows")
+    parser.add_argument('--models', nargs='+', default=None, help="subset of BlackWallModels names")
+    parser.add_argument('--boosting', choices=['exact', 'hist', 'both'], default='exact')
+    parser.add_argument('--repeat', type=int, default=1, help="runs per stage; the fastest is reported")
+    parser.add_argument('--data-dir', default='data/synthetic', help="generated files are reused from here")
+    parser.add_argument('--sample', default="data/NSL_KDD99/KDDTrain+.txt",
+                        help="file the synthetic generator is fitted on (built-in prior if missing)")
+    parser.add_argument('--output', default='bench_results.json')
+    parser.add_argument('--compare', nargs=2, metavar=('BASELINE', 'CANDIDATE'),
+                        help="compare two result files instead of running")
+    parser.add_argument('--threshold', type=float, default=0.10, help="relative slowdown flagged as regression")
+    parser.add_argument('--min-seconds', type=float, default=0.05,
+                        help="ignore stages faster than this in both runs (timer noise)")
+    return parser.parse_args()
+
+def synthetic_generator(sample_path):
+    """Generator fitted on sample_path, or on the built-in prior when that file is absent"""
+    if sample_path and os.path.exists(sample_path):
+        print(f"   Fitting synthetic traffic on {sample_path}")
+        return SyntheticTrafficGenerator().fit(NSLKDDLoader(cache_dir=None).load_file(sample_path))
+    return SyntheticTrafficGenerator().fit(SyntheticTrafficGenerator.prior_sample())
+
+def synthetic_files(generator, data_dir, n_rows, test_ratio):
+    """Train/test files for n_rows, generated once and reused across runs"""
+    os.makedirs(data_dir, exist_ok=True)
+    paths = []
+    for split, rows, seed in (('train', n_rows, 0), ('test', int(n_rows * test_ratio), 1)):
+        path = os.path.join(data_dir, f"synthetic_{split}_{rows}.txt")
+        if not os.path.exists(path):
+            print(f"   Generating {rows:,} {split} rows → {path}")
+            generator.write(path + '.tmp', rows, seed)
+            os.replace(path + '.tmp', path)
+        paths.append(path)
+    return paths
+
+def timed(records, n_rows, stage, repeat, fn, stage_rows=None):
+    """Run fn repeat times, keep the fastest wall time, and append one record"""
+    # stage_rows: rows the stage actually processes (test rows for predict/evaluate)
+    stage_rows = stage_rows or n_rows
+    times = []
+    for _ in range(repeat):
+        reset_peak_rss()
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    seconds = min(times)
+    records.append({'rows': n_rows, 'stage': stage, 'seconds': seconds, 'all_seconds': times,
+                    'rows_per_sec': stage_rows / seconds if seconds else None,
+                    'peak_rss_mb': peak_rss_mb()})
+    print(f"   {stage:32} | {seconds:9.3f}s | {stage_rows / seconds if seconds else 0:12,.0f} rows/s")
+    return result
+
+def run(args):
+    records = []
+    generator = synthetic_generator(args.sample)
+    for n_rows in args.rows:
+        train_path, test_path = synthetic_files(generator, args.data_dir, n_rows, args.test_ratio)
+        print(f"\n⏱️  Pipeline stages at {n_rows:,} training rows")
+        
+        loader = NSLKDDLoader(cache_dir=None)
+        n_test = int(n_rows * args.test_ratio)
+        train_df, test_df = timed(records, n_rows, 'load_data', args.repeat,
+                                  lambda: loader.load_data(train_path, test_path), n_rows + n_test)
+        train_df = loader.create_binary_labels(train_df, verbose=False)
+        test_df = loader.create_binary_labels(test_df, verbose=False)
+        
+        preprocessor = CyberPreprocessor()
+        X_train, X_test, y_train, y_test = timed(records, n_rows, 'preprocess_features', args.repeat,
+                                                 lambda: preprocessor.preprocess_features(train_df, test_df),
+                                                 n_rows + n_test)
+        X_train_ord = X_test_ord = None
+        
+        model_manager = BlackWallModels()
+        models = model_manager.initialize_models(gradient_boosting=args.boosting,
+                                                 categorical_mask=preprocessor.ordinal_categorical_mask)
+        if model_manager.ORDINAL_MODELS & set(models):
+            X_train_ord = preprocessor.transform_ordinal(train_df)
+            X_test_ord = preprocessor.transform_ordinal(test_df)
+        
+        for name, model in models.items():
+            if args.models and name not in args.models:
+                continue
+            X_fit = model_manager.prepare_input(name, X_train, X_train_ord)
+            X_eval = model_manager.prepare_input(name, X_test, X_test_ord)
+            if name == 'IsolationForest':
+                timed(records, n_rows, f"fit:{name}", args.repeat, lambda: model.fit(X_fit))
+                y_pred = timed(records, n_rows, f"predict:{name}", args.repeat,
+                               lambda: (model.predict(X_eval) == -1).astype(int), n_test)
+            else:
+                timed(records, n_rows, f"fit:{name}", args.repeat, lambda: model.fit(X_fit, y_train))
+                y_pred = timed(records, n_rows, f"predict:{name}", args.repeat,
+                               lambda: model.predict(X_eval), n_test)
+            timed(records, n_rows, f"evaluate:{name}", args.repeat,
+                  lambda: CyberEvaluator().evaluate_model(name, model, X_eval, y_test, y_pred), n_test)
+    return records
+
+def environment():
+    return {'python': platform.python_version(), 'numpy': np.__version__, 'sklearn': sklearn.__version__,
+            'platform': platform.platform(), 'cpu_count': os.cpu_count(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S')}
+
+def compare(baseline_path, candidate_path, threshold, min_seconds):
+    """Print per-stage ratios; returns the number of regressions"""
+    with open(baseline_path) as f:
+        baseline = {(r['rows'], r['stage']): r for r in json.load(f)['results']}
+    with open(candidate_path) as f:
+        candidate = {(r['rows'], r['stage']): r for r in json.load(f)['results']}
+    
+    regressions = 0
+    print(f"\n⚖️  {candidate_path} vs {baseline_path} (regression: >{threshold:.0%} slower)")
+    for key in sorted(baseline.keys() & candidate.keys()):
+        old, new = baseline[key]['seconds'], candidate[key]['seconds']
+        ratio = new / old if old else float('inf')
+        flag = ratio > 1 + threshold and max(old, new) >= min_seconds
+        regressions += flag
+        print(f"   {'❌' if flag else '✅'} {key[0]:>10,} {key[1]:32} | {old:9.3f}s → {new:9.3f}s | x{ratio:5.2f}")
+    for key in sorted(baseline.keys() ^ candidate.keys()):
+        print(f"   ⚠️  {key[0]:>10,} {key[1]:32} | only in {'baseline' if key in baseline else 'candidate'}")
+    print(f"   {regressions} regression(s)")
+    return regressions
+
+def main():
+    args = parse_args()
+    if args.compare:
+        sys.exit(1 if compare(*args.compare, args.threshold, args.min_seconds) else 0)
+    
+    records = run(args)
+    with open(args.output, 'w') as f:
+        json.dump({'environment': environment(), 'args': vars(args), 'results': records}, f, indent=2)
+    print(f"\n💾 {len(records)} stage timings written to {args.output}")
+
+if __name__ == "__main__":
+    main()
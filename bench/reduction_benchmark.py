@@ -0,0 +1,98 @@
+"""Fit time and F1 with duplicate collapsing and per-class reservoir caps vs the full training set.
+
+Run from the repository root; --duplicate-fraction re-inflates NSL-KDD-style data to KDD'99's redundancy:
+    python -m bench.reduction_benchmark --train train.txt --test test.txt --rows 100000 --duplicate-fraction 0.75
+"""
+import argparse
+import contextlib
+import io
+import time
+import warnings
+warnings.filterwarnings('ignore')
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.tree import DecisionTreeClassifier
+
+from src.data_loader import NSLKDDLoader
+from src.preprocessor import CyberPreprocessor
+from src.reduction import TrainingSetReducer
+from src.metrics import confusion_counts, metrics_from_confusion
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--train', default="data/NSL_KDD99/KDDTrain+.txt")
+    parser.add_argument('--test', default="data/NSL_KDD99/KDDTest+.txt")
+    parser.add_argument('--rows', type=int, default=100000, help="distinct training rows before inflation")
+    parser.add_argument('--duplicate-fraction', type=float, default=0.75,
+                        help="share of the inflated training set that repeats an earlier attack row")
+    parser.add_argument('--max-per-class', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=0)
+    return parser.parse_args()
+
+def inflate(df, duplicate_fraction, rng):
+    """Append repeats of attack rows, Zipf-skewed so a few flood vectors dominate like in KDD'99"""
+    if duplicate_fraction <= 0:
+        return df
+    n_extra = int(len(df) * duplicate_fraction / (1 - duplicate_fraction))
+    attacks = np.flatnonzero(df['is_attack'].to_numpy() == 1)
+    ranks = np.minimum(rng.zipf(1.2, n_extra), len(attacks)) - 1
+    repeats = attacks[rng.permutation(len(attacks))[ranks]]
+    rows = rng.permutation(np.concatenate([np.arange(len(df)), repeats]))
+    return df.iloc[rows].reset_index(drop=True)
+
+def fit_and_score(make_model, X, y, X_test, y_test, sample_weight=None):
+    model = make_model()
+    start = time.perf_counter()
+    model.fit(X, y, sample_weight=sample_weight)
+    fit_time = time.perf_counter() - start
+    y_pred = model.predict(X_test)
+    return fit_time, metrics_from_confusion(*confusion_counts(y_test, y_pred))['f1_score'], y_pred
+
+def main():
+    args = parse_args()
+    rng = np.random.default_rng(args.seed)
+    loader = NSLKDDLoader(cache_dir=None)
+    with contextlib.redirect_stdout(io.StringIO()):
+        train_df = loader.create_binary_labels(loader.load_file(args.train)).head(args.rows)
+        test_df = loader.create_binary_labels(loader.load_file(args.test))
+    train_df = inflate(train_df, args.duplicate_fraction, rng)
+    
+    preprocessor = CyberPreprocessor().fit(train_df)
+    X, y = preprocessor.transform(train_df), preprocessor.target_values(train_df['is_attack'])
+    X_test, y_test = preprocessor.transform(test_df), preprocessor.target_values(test_df['is_attack'])
+    
+    setups = [('full', None, None)]
+    for name, reducer in (('deduplicated', TrainingSetReducer()),
+                          (f'dedup + ≤{args.max_per_class:,}/class',
+                           TrainingSetReducer(max_per_class=args.max_per_class, random_state=args.seed))):
+        start = time.perf_counter()
+        reducer.fit(X, y)
+        reduce_time = time.perf_counter() - start
+        setups.append((name, reducer, reduce_time))
+    
+    print(f"\n⏱️  {len(y):,} training rows ({args.duplicate_fraction:.0%} repeats) | {len(y_test):,} test rows")
+    for name, reducer, reduce_time in setups[1:]:
+        weights_ok = np.isclose(reducer.sample_weight_.sum(), len(y)) and all(
+            np.isclose(reducer.sample_weight_[reducer.take(y) == label].sum(), (y == label).sum())
+            for label in np.unique(y))
+        print(f"   {'✅' if weights_ok else '❌'} {name:24} | {reducer.n_rows_out_:>9,} rows "
+              f"({reducer.n_rows_out_ / len(y):6.1%}) | reduce {reduce_time:5.2f}s | weights keep class totals")
+    
+    for model_name, make_model in (
+        ('LogisticRegression', lambda: LogisticRegression(max_iter=1000, random_state=42)),
+        ('DecisionTree', lambda: DecisionTreeClassifier(random_state=42)),
+        ('RandomForest', lambda: RandomForestClassifier(n_estimators=50, random_state=42)),
+    ):
+        base_time, base_f1, base_pred = fit_and_score(make_model, X, y, X_test, y_test)
+        print(f"   {model_name:18} | {'full':24} | fit {base_time:6.2f}s | F1 {base_f1:.4f}")
+        for name, reducer, reduce_time in setups[1:]:
+            fit_time, f1, y_pred = fit_and_score(make_model, reducer.take(X), reducer.take(y),
+                                                 X_test, y_test, reducer.sample_weight_)
+            print(f"   {model_name:18} | {name:24} | fit {fit_time:6.2f}s | F1 {f1:.4f} ({f1 - base_f1:+.4f}) | "
+                  f"{base_time / (fit_time + reduce_time):5.1f}x incl. reduce | "
+                  f"{(y_pred == base_pred).mean():6.2%} same predictions")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Load generator for the BlackWall scoring service (serve.py).
+
+Run from the repository root against a running service:
+    python -m bench.serving_loadgen --concurrency 64 --duration 10
+"""
+import argparse
+import asyncio
+import json
+import time
+import numpy as np
+
+from src.data_loader import NSLKDDLoader
+from src.schema import FEATURE_COLUMNS
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--data', default="data/NSL_KDD99/KDDTest+.txt",
+                        help="records are replayed from this KDD file")
+    parser.add_argument('--concurrency', type=int, default=64, help="simultaneous connections")
+    parser.add_argument('--records-per-request', type=int, default=1)
+    parser.add_argument('--duration', type=float, default=10.0, help="seconds")
+    return parser.parse_args()
+
+def load_records(path, limit=10000):
+    """Feature rows as JSON-ready lists in schema order"""
+    df = NSLKDDLoader().load_file(path, columns=FEATURE_COLUMNS).head(limit)
+    columns = [df[col].astype(object).tolist() for col in FEATURE_COLUMNS]
+    return [list(row) for row in zip(*columns)]
+
+async def request(reader, writer, host, body):
+    writer.write(f"POST /score HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                 f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+    await writer.drain()
+    status = await reader.readline()
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        key, _, value = line.decode('latin-1').partition(':')
+        if key.lower() == 'content-length':
+            length = int(value)
+    await reader.readexactly(length)
+    return status.split()[1] == b'200'
+
+async def client(args, records, deadline, latencies, failures, offset):
+    reader, writer = await asyncio.open_connection(args.host, args.port)
+    i = offset
+    try:
+        while time.perf_counter() < deadline:
+            batch = [records[(i + k) % len(records)] for k in range(args.records_per_request)]
+            i += args.records_per_request
+            body = json.dumps({'records': batch}).encode()
+            start = time.perf_counter()
+            if await request(reader, writer, args.host, body):
+                latencies.append(time.perf_counter() - start)
+            else:
+                failures.append(1)
+    finally:
+        writer.close()
+
+async def fetch_metrics(host, port):
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(f"GET /metrics HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n".encode())
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    return json.loads(response.split(b'\r\n\r\n', 1)[1])
+
+async def run(args):
+    records = load_records(args.data)
+    latencies, failures = [], []
+    start = time.perf_counter()
+    deadline = start + args.duration
+    await asyncio.gather(*(client(args, records, deadline, latencies, failures, i * 997)
+                           for i in range(args.concurrency)))
+    elapsed = time.perf_counter() - start
+    
+    latencies = np.array(latencies)
+    n_records = len(latencies) * args.records_per_request
+    print(f"⏱️  {args.concurrency} connections × {args.records_per_request} record(s)/request "
+          f"for {elapsed:.1f}s")
+    print(f"   Client: {len(latencies):,} ok, {len(failures):,} failed | "
+          f"{n_records / elapsed:,.0f} records/sec | "
+          f"p50 {np.percentile(latencies, 50) * 1e3:.2f} ms | p99 {np.percentile(latencies, 99) * 1e3:.2f} ms")
+    metrics = await fetch_metrics(args.host, args.port)
+    print(f"   Server: {json.dumps(metrics)}")
+
+def main():
+    asyncio.run(run(parse_args()))
+
+if __name__ == "__main__":
+    main()
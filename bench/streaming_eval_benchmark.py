@@ -0,0 +1,91 @@
+"""Compare in-memory evaluation with chunked evaluation through mergeable accumulators.
+
+Run from the repository root:
+    python -m bench.streaming_eval_benchmark --test big_test.txt --chunksize 50000
+"""
+import argparse
+import time
+import tracemalloc
+import warnings
+warnings.filterwarnings('ignore')
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+from src.data_loader import NSLKDDLoader
+from src.preprocessor import CyberPreprocessor
+from src.evaluator import CyberEvaluator
+from src.metrics import StreamingMetrics
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--train', default="data/NSL_KDD99/KDDTrain+.txt")
+    parser.add_argument('--test', default="data/NSL_KDD99/KDDTest+.txt")
+    parser.add_argument('--chunksize', type=int, default=50000)
+    parser.add_argument('--bins', type=int, default=1000)
+    parser.add_argument('--workers', type=int, default=4, help="simulated workers for the merge check")
+    return parser.parse_args()
+
+def iter_batches(loader, preprocessor, path, chunksize):
+    """(X, y) test batches straight from the file; only one chunk is alive at a time"""
+    for chunk in loader.iter_chunks(path, chunksize=chunksize):
+        chunk = loader.create_binary_labels(chunk, verbose=False)
+        yield preprocessor.transform(chunk), chunk['is_attack'].to_numpy()
+
+def measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] / 2**20
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+def main():
+    args = parse_args()
+    loader = NSLKDDLoader(cache_dir=None)
+    train_df = loader.create_binary_labels(loader.load_file(args.train), verbose=False)
+    preprocessor = CyberPreprocessor().fit(train_df)
+    model = RandomForestClassifier(n_estimators=50, random_state=42, n_jobs=-1)
+    model.fit(preprocessor.transform(train_df), train_df['is_attack'].to_numpy())
+    
+    def in_memory():
+        test_df = loader.create_binary_labels(loader.load_file(args.test), verbose=False)
+        X_test, y_test = preprocessor.transform(test_df), test_df['is_attack'].to_numpy()
+        return CyberEvaluator().evaluate_model('RandomForest', model, X_test, y_test)
+    
+    def streaming():
+        evaluator = CyberEvaluator(compact=True, bins=args.bins)
+        return evaluator.evaluate_stream('RandomForest', model,
+                                         iter_batches(loader, preprocessor, args.test, args.chunksize))
+    
+    exact, exact_time, exact_peak = measure(in_memory)
+    stream, stream_time, stream_peak = measure(streaming)
+    
+    # Round-robin the batches over independent accumulators, then merge them
+    workers = [StreamingMetrics(bins=args.bins) for _ in range(args.workers)]
+    for i, (X_batch, y_batch) in enumerate(iter_batches(loader, preprocessor, args.test, args.chunksize)):
+        workers[i % args.workers].update(y_batch, model.predict(X_batch), model.predict_proba(X_batch)[:, 1])
+    merged = workers[0]
+    for worker in workers[1:]:
+        merged.merge(worker)
+    merged = merged.result()
+    
+    print(f"\n⏱️  Evaluation of {stream['n_samples']:,} test rows ({args.chunksize:,}-row chunks, {args.bins} bins)")
+    print(f"   in-memory | {exact_time:6.2f}s | peak traced {exact_peak:8.1f} MB")
+    print(f"   streaming | {stream_time:6.2f}s | peak traced {stream_peak:8.1f} MB")
+    for key in ('accuracy', 'precision', 'recall', 'f1_score'):
+        print(f"   {key:10} | exact {exact[key]:.6f} | streaming {stream[key]:.6f}")
+    auc_gap = abs(stream['roc_auc'] - exact['roc_auc'])
+    print(f"   roc_auc    | exact {exact['roc_auc']:.6f} | streaming {stream['roc_auc']:.6f} | "
+          f"gap {auc_gap:.2e} (bound {stream['roc_auc_error_bound']:.2e})")
+    
+    counts_match = np.array_equal(exact['confusion_matrix'], stream['confusion_matrix'])
+    merge_match = (np.array_equal(merged['confusion_matrix'], stream['confusion_matrix'])
+                   and np.array_equal(merged['score_histogram'].counts, stream['score_histogram'].counts))
+    print(f"   {'✅' if counts_match else '❌'} Streaming confusion counts match in-memory")
+    print(f"   {'✅' if merge_match else '❌'} {args.workers}-way merged accumulators match a single pass")
+    print(f"   {'✅' if auc_gap <= stream['roc_auc_error_bound'] + 1e-12 else '❌'} AUC gap within bound")
+
+if __name__ == "__main__":
+    main()
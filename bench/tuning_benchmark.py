@@ -0,0 +1,68 @@
+"""Compare exhaustive GridSearchCV with the budgeted successive-halving search.
+
+Run from the repository root:
+    python -m bench.tuning_benchmark --model RandomForest --rows 50000
+"""
+import argparse
+import time
+import warnings
+warnings.filterwarnings('ignore')
+
+from sklearn.metrics import f1_score
+from threadpoolctl import threadpool_limits
+
+from src.data_loader import NSLKDDLoader
+from src.preprocessor import CyberPreprocessor
+from src.models import BlackWallModels
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--train', default="data/NSL_KDD99/KDDTrain+.txt")
+    parser.add_argument('--test', default="data/NSL_KDD99/KDDTest+.txt")
+    parser.add_argument('--model', default='RandomForest', choices=['RandomForest', 'GradientBoosting'])
+    parser.add_argument('--rows', type=int, default=None, help="subsample the training set")
+    parser.add_argument('--budget', type=float, default=None, help="halving time budget in seconds")
+    parser.add_argument('--cache-dir', default=None, help="resume halving fold results from here")
+    parser.add_argument('--tolerance', type=float, default=0.01, help="allowed test F1 drop vs grid")
+    parser.add_argument('--jobs', type=int, default=-1, help="cores given to each search (-1 = all)")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    loader = NSLKDDLoader()
+    train_df, test_df = loader.load_data(args.train, args.test)
+    if args.rows and args.rows < len(train_df):
+        train_df = train_df.sample(args.rows, random_state=42)
+    train_df = loader.create_binary_labels(train_df, verbose=False)
+    test_df = loader.create_binary_labels(test_df, verbose=False)
+    
+    X_train, X_test, y_train, y_test = CyberPreprocessor().preprocess_features(train_df, test_df)
+    
+    model_manager = BlackWallModels()
+    base_model = model_manager.initialize_models()[args.model]
+    
+    results = {}
+    for search in ('grid', 'halving'):
+        # Both searches get the same cores (BLAS/OpenMP pools included) so the speedup is per compute
+        start = time.perf_counter()
+        with threadpool_limits(limits=args.jobs if args.jobs > 0 else None):
+            best = model_manager.hyperparameter_tuning(args.model, base_model, X_train, y_train, search=search,
+                                                       time_budget=args.budget, cache_dir=args.cache_dir,
+                                                       n_jobs=args.jobs)
+        elapsed = time.perf_counter() - start
+        results[search] = {'time': elapsed, 'f1': f1_score(y_test, best.predict(X_test)),
+                           'params': model_manager.best_params[args.model]}
+    
+    grid, halving = results['grid'], results['halving']
+    print(f"\n⏱️  {args.model} search on {len(y_train):,} rows | {args.jobs if args.jobs > 0 else 'all'} core(s) each")
+    for search, result in results.items():
+        print(f"   {search:8} | {result['time']:8.1f}s | test F1 {result['f1']:.4f} | {result['params']}")
+    print(f"   Speedup: {grid['time'] / halving['time']:.1f}x | "
+          f"F1 delta: {halving['f1'] - grid['f1']:+.4f} (tolerance {args.tolerance})")
+    if grid['f1'] - halving['f1'] > args.tolerance:
+        print("   ❌ Halving F1 outside tolerance")
+    else:
+        print("   ✅ Halving F1 within tolerance")
+
+if __name__ == "__main__":
+    main()
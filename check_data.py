@@ -1,24 +1,11 @@
-import pandas as pd
-import numpy as np
-
-# Quick check of your data
-columns = [
-    'duration', 'protocol_type', 'service', 'flag', 'src_bytes', 'dst_bytes', 
-    'land', 'wrong_fragment', 'urgent', 'hot', 'num_failed_logins', 'logged_in',
-    'num_compromised', 'root_shell', 'su_attempted', 'num_root', 'num_file_creations',
-    'num_shells', 'num_access_files', 'num_outbound_cmds', 'is_host_login',
-    'is_guest_login', 'count', 'srv_count', 'serror_rate', 'srv_serror_rate',
-    'rerror_rate', 'srv_rerror_rate', 'same_srv_rate', 'diff_srv_rate',
-    'srv_diff_host_rate', 'dst_host_count', 'dst_host_srv_count', 'dst_host_same_srv_rate',
-    'dst_host_diff_srv_rate', 'dst_host_same_src_port_rate', 'dst_host_srv_diff_host_rate',
-    'dst_host_serror_rate', 'dst_host_srv_serror_rate', 'dst_host_rerror_rate', 
-    'dst_host_srv_rerror_rate', 'label'
-]
+from src.data_loader import NSLKDDLoader
 
 print("🔍 DEBUG: Checking NSL-KDD Data Distribution...")
 
-train_df = pd.read_csv("data/NSL_KDD99/KDDTrain+.txt", names=columns)
-test_df = pd.read_csv("data/NSL_KDD99/KDDTest+.txt", names=columns)
+# Only the label is needed; the cached columnar copy skips parsing the other 41 fields
+loader = NSLKDDLoader()
+train_df = loader.load_file("data/NSL_KDD99/KDDTrain+.txt", columns=['label'])
+test_df = loader.load_file("data/NSL_KDD99/KDDTest+.txt", columns=['label'])
 
 print(f"📊 Training data label distribution:")
 print(train_df['label'].value_counts().head(10))
@@ -2,14 +2,89 @@ import warnings
 warnings.filterwarnings('ignore')
 
 from src.data_loader import NSLKDDLoader
+from src.nsld_kdd_decoder import NSLKDDDecoder
 from src.preprocessor import CyberPreprocessor
 from src.models import BlackWallModels
 from src.evaluator import CyberEvaluator
-import pandas as pd
+from src.trainer import ParallelTrainer
+from src.cascade import CascadePredictor
+from src.reduction import TrainingSetReducer
+from src.feature_selection import FeatureSelector
+from src.artifacts import ArtifactStore
+from src import instrumentation
+from src.instrumentation import report
+import argparse
 import numpy as np
 
+def cascade_stages(value):
+    """argparse type for --cascade: 'FIRST:SECOND' -> (FIRST, SECOND)"""
+    first, sep, second = value.partition(':')
+    if not sep or first not in BlackWallModels.CASCADE_MODELS or second not in BlackWallModels.CASCADE_MODELS:
+        raise argparse.ArgumentTypeError(
+            f"expected FIRST:SECOND with both from {', '.join(BlackWallModels.CASCADE_MODELS)} (got {value!r})")
+    return first, second
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="BlackWall intrusion detection pipeline")
+    parser.add_argument('--sparse', action='store_true',
+                        help="use CSR one-hot features instead of a dense scaled matrix")
+    parser.add_argument('--boosting', choices=['exact', 'hist', 'both'], default='exact',
+                        help="gradient boosting engine: exact GradientBoosting, histogram-binned, or both")
+    parser.add_argument('--jobs', type=int, default=-1,
+                        help="cores for model training (-1 = all); split across models and their threads")
+    parser.add_argument('--multiclass', action='store_true',
+                        help="predict the 5-way attack category (normal/dos/probe/r2l/u2r) instead of is_attack")
+    parser.add_argument('--class-weight', choices=['balanced'], default=None,
+                        help="reweight classes inversely to their frequency during training")
+    parser.add_argument('--max-per-class', type=int, default=None, metavar='N',
+                        help="train on at most N random rows per class (rare classes are kept whole)")
+    parser.add_argument('--select-features', nargs='?', const='tree', default=None,
+                        choices=['tree', 'mutual_info'],
+                        help="drop constant, near-duplicate and low-importance columns (ranked by tree "
+                             "importance or mutual information); serving then skips them too")
+    parser.add_argument('--dedupe', action='store_true',
+                        help="collapse identical encoded training rows into one row weighted by its count")
+    parser.add_argument('--dedupe-per-class', type=int, default=None, metavar='N',
+                        help="collapse duplicates like --dedupe (implied), then keep at most N distinct rows "
+                             "per class, reweighted to the class total")
+    parser.add_argument('--cascade', type=cascade_stages, default=None, metavar='FIRST:SECOND',
+                        help="also evaluate a two-stage cascade, e.g. LogisticRegression:RandomForest")
+    parser.add_argument('--cascade-recall', type=float, default=0.99,
+                        help="recall the cascade's uncertainty band is calibrated to keep")
+    parser.add_argument('--headless', action='store_true',
+                        help="save the dashboard PNG without opening a window")
+    parser.add_argument('--no-plots', action='store_true',
+                        help="skip the dashboard entirely (matplotlib is never imported)")
+    parser.add_argument('--report', default=None, metavar='PREFIX',
+                        help="write PREFIX.json and PREFIX.html metric bundles")
+    parser.add_argument('--artifacts', default=None, metavar='DIR',
+                        help="version every trained model with its preprocessor and metrics under DIR")
+    parser.add_argument('--stage-log', default=None, metavar='PATH',
+                        help="append per-stage timing/memory records to PATH as JSON lines")
+    parser.add_argument('--prometheus', default=None, metavar='PATH',
+                        help="keep a Prometheus text exposition of stage metrics at PATH")
+    parser.add_argument('--profile', action='store_true',
+                        help="cProfile + tracemalloc every phase and every model fit (inside its worker); "
+                             "dump the slowest to blackwall_profile.*")
+    parser.add_argument('--quiet', action='store_true',
+                        help="no console progress output; --stage-log still records it as events")
+    args = parser.parse_args()
+    if args.cascade and args.multiclass:
+        parser.error("--cascade needs binary mode (drop --multiclass)")
+    if args.cascade and 'GradientBoosting' in args.cascade and args.boosting == 'hist':
+        parser.error("--cascade with GradientBoosting needs --boosting exact or both")
+    return args
+
 def main():
-    print("""
+    args = parse_args()
+    
+    # Stage metrics are only collected when one of their outputs is requested
+    instr = instrumentation.configure(enabled=bool(args.stage_log or args.prometheus or args.profile),
+                                      log_path=args.stage_log, prometheus_path=args.prometheus,
+                                      profile=args.profile, quiet=args.quiet)
+    
+    if not args.quiet:
+        print("""
     ╔═══════════════════════════════════════════════╗
     ║                 BLACKWALL                     ║
     ║       Cyberpunk ML Intrusion Detection        ║ 
@@ -19,115 +94,222 @@ def main():
     
     try:
         # 🎯 Step 1: Load Data
-        print("📥 Phase 1: Loading Cyber Threat Data...")
+        report("📥 Phase 1: Loading Cyber Threat Data...")
         loader = NSLKDDLoader()
-        train_df, test_df = loader.load_data(
-            "data/NSL_KDD99/KDDTrain+.txt", 
-            "data/NSL_KDD99/KDDTest+.txt"
-        )
+        with instr.stage('load_data') as record:
+            train_df, test_df = loader.load_data(
+                "data/NSL_KDD99/KDDTrain+.txt", 
+                "data/NSL_KDD99/KDDTest+.txt"
+            )
+            record['rows'] = len(train_df) + len(test_df)
         
         # Analyze labels to understand the data
-        print("\n🔍 Analyzing data distribution...")
+        report("\n🔍 Analyzing data distribution...")
         train_label_analysis = loader.analyze_labels(train_df)
         test_label_analysis = loader.analyze_labels(test_df)
         
-        # 🎯 Step 2: Create binary labels using label 21 as normal (most frequent)
-        print("\n🎯 Phase 2: Creating binary classification labels...")
-        train_df = loader.create_binary_labels(train_df, normal_label=21)
-        test_df = loader.create_binary_labels(test_df, normal_label=21)
+        # 🎯 Step 2: Create binary labels using the 'normal' attack name
+        report("\n🎯 Phase 2: Creating binary classification labels...")
+        with instr.stage('create_binary_labels', rows=len(train_df) + len(test_df)):
+            train_df = loader.create_binary_labels(train_df)
+            test_df = loader.create_binary_labels(test_df)
         
         # Check if we have a reasonable class distribution
         normal_count_train = (train_df['is_attack'] == 0).sum()
         normal_count_test = (test_df['is_attack'] == 0).sum()
         
-        print(f"\n📊 Final Class Distribution:")
-        print(f"   Training - Normal: {normal_count_train:,}, Attack: {len(train_df)-normal_count_train:,}")
-        print(f"   Testing  - Normal: {normal_count_test:,}, Attack: {len(test_df)-normal_count_test:,}")
+        report(f"\n📊 Final Class Distribution:")
+        report(f"   Training - Normal: {normal_count_train:,}, Attack: {len(train_df)-normal_count_train:,}")
+        report(f"   Testing  - Normal: {normal_count_test:,}, Attack: {len(test_df)-normal_count_test:,}")
         
         if normal_count_train == 0:
-            print("❌ No normal samples found! Trying alternative labels...")
-            # Try the second most frequent label as normal
-            second_most_frequent = train_label_analysis.index[1]
-            print(f"   Trying label {second_most_frequent} as normal...")
-            train_df = loader.create_binary_labels(train_df, normal_label=second_most_frequent)
-            test_df = loader.create_binary_labels(test_df, normal_label=second_most_frequent)
+            # The loader validates the column layout, so this is a data problem, not a shifted label
+            raise ValueError("No 'normal' rows in the training file; nothing to learn normal traffic from")
+        
+        target_col = 'is_attack'
+        class_names = None
+        if args.multiclass:
+            # Codes 0..4 follow NSLKDDDecoder.ATTACK_CATEGORIES; attack names outside the mapping are dropped
+            target_col = 'attack_category'
+            class_names = NSLKDDDecoder.ATTACK_CATEGORIES
+            with instr.stage('create_category_labels', rows=len(train_df) + len(test_df)):
+                train_df = loader.create_category_labels(train_df)
+                test_df = loader.create_category_labels(test_df, verbose=False)
+            train_df = train_df[train_df[target_col].notna()]
+            test_df = test_df[test_df[target_col].notna()]
+        
+        if args.max_per_class:
+            before = len(train_df)
+            train_df = loader.stratified_sample(train_df, target_col, args.max_per_class)
+            report(f"   ✂️  Stratified subsample: {before:,} → {len(train_df):,} training rows "
+                   f"(≤ {args.max_per_class:,} per class)")
         
         # 🔧 Step 3: Preprocess Data
-        print("\n🔧 Phase 3: Preprocessing Network Data...")
-        preprocessor = CyberPreprocessor()
-        X_train, X_test, y_train, y_test = preprocessor.preprocess_features(
-            train_df, test_df
-        )
+        report("\n🔧 Phase 3: Preprocessing Network Data...")
+        preprocessor = CyberPreprocessor(sparse=args.sparse)
+        with instr.stage('preprocess_features', rows=len(train_df) + len(test_df)):
+            X_train, X_test, y_train, y_test = preprocessor.preprocess_features(
+                train_df, test_df, target_col
+            )
+        
+        # The mask lives in the preprocessor, so saved bundles never compute the dropped columns
+        if args.select_features:
+            selector = FeatureSelector(importance=args.select_features)
+            with instr.stage('select_features', rows=len(y_train)) as record:
+                selector.fit(X_train, y_train, preprocessor.feature_columns)
+                preprocessor.select_features(selector.support_)
+                X_train, X_test = selector.transform(X_train), selector.transform(X_test)
+                record['columns'] = int(selector.support_.sum())
+            dropped = ', '.join(f"{count} {reason}" for reason, count in selector.summary().items())
+            report(f"   🪓 Feature selection: {len(selector.support_)} → {selector.support_.sum()} columns "
+                   f"(dropped {dropped or 'none'})")
+        
+        # Collapse duplicate rows (SYN floods repeat one vector many times) into weighted ones
+        sample_weight = None
+        reducer = None
+        if args.dedupe or args.dedupe_per_class:
+            reducer = TrainingSetReducer(max_per_class=args.dedupe_per_class)
+            with instr.stage('reduce', rows=len(y_train)) as record:
+                reducer.fit(X_train, y_train)
+                X_train, y_train = reducer.take(X_train), reducer.take(y_train)
+                sample_weight = reducer.sample_weight_
+                record['rows_out'] = reducer.n_rows_out_
+            report(f"   🗜️  Training rows: {reducer.n_rows_in_:,} → {reducer.n_unique_:,} distinct"
+                   + (f" → {reducer.n_rows_out_:,} after ≤ {args.dedupe_per_class:,} per class"
+                      if args.dedupe_per_class else "")
+                   + f" ({reducer.n_rows_out_ / reducer.n_rows_in_:.1%} of the rows, weights sum "
+                   f"{sample_weight.sum():,.0f})")
         
         # Check class distribution in processed data
         unique_train = np.unique(y_train)
         unique_test = np.unique(y_test)
-        print(f"\n🔍 Class check - Train: {unique_train}, Test: {unique_test}")
+        report(f"\n🔍 Class check - Train: {unique_train}, Test: {unique_test}")
         
         # 🤖 Step 4: Initialize Models
-        print("\n🤖 Phase 4: Deploying BlackWall ML Models...")
+        report("\n🤖 Phase 4: Deploying BlackWall ML Models...")
         model_manager = BlackWallModels()
-        models = model_manager.initialize_models()
+        models = model_manager.initialize_models(
+            gradient_boosting=args.boosting,
+            categorical_mask=preprocessor.ordinal_categorical_mask,
+            multiclass=args.multiclass,
+            class_weight=args.class_weight
+        )
+        
+        # Histogram boosting consumes categories natively instead of one-hot columns
+        X_train_ord = X_test_ord = None
+        if model_manager.ORDINAL_MODELS & set(models):
+            X_train_ord = preprocessor.transform_ordinal(train_df)
+            if reducer is not None:
+                X_train_ord = reducer.take(X_train_ord)
+            X_test_ord = preprocessor.transform_ordinal(test_df)
         
         # 📊 Step 5: Train & Evaluate
-        print("\n📊 Phase 5: Training & Evaluation...")
-        evaluator = CyberEvaluator()
+        report("\n📊 Phase 5: Training & Evaluation...")
+        evaluator = CyberEvaluator(class_names=class_names)
+        
+        trainer = ParallelTrainer(n_jobs=args.jobs)
+        # The train stage itself only waits on workers, so each fit is profiled where it runs instead
+        with instr.stage('train', rows=len(y_train), profile=False, models=len(models)):
+            training_results = trainer.train(models, model_manager, X_train, y_train, X_test,
+                                             X_train_ord, X_test_ord, sample_weight, profile=args.profile)
+        for name, result in training_results.items():
+            # Per-model fits ran in worker processes; log what they measured
+            instr.record(f"fit:{name}", result['wall_time'], rows=len(y_train),
+                         peak_rss_mb=result['peak_rss_mb'], n_threads=result['n_threads'],
+                         error=result['error'] is not None)
+            instr.add_profile(f"fit:{name}", result['wall_time'], result['profile'])
         
         successful_models = 0
         
-        for name, model in models.items():
-            print(f"   Training {name}...")
+        for name, result in training_results.items():
+            if result['error'] is not None:
+                report(f"   ❌ {name} failed: {result['error'].splitlines()[0]}", model=name, error=result['error'])
+                continue
             try:
-                if name == 'IsolationForest':
-                    # IsolationForest is unsupervised
-                    model.fit(X_train)
-                    y_pred = model.predict(X_test)
-                    y_pred = (y_pred == -1).astype(int)  # Convert to binary
-                else:
-                    # Supervised models
-                    model.fit(X_train, y_train)
-                    y_pred = model.predict(X_test)
-                
-                results = evaluator.evaluate_model(name, model, X_test, y_test, y_pred)
-                print(f"   ✅ {name} - F1 Score: {results['f1_score']:.3f}")
+                X_eval = model_manager.prepare_input(name, X_test, X_test_ord)
+                results = evaluator.evaluate_model(name, result['model'], X_eval, y_test, result['y_pred'])
+                report(f"   ✅ {name} - F1 Score: {results['f1_score']:.3f} | "
+                       f"{result['wall_time']:.1f}s | peak RSS {result['peak_rss_mb']:.0f} MB "
+                       f"| {result['n_threads']} thread(s)", model=name, f1_score=results['f1_score'])
                 successful_models += 1
-                
+            
             except Exception as e:
-                print(f"   ❌ {name} failed: {str(e)}")
+                report(f"   ❌ {name} failed: {str(e)}", model=name, error=str(e))
                 continue
         
+        if args.cascade:
+            first, second = args.cascade
+            name = f"Cascade-{first}-{second}"
+            try:
+                # Fresh copies of both stages are fit on 80% of the training rows; the band is set on the rest
+                cascade = CascadePredictor(models[first], models[second], target_recall=args.cascade_recall)
+                with instr.stage('cascade', rows=len(y_train)):
+                    cascade.fit(model_manager.prepare_input(second, X_train), y_train, sample_weight)
+                    X_eval = model_manager.prepare_input(second, X_test)
+                    results = evaluator.evaluate_cascade(name, cascade, X_eval, y_test)
+                model_manager.models[name] = cascade
+                successful_models += 1
+                report(f"   ✅ {name} - F1 Score: {results['f1_score']:.3f} | band "
+                       f"[{cascade.low:.3f}, {cascade.high:.3f}] | {results['escalated_fraction']:.1%} escalated | "
+                       f"{results['throughput_gain']:.1f}x faster than {second} alone",
+                       model=name, f1_score=results['f1_score'])
+            
+            except Exception as e:
+                report(f"   ❌ {name} failed: {str(e)}", model=name, error=str(e))
+        
         # 🎨 Step 6: Visualize Results
-        if successful_models > 0:
-            print(f"\n🎨 Phase 6: Generating Cyber Dashboard ({successful_models} models successful)...")
+        if successful_models > 0 and not args.no_plots:
+            report(f"\n🎨 Phase 6: Generating Cyber Dashboard ({successful_models} models successful)...")
             try:
-                evaluator.plot_performance_dashboard()
+                with instr.stage('dashboard'):
+                    evaluator.plot_performance_dashboard(show=not args.headless)
             except Exception as e:
-                print(f"   ⚠️  Visualization skipped: {str(e)}")
+                report(f"   ⚠️  Visualization skipped: {str(e)}")
+        if successful_models > 0 and args.report:
+            json_path, html_path = evaluator.export_report(args.report)
+            report(f"   📄 Metrics written to {json_path} and {html_path}")
         
         # 🏆 Display Final Results
-        print("\n🏆 BLACKWALL DEPLOYMENT COMPLETE")
-        print("═" * 50)
+        report("\n🏆 BLACKWALL DEPLOYMENT COMPLETE")
+        report("═" * 50)
         if evaluator.results:
-            print("🔒 MODEL PERFORMANCE SUMMARY:")
+            report("🔒 MODEL PERFORMANCE SUMMARY" + (" (macro averages):" if args.multiclass else ":"))
             for model_name, results in evaluator.results.items():
-                print(f"   {model_name:20} | F1: {results['f1_score']:.3f} | "
-                      f"Accuracy: {results['accuracy']:.3f} | "
-                      f"Precision: {results['precision']:.3f} | Recall: {results['recall']:.3f}")
+                report(f"   {model_name:20} | F1: {results['f1_score']:.3f} | "
+                       f"Accuracy: {results['accuracy']:.3f} | "
+                       f"Precision: {results['precision']:.3f} | Recall: {results['recall']:.3f}")
+                if args.multiclass:
+                    report("   " + " " * 20 + " | " + " | ".join(
+                        f"{name} F1 {scores['f1_score']:.3f}" for name, scores in results['per_class'].items()))
             
             # Find best model
             best_model = max(evaluator.results.items(), key=lambda x: x[1]['f1_score'])
-            print(f"\n🎯 BEST MODEL: {best_model[0]} (F1: {best_model[1]['f1_score']:.3f})")
+            report(f"\n🎯 BEST MODEL: {best_model[0]} (F1: {best_model[1]['f1_score']:.3f})")
+            
+            # Persist the best model with its fitted preprocessor for scoring new traffic
+            model_manager.save_model(best_model[0], 'blackwall_model.joblib', preprocessor)
+            report("💾 Saved best model and preprocessor to blackwall_model.joblib")
+            
+            if args.artifacts:
+                versions = model_manager.save_to_store(ArtifactStore(args.artifacts), preprocessor,
+                                                       evaluator.results, names=list(evaluator.results))
+                for model_name, version in versions.items():
+                    report(f"   📦 {model_name} → {args.artifacts}/{model_name}/{version}")
         else:
-            print("❌ No models were successfully trained")
-            print("\n💡 Troubleshooting tips:")
-            print("   1. Check if you have both normal and attack samples")
-            print("   2. Try different normal labels (run discovery script)")
-            print("   3. Ensure data files are correct NSL-KDD format")
+            report("❌ No models were successfully trained")
+            report("\n💡 Troubleshooting tips:")
+            report("   1. Check if you have both normal and attack samples")
+            report("   2. Ensure data files are correct NSL-KDD format (42 or 43 fields per row)")
     
     except Exception as e:
-        print(f"\n💥 CRITICAL ERROR: {str(e)}")
+        report(f"\n💥 CRITICAL ERROR: {str(e)}", error=str(e))
         import traceback
         traceback.print_exc()
+    
+    if args.profile:
+        slowest = instr.dump_slowest_profile('blackwall_profile')
+        if slowest:
+            report(f"🔬 Profile of slowest stage '{slowest}' written to blackwall_profile.prof/.txt/_memory.txt")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
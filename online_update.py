@@ -0,0 +1,58 @@
+import argparse
+import os
+import warnings
+warnings.filterwarnings('ignore')
+
+from src.data_loader import NSLKDDLoader
+from src.models import BlackWallModels
+from src.online import OnlineTrainer
+from src import instrumentation
+from src.instrumentation import report
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="BlackWall incremental updates on new labelled traffic")
+    parser.add_argument('files', nargs='+', help="labelled KDD-format files, consumed in order")
+    parser.add_argument('--chunksize', type=int, default=50000)
+    parser.add_argument('--holdout', type=float, default=0.2,
+                        help="fraction of each chunk held out for the before/after F1 report")
+    parser.add_argument('--checkpoint', default='blackwall_online.joblib')
+    parser.add_argument('--checkpoint-every', type=int, default=5, help="chunks between checkpoints")
+    parser.add_argument('--report', default=None, help="append one JSON line per model update here")
+    parser.add_argument('--trees-per-chunk', type=int, default=10)
+    parser.add_argument('--max-trees', type=int, default=200)
+    parser.add_argument('--window', type=int, default=5, help="chunks kept for windowed retrains")
+    parser.add_argument('--stage-log', default=None, metavar='PATH',
+                        help="append progress events and per-stage timing records to PATH as JSON lines")
+    parser.add_argument('--quiet', action='store_true',
+                        help="no console progress output; --stage-log still records it as events")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    instrumentation.configure(enabled=bool(args.stage_log), log_path=args.stage_log, quiet=args.quiet)
+    model_manager = BlackWallModels()
+    options = dict(holdout_fraction=args.holdout, checkpoint_every=args.checkpoint_every,
+                   report_path=args.report)
+    
+    if os.path.exists(args.checkpoint):
+        trainer = OnlineTrainer.resume(args.checkpoint, model_manager, **options)
+        report(f"📦 Resumed {args.checkpoint} at chunk {trainer.chunks_seen} ({trainer.rows_seen:,} rows)")
+    else:
+        model_manager.initialize_online_models(trees_per_chunk=args.trees_per_chunk,
+                                               max_trees=args.max_trees, window_chunks=args.window)
+        trainer = OnlineTrainer(model_manager, checkpoint_path=args.checkpoint, **options)
+    
+    history = trainer.consume(NSLKDDLoader(cache_dir=None), args.files, chunksize=args.chunksize)
+    
+    report("\n📊 Drift report (holdout F1 before → after each update)")
+    for name in model_manager.models:
+        records = [r for r in history if r['model'] == name and r['f1_before'] is not None]
+        if not records:
+            continue
+        drift = sum(r['f1_after'] - r['f1_before'] for r in records) / len(records)
+        update_time = sum(r['update_time'] for r in records) / len(records)
+        report(f"   {name:15} | mean F1 gain per update {drift:+.4f} | mean update {update_time:.2f}s",
+               model=name, mean_f1_gain=drift, mean_update_time=update_time)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+import argparse
+import asyncio
+
+from src.compiled_trees import CompiledForest
+from src.serving import BlackWallScorer, MicroBatcher, ScoringServer
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="BlackWall real-time scoring service")
+    parser.add_argument('--model', default='blackwall_model.joblib',
+                        help="bundle written by BlackWallModels.save_model (see main.py)")
+    parser.add_argument('--store', default=None,
+                        help="serve from an ArtifactStore directory instead of a joblib bundle")
+    parser.add_argument('--model-name', default=None, help="model to serve from --store")
+    parser.add_argument('--version', default=None, help="stored version (default: latest)")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--max-batch', type=int, default=1024,
+                        help="records per predict call")
+    parser.add_argument('--max-wait-ms', type=float, default=5.0,
+                        help="longest a request waits for its micro-batch to fill")
+    parser.add_argument('--compiled', action='store_true',
+                        help="serve DecisionTree/RandomForest through the compiled node-array kernel")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    if args.store:
+        if not args.model_name:
+            raise SystemExit("--store needs --model-name")
+        scorer = BlackWallScorer.from_store(args.store, args.model_name, args.version, compiled=args.compiled)
+        source = f"{args.store} ({args.version or 'latest'})"
+    else:
+        scorer = BlackWallScorer.from_bundle(args.model, compiled=args.compiled)
+        source = args.model
+    print(f"📦 Loaded {scorer.model_name} from {source}"
+          f"{' (compiled trees)' if isinstance(scorer.model, CompiledForest) else ''}")
+    
+    batcher = MicroBatcher(scorer, max_batch_records=args.max_batch, max_wait_ms=args.max_wait_ms)
+    server = ScoringServer(batcher, host=args.host, port=args.port)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        print("\n🛑 Scoring service stopped")
+
+if __name__ == "__main__":
+    main()
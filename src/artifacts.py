@@ -0,0 +1,132 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+import joblib
+import sklearn
+
+from src.compiled_trees import CompiledForest
+
+class ArtifactStore:
+    """Content-hashed, versioned models + preprocessor + evaluation results on disk
+    
+    Layout: <root>/<model_name>/<version>/{model.joblib, preprocessor.joblib,
+    results.json, manifest.json, compiled/*.npy} and <root>/<model_name>/LATEST.
+    """
+    
+    MANIFEST_FILE = 'manifest.json'
+    LATEST_FILE = 'LATEST'
+    
+    def __init__(self, root='artifacts'):
+        self.root = root
+    
+    def save(self, model_name, model, preprocessor, results=None, best_params=None):
+        """Store one fitted model; returns its version, a hash of the serialized model and preprocessor"""
+        model_dir = os.path.join(self.root, model_name)
+        tmp_dir = os.path.join(model_dir, f".tmp{os.getpid()}")
+        os.makedirs(tmp_dir, exist_ok=True)
+        try:
+            # Uncompressed dumps keep numpy buffers raw so joblib can memory-map them on load
+            joblib.dump(model, os.path.join(tmp_dir, 'model.joblib'))
+            joblib.dump(preprocessor, os.path.join(tmp_dir, 'preprocessor.joblib'))
+            if CompiledForest.supports(model):
+                # sklearn copies tree nodes into private memory on unpickle; .npy node arrays
+                # opened with mmap_mode='r' are shared page-cache pages across worker processes
+                CompiledForest.from_model(model).save(os.path.join(tmp_dir, 'compiled'))
+            
+            digest = hashlib.sha1()
+            for name in ('model.joblib', 'preprocessor.joblib'):
+                with open(os.path.join(tmp_dir, name), 'rb') as f:
+                    for block in iter(lambda: f.read(1 << 20), b''):
+                        digest.update(block)
+            version = digest.hexdigest()[:16]
+            
+            if results is not None:
+                # Per-row arrays and histograms stay out; the metrics bundle is JSON-ready
+                from src.visualize import metrics_bundle, json_safe
+                with open(os.path.join(tmp_dir, 'results.json'), 'w') as f:
+                    json.dump(json_safe(metrics_bundle({model_name: results})[model_name]), f,
+                              indent=2, allow_nan=False)
+            
+            manifest = {
+                'model_name': model_name,
+                'version': version,
+                'estimator': type(model).__name__,
+                'best_params': best_params,
+                'compiled': os.path.isdir(os.path.join(tmp_dir, 'compiled')),
+                'sklearn_version': sklearn.__version__,
+                'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            }
+            with open(os.path.join(tmp_dir, self.MANIFEST_FILE), 'w') as f:
+                json.dump(manifest, f, indent=2, default=str)
+            
+            version_dir = os.path.join(model_dir, version)
+            if os.path.exists(version_dir):
+                shutil.rmtree(tmp_dir)
+            else:
+                os.replace(tmp_dir, version_dir)
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        
+        self._write_latest(model_name, version)
+        return version
+    
+    def load(self, model_name, version=None, mmap_mode='r', compiled=False):
+        """Load a stored version (latest by default) as a dict like BlackWallModels.load_bundle"""
+        # compiled=True returns the CompiledForest over memory-mapped node arrays when available
+        version = version or self.latest(model_name)
+        if version is None:
+            raise FileNotFoundError(f"No stored versions of {model_name} under {self.root}")
+        version_dir = os.path.join(self.root, model_name, version)
+        with open(os.path.join(version_dir, self.MANIFEST_FILE)) as f:
+            manifest = json.load(f)
+        
+        compiled_dir = os.path.join(version_dir, 'compiled')
+        if compiled and os.path.isdir(compiled_dir):
+            model = CompiledForest.load(compiled_dir, mmap_mode=mmap_mode)
+        else:
+            model = joblib.load(os.path.join(version_dir, 'model.joblib'), mmap_mode=mmap_mode)
+        
+        results = None
+        results_path = os.path.join(version_dir, 'results.json')
+        if os.path.exists(results_path):
+            with open(results_path) as f:
+                results = json.load(f)
+        
+        return {
+            'model_name': model_name,
+            'model': model,
+            'preprocessor': joblib.load(os.path.join(version_dir, 'preprocessor.joblib')),
+            'best_params': manifest['best_params'],
+            'results': results,
+            'manifest': manifest,
+        }
+    
+    def latest(self, model_name):
+        path = os.path.join(self.root, model_name, self.LATEST_FILE)
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return f.read().strip()
+    
+    def versions(self, model_name):
+        """Stored versions of model_name, oldest first"""
+        model_dir = os.path.join(self.root, model_name)
+        if not os.path.isdir(model_dir):
+            return []
+        entries = [entry for entry in os.listdir(model_dir)
+                   if os.path.exists(os.path.join(model_dir, entry, self.MANIFEST_FILE))]
+        return sorted(entries, key=lambda entry: os.path.getmtime(os.path.join(model_dir, entry, self.MANIFEST_FILE)))
+    
+    def model_names(self):
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name for name in os.listdir(self.root) if self.latest(name))
+    
+    def _write_latest(self, model_name, version):
+        path = os.path.join(self.root, model_name, self.LATEST_FILE)
+        with open(f"{path}.tmp", 'w') as f:
+            f.write(version)
+        os.replace(f"{path}.tmp", path)
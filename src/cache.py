@@ -0,0 +1,161 @@
+import hashlib
+import json
+import os
+import shutil
+import numpy as np
+import pandas as pd
+
+class ColumnarCache:
+    """On-disk columnar copy of parsed KDD files, memory-mapped on load"""
+
+    INDEX_FILE = 'index.json'
+    META_FILE = 'meta.json'
+    # Bump when the parsed layout changes; older entries are then rebuilt (2: difficulty column)
+    SCHEMA_VERSION = 2
+
+    def __init__(self, cache_dir='data/.cache'):
+        self.cache_dir = cache_dir
+
+    def file_key(self, path):
+        """Cheap identity of a source file: absolute path, size and mtime"""
+        stat = os.stat(path)
+        return f"{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}"
+
+    def content_hash(self, path, block_size=1 << 20):
+        """SHA-1 of the source file contents"""
+        digest = hashlib.sha1()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(block_size), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def lookup(self, path):
+        """Return (entry directory or None if not cached, content digest of path)"""
+        # The digest is handed to store() on a miss so the file is hashed only once
+        index = self._read_index()
+        digest = index.get(self.file_key(path))
+        if digest is None:
+            # Path, size or mtime changed: fall back to the content hash
+            digest = self.content_hash(path)
+            if not self._is_current(digest):
+                return None, digest
+            index[self.file_key(path)] = digest
+            self._write_index(index)
+        entry = os.path.join(self.cache_dir, digest)
+        return (entry if self._is_current(digest) else None), digest
+
+    def store(self, path, chunks, digest=None):
+        """Write typed DataFrame chunks for path as one raw binary file per column"""
+        if digest is None:
+            digest = self.content_hash(path)
+        entry = os.path.join(self.cache_dir, digest)
+        tmp_entry = f"{entry}.tmp{os.getpid()}"
+        os.makedirs(tmp_entry, exist_ok=True)
+
+        files, meta = {}, {'source': os.path.abspath(path), 'rows': 0, 'columns': {},
+                           'schema_version': self.SCHEMA_VERSION}
+        try:
+            for chunk in chunks:
+                for col in chunk.columns:
+                    series = chunk[col]
+                    if isinstance(series.dtype, pd.CategoricalDtype):
+                        values = series.cat.codes.to_numpy()
+                        col_meta = {'dtype': values.dtype.str,
+                                    'categories': series.cat.categories.tolist()}
+                    else:
+                        values = series.to_numpy()
+                        col_meta = {'dtype': values.dtype.str}
+                    if col not in files:
+                        files[col] = open(os.path.join(tmp_entry, f"{col}.bin"), 'wb')
+                        meta['columns'][col] = col_meta
+                    files[col].write(np.ascontiguousarray(values).tobytes())
+                meta['rows'] += len(chunk)
+            for f in files.values():
+                f.close()
+            with open(os.path.join(tmp_entry, self.META_FILE), 'w') as f:
+                json.dump(meta, f)
+        except BaseException:
+            # A parse error (or interrupt) mid-file must not leave a partial build in the cache dir
+            for f in files.values():
+                f.close()
+            shutil.rmtree(tmp_entry, ignore_errors=True)
+            raise
+
+        # Publish atomically so a crashed build never looks like a valid entry
+        if os.path.exists(entry):
+            shutil.rmtree(entry)
+        os.replace(tmp_entry, entry)
+
+        index = self._read_index()
+        index[self.file_key(path)] = digest
+        self._write_index(index)
+        return entry
+
+    def load(self, entry, columns=None):
+        """Build a DataFrame over memory-mapped columns of a cache entry"""
+        with open(os.path.join(entry, self.META_FILE)) as f:
+            meta = json.load(f)
+
+        if columns is None:
+            columns = list(meta['columns'])
+
+        data = {}
+        for col in columns:
+            col_meta = meta['columns'][col]
+            dtype = np.dtype(col_meta['dtype'])
+            if meta['rows'] == 0:
+                values = np.empty(0, dtype=dtype)
+            else:
+                values = np.memmap(os.path.join(entry, f"{col}.bin"), mode='r',
+                                   dtype=dtype, shape=(meta['rows'],))
+            if 'categories' in col_meta:
+                data[col] = pd.Categorical.from_codes(
+                    values, dtype=pd.CategoricalDtype(col_meta['categories']))
+            else:
+                data[col] = values
+        return pd.DataFrame(data, copy=False)
+
+    def clear(self):
+        """Remove every cached entry"""
+        if os.path.exists(self.cache_dir):
+            shutil.rmtree(self.cache_dir)
+
+    def invalidate(self, path):
+        """Remove the entry for path (any size/mtime it was indexed under); other files stay cached"""
+        index = self._read_index()
+        prefix = f"{os.path.abspath(path)}|"
+        keys = [key for key in index if key.startswith(prefix)]
+        digests = {index.pop(key) for key in keys}
+        if os.path.exists(path):
+            digests.add(self.content_hash(path))
+        for digest in digests:
+            entry = os.path.join(self.cache_dir, digest)
+            if os.path.exists(entry):
+                shutil.rmtree(entry)
+        if keys:
+            self._write_index(index)
+
+    def _meta_path(self, digest):
+        return os.path.join(self.cache_dir, digest, self.META_FILE)
+
+    def _is_current(self, digest):
+        """Entry exists and was written with the current SCHEMA_VERSION"""
+        if not os.path.exists(self._meta_path(digest)):
+            return False
+        with open(self._meta_path(digest)) as f:
+            return json.load(f).get('schema_version') == self.SCHEMA_VERSION
+
+    def _read_index(self):
+        index_path = os.path.join(self.cache_dir, self.INDEX_FILE)
+        if not os.path.exists(index_path):
+            return {}
+        with open(index_path) as f:
+            return json.load(f)
+
+    def _write_index(self, index):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        index_path = os.path.join(self.cache_dir, self.INDEX_FILE)
+        tmp_path = f"{index_path}.tmp{os.getpid()}"
+        with open(tmp_path, 'w') as f:
+            json.dump(index, f)
+        os.replace(tmp_path, index_path)
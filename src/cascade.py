@@ -0,0 +1,107 @@
+import numpy as np
+from sklearn.base import clone
+from sklearn.model_selection import train_test_split
+
+from src.metrics import confusion_counts, metrics_from_confusion
+
+class CascadePredictor:
+    """Cheap first-stage model on every row; the ensemble only inside an uncertainty band"""
+    
+    def __init__(self, first_stage, second_stage, target_recall=0.99, target_precision=None,
+                 validation_fraction=0.2, random_state=42):
+        # Rows with first-stage attack probability p < low are cleared as normal, p > high are flagged
+        # as attacks and low <= p <= high go to the second stage; calibrate() sets low/high so the
+        # cascade keeps target_recall and (default) the second stage's own precision on validation
+        self.first_stage = first_stage
+        self.second_stage = second_stage
+        self.target_recall = target_recall
+        self.target_precision = target_precision
+        self.validation_fraction = validation_fraction
+        self.random_state = random_state
+        self.low = 0.0
+        self.high = 1.0
+        self.calibration_ = None
+        self.last_escalated_ = None
+    
+    def fit(self, X, y, sample_weight=None):
+        """Fit clones of both stages on a training split and calibrate the band on the held-out rest"""
+        # sample_weight (e.g. duplicate counts from TrainingSetReducer) weights fitting and calibration
+        y = np.asarray(y)
+        weights = np.ones(len(y)) if sample_weight is None else np.asarray(sample_weight)
+        X_fit, X_val, y_fit, y_val, w_fit, w_val = train_test_split(
+            X, y, weights, test_size=self.validation_fraction, stratify=y, random_state=self.random_state)
+        fit_params = {} if sample_weight is None else {'sample_weight': w_fit}
+        self.first_stage = clone(self.first_stage).fit(X_fit, y_fit, **fit_params)
+        self.second_stage = clone(self.second_stage).fit(X_fit, y_fit, **fit_params)
+        return self.calibrate(X_val, y_val, None if sample_weight is None else w_val)
+    
+    def calibrate(self, X_val, y_val, sample_weight=None):
+        """Choose the narrowest band meeting the recall and precision targets on validation rows"""
+        y = np.asarray(y_val) == 1
+        w = np.ones(len(y)) if sample_weight is None else np.asarray(sample_weight, dtype=np.float64)
+        p = self.first_stage.predict_proba(X_val)[:, 1]
+        ensemble = self.second_stage.predict(X_val) == 1
+        n_pos = w[y].sum() or 1.0
+        target_precision = self.target_precision
+        if target_precision is None:
+            tp, fp = w[ensemble & y].sum(), w[ensemble & ~y].sum()
+            target_precision = tp / (tp + fp) if tp + fp else 0.0
+        
+        # Lower cut: clearing the j lowest-scored rows loses the attacks the ensemble would catch there
+        order = np.argsort(p, kind='mergesort')
+        p_asc = p[order]
+        caught = np.r_[0, np.cumsum(w[order] * (ensemble[order] & y[order]))]
+        recall = (caught[-1] - caught) / n_pos
+        # Cuts only between distinct scores, so a threshold never splits tied rows
+        valid = np.r_[True, p_asc[1:] != p_asc[:-1], False]
+        ok = np.flatnonzero(valid & (recall >= self.target_recall))
+        j = ok[-1] if len(ok) else 0
+        self.low = float(p_asc[j]) if j < len(p_asc) else np.inf
+        
+        # Upper cut: flagging the k highest remaining rows swaps ensemble labels for "attack"
+        rest = order[j:][::-1]
+        p_desc, y_desc, e_desc, w_desc = p[rest], y[rest], ensemble[rest], w[rest]
+        flagged_tp = np.r_[0, np.cumsum(w_desc * y_desc)]
+        flagged_fp = np.r_[0, np.cumsum(w_desc * ~y_desc)]
+        band_tp = np.r_[0, np.cumsum(w_desc * (e_desc & y_desc))]
+        band_fp = np.r_[0, np.cumsum(w_desc * (e_desc & ~y_desc))]
+        band_tp, band_fp = band_tp[-1] - band_tp, band_fp[-1] - band_fp
+        tp, fp = flagged_tp + band_tp, flagged_fp + band_fp
+        precision = np.divide(tp, tp + fp, out=np.ones(len(tp)), where=(tp + fp) > 0)
+        valid = np.r_[True, p_desc[1:] != p_desc[:-1], True]
+        ok = np.flatnonzero(valid & (precision >= target_precision))
+        k = ok[-1] if len(ok) else 0
+        self.high = float(p_desc[k]) if k < len(p_desc) else float(np.nextafter(self.low, -np.inf))
+        
+        y_pred, _ = self.predict_scored(X_val)
+        cm, labels = confusion_counts(y.astype(np.int8), y_pred, labels=[0, 1], sample_weight=sample_weight)
+        metrics = metrics_from_confusion(cm, labels)
+        self.calibration_ = {
+            'low': self.low, 'high': self.high,
+            'target_recall': self.target_recall, 'target_precision': target_precision,
+            'recall': metrics['recall'], 'precision': metrics['precision'], 'f1_score': metrics['f1_score'],
+            'escalated_fraction': self.last_escalated_, 'n_validation': len(y),
+        }
+        return self
+    
+    def predict_scored(self, X):
+        """Labels and attack scores from one pass; the second stage sees only the band's rows"""
+        p = self.first_stage.predict_proba(X)[:, 1]
+        band = (p >= self.low) & (p <= self.high)
+        y_pred = ((p > self.high) & (p >= self.low)).astype(np.int64)
+        y_score = p.copy()
+        rows = np.flatnonzero(band)
+        if len(rows):
+            proba = self.second_stage.predict_proba(X[rows])
+            y_pred[rows] = self.second_stage.classes_[proba.argmax(axis=1)]
+            y_score[rows] = proba[:, 1]
+        self.last_escalated_ = len(rows) / max(len(p), 1)
+        return y_pred, y_score
+    
+    def predict(self, X):
+        return self.predict_scored(X)[0]
+    
+    def predict_proba(self, X):
+        # Scores outside the band are first-stage probabilities; the band's thresholds, not 0.5, decide labels
+        score = self.predict_scored(X)[1]
+        return np.column_stack([1 - score, score])
@@ -0,0 +1,150 @@
+import json
+import os
+import numpy as np
+from scipy import sparse as sp
+from sklearn.base import is_classifier
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+def _walk_forest(X, roots, feature, threshold, left, right, value, out, block_size):
+    """Route rows through every tree and sum leaf probabilities in tree order"""
+    # Tree-major within a row block keeps one tree's nodes in cache; blocks run in parallel
+    n_rows = X.shape[0]
+    n_trees = roots.shape[0]
+    n_blocks = (n_rows + block_size - 1) // block_size
+    for b in prange(n_blocks):
+        start = b * block_size
+        stop = min(n_rows, start + block_size)
+        for t in range(n_trees):
+            for i in range(start, stop):
+                node = roots[t]
+                child = left[node]
+                while child != node:
+                    if X[i, feature[node]] > threshold[node]:
+                        child = right[node]
+                    node = child
+                    child = left[node]
+                for c in range(out.shape[1]):
+                    out[i, c] += value[node, c]
+
+if NUMBA_AVAILABLE:
+    _walk_forest = njit(parallel=True, cache=True)(_walk_forest)
+
+class CompiledForest:
+    """Fitted DecisionTree/RandomForest flattened into contiguous node arrays"""
+    
+    ARRAYS = ('roots', 'feature', 'threshold', 'left', 'right', 'value')
+    
+    # Rows walked through one tree before moving to the next (numba kernel)
+    BLOCK_SIZE = 4096
+    
+    def __init__(self, roots, feature, threshold, left, right, value, classes, max_depth):
+        self.roots = roots
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.classes_ = np.asarray(classes)
+        self.max_depth = max_depth
+    
+    @staticmethod
+    def supports(model):
+        # Classifiers only: IsolationForest trees hold path lengths, not class counts (and
+        # the ensemble has no n_classes_), so flattening it would crash or score nonsense
+        if not is_classifier(model) or not hasattr(model, 'n_classes_'):
+            return False
+        estimators = getattr(model, 'estimators_', [model])
+        return all(hasattr(tree, 'tree_') and tree.n_outputs_ == 1 for tree in estimators)
+    
+    @classmethod
+    def from_model(cls, model):
+        """Flatten the fitted trees of model into one node table"""
+        if not cls.supports(model):
+            raise ValueError(f"{type(model).__name__} is not a single-output tree ensemble")
+        trees = [est.tree_ for est in getattr(model, 'estimators_', [model])]
+        
+        offsets = np.cumsum([0] + [tree.node_count for tree in trees])
+        roots = offsets[:-1].astype(np.int32)
+        feature, threshold, left, right, value = [], [], [], [], []
+        for offset, tree in zip(offsets, trees):
+            is_leaf = tree.children_left == -1
+            node_ids = np.arange(tree.node_count) + offset
+            # Leaves point at themselves so the walk can stop (or keep stepping) in place
+            left.append(np.where(is_leaf, node_ids, tree.children_left + offset))
+            right.append(np.where(is_leaf, node_ids, tree.children_right + offset))
+            feature.append(np.where(is_leaf, 0, tree.feature))
+            threshold.append(tree.threshold)
+            
+            # Same normalisation as DecisionTreeClassifier.predict_proba
+            proba = tree.value[:, 0, :model.n_classes_].astype(np.float64)
+            normalizer = proba.sum(axis=1)[:, np.newaxis]
+            normalizer[normalizer == 0.0] = 1.0
+            value.append(proba / normalizer)
+        
+        return cls(roots=roots,
+                   feature=np.concatenate(feature).astype(np.int32),
+                   threshold=np.concatenate(threshold).astype(np.float64),
+                   left=np.concatenate(left).astype(np.int32),
+                   right=np.concatenate(right).astype(np.int32),
+                   value=np.ascontiguousarray(np.concatenate(value)),
+                   classes=model.classes_,
+                   max_depth=max(tree.max_depth for tree in trees))
+    
+    @property
+    def n_trees(self):
+        return len(self.roots)
+    
+    def predict_proba(self, X):
+        """Mean leaf probability over trees, identical to sklearn's single-threaded result"""
+        X = X.toarray() if sp.issparse(X) else X
+        # sklearn compares float32 features against float64 thresholds
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        out = np.zeros((X.shape[0], self.value.shape[1]), dtype=np.float64)
+        
+        if NUMBA_AVAILABLE:
+            _walk_forest(X, self.roots, self.feature, self.threshold, self.left, self.right,
+                         self.value, out, self.BLOCK_SIZE)
+        else:
+            self._walk_numpy(X, out)
+        
+        if self.n_trees > 1:
+            out /= self.n_trees
+        return out
+    
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+    
+    def _walk_numpy(self, X, out):
+        """Advance all (row, tree) cursors one level per step, for at most max_depth steps"""
+        rows = np.arange(X.shape[0])[:, np.newaxis]
+        node = np.tile(self.roots, (X.shape[0], 1))
+        for step in range(self.max_depth):
+            go_left = X[rows, self.feature[node]] <= self.threshold[node]
+            node = np.where(go_left, self.left[node], self.right[node])
+            if step % 8 == 7 and (self.left[node] == node).all():
+                break
+        for t in range(self.n_trees):
+            out += self.value[node[:, t]]
+    
+    def save(self, directory):
+        """Write each node array as .npy so loads can memory-map them"""
+        os.makedirs(directory, exist_ok=True)
+        for name in self.ARRAYS:
+            np.save(os.path.join(directory, f"{name}.npy"), getattr(self, name))
+        with open(os.path.join(directory, 'meta.json'), 'w') as f:
+            json.dump({'classes': self.classes_.tolist(), 'max_depth': int(self.max_depth)}, f)
+    
+    @classmethod
+    def load(cls, directory, mmap_mode='r'):
+        """Load node arrays; with mmap_mode='r' processes share the same pages"""
+        arrays = {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mmap_mode)
+                  for name in cls.ARRAYS}
+        with open(os.path.join(directory, 'meta.json')) as f:
+            meta = json.load(f)
+        return cls(classes=meta['classes'], max_depth=meta['max_depth'], **arrays)
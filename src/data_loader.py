@@ -1,71 +1,205 @@
+import itertools
+import warnings
 import pandas as pd
 import numpy as np
 
+from src.schema import COLUMNS, CATEGORICAL_VOCABULARIES, NUMERIC_DTYPES, DIFFICULTY_COLUMN, DIFFICULTY_DTYPE
+from src.nsld_kdd_decoder import NSLKDDDecoder
+from src.cache import ColumnarCache
+from src.instrumentation import instrumented, report
+
 class NSLKDDLoader:
-    def __init__(self):
-        self.columns = [
-            'duration', 'protocol_type', 'service', 'flag', 'src_bytes', 'dst_bytes', 
-            'land', 'wrong_fragment', 'urgent', 'hot', 'num_failed_logins', 'logged_in',
-            'num_compromised', 'root_shell', 'su_attempted', 'num_root', 'num_file_creations',
-            'num_shells', 'num_access_files', 'num_outbound_cmds', 'is_host_login',
-            'is_guest_login', 'count', 'srv_count', 'serror_rate', 'srv_serror_rate',
-            'rerror_rate', 'srv_rerror_rate', 'same_srv_rate', 'diff_srv_rate',
-            'srv_diff_host_rate', 'dst_host_count', 'dst_host_srv_count', 'dst_host_same_srv_rate',
-            'dst_host_diff_srv_rate', 'dst_host_same_src_port_rate', 'dst_host_srv_diff_host_rate',
-            'dst_host_serror_rate', 'dst_host_srv_serror_rate', 'dst_host_rerror_rate', 
-            'dst_host_srv_rerror_rate', 'label'
-        ]
-        
-        # Based on your data discovery, label 21 is the most frequent (potential 'normal')
-        self.normal_label = 21
+    def __init__(self, cache_dir='data/.cache'):
+        self.columns = list(COLUMNS)
+        
+        # Parsed files are kept as memory-mapped columns; None disables the cache
+        self.cache = ColumnarCache(cache_dir) if cache_dir else None
+        
+        # Fixed categories keep codes identical across chunks and files
+        self.category_dtypes = {
+            col: pd.CategoricalDtype(vocab)
+            for col, vocab in CATEGORICAL_VOCABULARIES.items()
+        }
+        self.category_dtypes['label'] = pd.CategoricalDtype(list(NSLKDDDecoder.LABEL_MAPPING))
+        
+        # Typed parsing reads the attack name into 'label', so normal traffic is 'normal'
+        self.normal_label = 'normal'
     
-    def load_data(self, train_path, test_path):
+    def load_data(self, train_path, test_path, columns=None):
         """Load NSL-KDD dataset"""
-        print("📥 Loading dataset files...")
-        train_df = pd.read_csv(train_path, names=self.columns)
-        test_df = pd.read_csv(test_path, names=self.columns)
+        report("📥 Loading dataset files...")
+        train_df = self.load_file(train_path, columns)
+        test_df = self.load_file(test_path, columns)
         
-        print(f"   Raw Data Loaded:")
-        print(f"   Training samples: {len(train_df):,}")
-        print(f"   Testing samples: {len(test_df):,}")
+        report(f"   Raw Data Loaded:")
+        report(f"   Training samples: {len(train_df):,}")
+        report(f"   Testing samples: {len(test_df):,}")
         
         return train_df, test_df
     
-    def create_binary_labels(self, df, normal_label=None):
+    @instrumented('load_file', rows=len)
+    def load_file(self, path, columns=None):
+        """Load one KDD file, parsing it only if no cached columnar copy exists"""
+        if self.cache is None:
+            df = pd.concat(self.iter_chunks(path), ignore_index=True)
+            return df if columns is None else df[columns]
+        
+        entry, digest = self.cache.lookup(path)
+        if entry is None:
+            report(f"   Building columnar cache for {path}...")
+            entry = self.cache.store(path, self.iter_chunks(path), digest)
+        return self.cache.load(entry, columns)
+    
+    def iter_chunks(self, path, chunksize=100000):
+        """Stream a KDD file as typed DataFrame chunks with a fixed schema"""
+        columns = self.detect_schema(path)
+        read_dtypes = dict(NUMERIC_DTYPES)
+        read_dtypes[DIFFICULTY_COLUMN] = DIFFICULTY_DTYPE
+        read_dtypes.update({col: 'category' for col in self.category_dtypes})
+        read_dtypes = {col: dtype for col, dtype in read_dtypes.items() if col in columns}
+        # Narrow integer columns are parsed wide and range-checked; read_csv would wrap them silently
+        narrow = {col: dtype for col, dtype in read_dtypes.items()
+                  if dtype != 'category' and np.dtype(dtype).kind == 'i' and np.dtype(dtype).itemsize < 8}
+        read_dtypes.update(dict.fromkeys(narrow, np.int64))
+        
+        reader = pd.read_csv(path, header=None, names=columns, dtype=read_dtypes, chunksize=chunksize)
+        with reader:
+            try:
+                for chunk in reader:
+                    yield self._apply_schema(self._downcast(chunk, narrow))
+            except ValueError as e:
+                # A bad value past the sampled rows; name the file rather than a bare cast error
+                raise ValueError(f"{path}: {e}") from e
+    
+    def detect_schema(self, path, sample_rows=100):
+        """Column names for path (42 fields, or 43 with difficulty), checked on its first rows"""
+        with open(path) as f:
+            rows = [line.rstrip('\r\n').split(',') for line in itertools.islice(f, sample_rows)]
+        rows = [row for row in rows if row != ['']]
+        if not rows:
+            raise ValueError(f"{path} is empty")
+        
+        widths = sorted({len(row) for row in rows})
+        if len(widths) > 1:
+            raise ValueError(f"{path}: rows have different field counts {widths} in the first {len(rows)} lines")
+        if widths[0] == len(self.columns):
+            columns = list(self.columns)
+        elif widths[0] == len(self.columns) + 1:
+            columns = self.columns + [DIFFICULTY_COLUMN]
+        else:
+            raise ValueError(f"{path} has {widths[0]} fields per row; expected {len(self.columns)} "
+                             f"(41 features + attack name) or {len(self.columns) + 1} (+ difficulty)")
+        
+        # Text where numbers belong (or the reverse) means shifted columns or a header row
+        sample = pd.DataFrame(rows, columns=columns)
+        errors = []
+        for col in columns:
+            numeric = pd.to_numeric(sample[col], errors='coerce')
+            if col in self.category_dtypes:
+                bad = numeric.notna()
+                problem = "numbers in a text column"
+            elif col == DIFFICULTY_COLUMN or np.dtype(NUMERIC_DTYPES[col]).kind == 'i':
+                bad = numeric.isna() | (numeric % 1 != 0)
+                problem = "non-integer values"
+            else:
+                bad = numeric.isna()
+                problem = "non-numeric values"
+            if bad.any():
+                errors.append(f"{col}: {problem} (e.g. {sample[col][bad].iloc[0]!r})")
+        if errors:
+            raise ValueError(f"{path} does not match the NSL-KDD schema: " + '; '.join(errors[:5]))
+        return columns
+    
+    def _downcast(self, chunk, dtypes):
+        """Cast wide-parsed integer columns to their schema dtypes, refusing values that don't fit"""
+        for col, dtype in dtypes.items():
+            values = chunk[col].to_numpy()
+            info = np.iinfo(dtype)
+            if len(values) and (values.min() < info.min or values.max() > info.max):
+                bad = values[(values < info.min) | (values > info.max)][0]
+                raise ValueError(f"column {col} has value {bad} outside the "
+                                 f"{np.dtype(dtype).name} range [{info.min}, {info.max}]")
+            chunk[col] = values.astype(dtype)
+        return chunk
+    
+    def _apply_schema(self, chunk):
+        """Recode per-chunk categories onto the fixed vocabularies"""
+        for col, dtype in self.category_dtypes.items():
+            unknown = set(chunk[col].cat.categories) - set(dtype.categories)
+            if unknown:
+                warnings.warn(f"Unknown {col} values mapped to NaN: {sorted(unknown)[:10]}")
+            chunk[col] = chunk[col].cat.set_categories(dtype.categories)
+        return chunk
+    
+    def create_binary_labels(self, df, normal_label=None, verbose=True):
         """Create binary labels: normal vs attack"""
         if normal_label is None:
             normal_label = self.normal_label
         
-        print(f"🎯 Creating binary labels using label {normal_label} as 'normal'...")
+        if verbose:
+            report(f"🎯 Creating binary labels using label {normal_label} as 'normal'...")
         
-        # Convert label to string for consistent handling
-        df['label'] = df['label'].astype(str)
+        if isinstance(df['label'].dtype, pd.CategoricalDtype):
+            # Typed chunks keep the label as a category; compare on the codes
+            df['is_attack'] = (df['label'] != str(normal_label)).astype(np.int8)
+        else:
+            # Convert label to string for consistent handling
+            df['label'] = df['label'].astype(str)
+            
+            # Create binary classification
+            df['is_attack'] = (df['label'] != str(normal_label)).astype(int)
         
-        # Create binary classification
-        df['is_attack'] = (df['label'] != str(normal_label)).astype(int)
+        if not verbose:
+            return df
         
         attack_count = df['is_attack'].sum()
         normal_count = len(df) - attack_count
         
-        print(f"   Normal samples (label {normal_label}): {normal_count:,}")
-        print(f"   Attack samples: {attack_count:,}")
-        print(f"   Attack ratio: {attack_count/len(df):.3f}")
+        report(f"   Normal samples (label {normal_label}): {normal_count:,}")
+        report(f"   Attack samples: {attack_count:,}")
+        report(f"   Attack ratio: {attack_count/len(df):.3f}")
         
         # Show top 10 labels for verification
-        print(f"   Top 10 labels: {df['label'].value_counts().head(10).to_dict()}")
+        report(f"   Top 10 labels: {df['label'].value_counts().head(10).to_dict()}")
         
         return df
     
+    def create_category_labels(self, df, verbose=True):
+        """Add the 5-class attack_category target (normal/dos/probe/r2l/u2r; unknown names are NaN)"""
+        df['attack_category'] = NSLKDDDecoder.categorize_attacks(df['label'])
+        
+        if verbose:
+            counts = df['attack_category'].value_counts(sort=False)
+            report(f"🏷️  Attack categories: {counts.to_dict()}")
+            unknown = df['attack_category'].isna().sum()
+            if unknown:
+                report(f"   ⚠️  {unknown:,} rows with unmapped labels")
+        
+        return df
+    
+    def stratified_sample(self, df, target_col, max_per_class, random_state=42):
+        """Keep at most max_per_class random rows of each target class; rarer classes stay whole"""
+        codes = pd.factorize(df[target_col])[0]
+        rng = np.random.default_rng(random_state)
+        keep = []
+        for code in np.unique(codes):
+            rows = np.flatnonzero(codes == code)
+            if len(rows) > max_per_class:
+                rows = rng.choice(rows, max_per_class, replace=False)
+            keep.append(rows)
+        # Original row order is kept so chunked/time-ordered data stays in sequence
+        return df.iloc[np.sort(np.concatenate(keep))].reset_index(drop=True)
+    
     def analyze_labels(self, df):
         """Analyze label distribution to help identify normal traffic"""
-        print("\n🔍 Label Analysis:")
+        report("\n🔍 Label Analysis:")
         label_counts = df['label'].value_counts().sort_index()
         
         for label, count in label_counts.head(15).items():
-            print(f"   Label {label}: {count:>6,} samples")
+            report(f"   Label {label}: {count:>6,} samples")
         
         # Suggest potential normal labels (those with high frequency)
         potential_normal = label_counts.head(3).index.tolist()
-        print(f"💡 Suggested normal labels (most frequent): {potential_normal}")
+        report(f"💡 Suggested normal labels (most frequent): {potential_normal}")
         
         return label_counts
\ No newline at end of file
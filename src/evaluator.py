@@ -1,88 +1,141 @@
-import matplotlib.pyplot as plt
-import seaborn as sns
-from sklearn.metrics import (classification_report, confusion_matrix, 
-                           roc_auc_score, roc_curve, precision_recall_curve, accuracy_score)
-import pandas as pd
+import time
 import numpy as np
 
+from src.instrumentation import instrumented, report
+from src.metrics import confusion_counts, metrics_from_confusion, roc_auc_rank, ScoreHistogram, StreamingMetrics
+
 class CyberEvaluator:
-    def __init__(self):
+    def __init__(self, compact=False, bins=1000, class_names=None):
+        # compact=True keeps per-class score histograms instead of per-row y_pred/y_prob arrays;
+        # class_names (e.g. NSLKDDDecoder.ATTACK_CATEGORIES) switches to multi-class mode: labels are
+        # codes 0..k-1 with 0 = normal, headline precision/recall/F1 are macro averages and the
+        # ROC/PR curves score attack vs normal as 1 - P(normal)
         self.results = {}
+        self.compact = compact
+        self.bins = bins
+        self.class_names = class_names
+        self._labels = None
+    
+    @property
+    def labels(self):
+        return None if self.class_names is None else np.arange(len(self.class_names))
     
-    def evaluate_model(self, model_name, model, X_test, y_test, y_pred=None):
+    @instrumented('evaluate_model', rows=lambda result: int(result['confusion_matrix'].sum()))
+    def evaluate_model(self, model_name, model, X_test, y_test, y_pred=None, y_score=None):
         """Comprehensive model evaluation"""
+        # y_score: attack scores computed alongside y_pred; skips the extra predict_proba pass
         # If y_pred not provided, predict using model
         if y_pred is None:
             if hasattr(model, "predict"):
                 y_pred = model.predict(X_test)
             else:
                 raise ValueError("Model must have predict method or provide y_pred")
+            
+            # IsolationForest predicts -1 (anomaly) / 1; given y_pred is already binary
+            if model_name == 'IsolationForest':
+                y_pred = (y_pred == -1).astype(int)
         
-        # For IsolationForest, convert predictions
-        if model_name == 'IsolationForest':
-            y_pred = (y_pred == -1).astype(int)
+        # One bincount gives the confusion matrix; every other metric comes from its counts
+        y_true = self._label_array(y_test)
+        cm, labels = confusion_counts(y_true, y_pred, self.labels)
+        metrics = self._headline(metrics_from_confusion(cm, labels))
         
-        # Metrics
-        accuracy = accuracy_score(y_test, y_pred)
-        report = classification_report(y_test, y_pred, output_dict=True)
+        self.results[model_name] = dict(metrics, confusion_matrix=cm)
+        if not self.compact:
+            self.results[model_name]['y_pred'] = y_pred
         
-        # Handle case where only one class is predicted
-        if len(np.unique(y_pred)) == 1:
-            precision = 1.0 if np.unique(y_pred)[0] == 1 else 0.0
-            recall = 1.0 if np.unique(y_pred)[0] == 1 else 0.0
-            f1 = 1.0 if np.unique(y_pred)[0] == 1 else 0.0
-        else:
-            precision = report['1']['precision']
-            recall = report['1']['recall']
-            f1 = report['1']['f1-score']
+        # ROC AUC if probabilities available
+        if y_score is not None or hasattr(model, "predict_proba"):
+            y_prob = y_score if y_score is not None else self._attack_score(model.predict_proba(X_test))
+            y_attack = self._attack_truth(y_true)
+            # The histogram also feeds the dashboard's ROC/PR panels in both modes
+            histogram = ScoreHistogram(self.bins).add(y_attack, y_prob)
+            self.results[model_name]['score_histogram'] = histogram
+            if self.compact:
+                self.results[model_name]['roc_auc'] = histogram.roc_auc()
+            else:
+                self.results[model_name]['roc_auc'] = roc_auc_rank(y_attack, y_prob)
+                self.results[model_name]['y_prob'] = y_prob
         
-        cm = confusion_matrix(y_test, y_pred)
+        return self.results[model_name]
+    
+    def evaluate_cascade(self, model_name, cascade, X_test, y_test):
+        """Evaluate a CascadePredictor plus its escalation rate and speedup over the ensemble alone"""
+        start = time.perf_counter()
+        y_pred, y_score = cascade.predict_scored(X_test)
+        cascade_seconds = time.perf_counter() - start
+        escalated = cascade.last_escalated_
         
-        # Store results
-        self.results[model_name] = {
-            'accuracy': accuracy,
-            'precision': precision,
-            'recall': recall,
-            'f1_score': f1,
-            'confusion_matrix': cm,
-            'y_pred': y_pred
-        }
+        # The ensemble alone: one predict_proba pass yields both its labels and scores
+        start = time.perf_counter()
+        cascade.second_stage.predict_proba(X_test)
+        ensemble_seconds = time.perf_counter() - start
         
-        # ROC AUC if probabilities available
-        if hasattr(model, "predict_proba"):
-            y_prob = model.predict_proba(X_test)[:, 1]
-            self.results[model_name]['roc_auc'] = roc_auc_score(y_test, y_prob)
-            self.results[model_name]['y_prob'] = y_prob
+        result = self.evaluate_model(model_name, cascade, X_test, y_test, y_pred, y_score)
+        result.update(escalated_fraction=escalated, cascade_seconds=cascade_seconds,
+                      ensemble_seconds=ensemble_seconds, throughput_gain=ensemble_seconds / cascade_seconds,
+                      band=(cascade.low, cascade.high))
+        return result
+    
+    @instrumented('evaluate_stream', rows=lambda result: result['n_samples'])
+    def evaluate_stream(self, model_name, model, batches, labels=(0, 1)):
+        """Evaluate over an iterable of (X, y) test batches with bounded memory"""
+        # AUC/AP come from score bins; roc_auc_error_bound gives the worst-case gap to the exact AUC
+        if self.class_names is not None:
+            labels = self.labels
+        accumulator = StreamingMetrics(labels, self.bins)
+        for X_batch, y_batch in batches:
+            y_batch = np.asarray(y_batch)
+            y_pred = model.predict(X_batch)
+            if model_name == 'IsolationForest':
+                y_pred = (y_pred == -1).astype(int)
+            accumulator.confusion.update(y_batch, y_pred)
+            if hasattr(model, "predict_proba"):
+                accumulator.histogram.add(self._attack_truth(y_batch), self._attack_score(model.predict_proba(X_batch)))
         
-        return self.results[model_name]
+        result = accumulator.result()
+        result.update(self._headline(accumulator.confusion.metrics()))
+        self.results[model_name] = result
+        return result
+    
+    def _headline(self, metrics):
+        """Binary: attack-class scores. Multi-class: macro averages, per-class scores keyed by name"""
+        if self.class_names is None:
+            return {key: metrics[key] for key in ('accuracy', 'precision', 'recall', 'f1_score', 'per_class')}
+        return {
+            'accuracy': metrics['accuracy'],
+            'precision': metrics['macro_precision'],
+            'recall': metrics['macro_recall'],
+            'f1_score': metrics['macro_f1'],
+            'per_class': {self.class_names[label]: scores for label, scores in metrics['per_class'].items()},
+        }
+    
+    def _attack_score(self, proba):
+        # Class 0 is normal in both modes, so 1 - P(normal) is the attack score for k > 2
+        return proba[:, 1] if proba.shape[1] == 2 else 1.0 - proba[:, 0]
+    
+    def _attack_truth(self, y_true):
+        return y_true if self.class_names is None else (y_true != 0).astype(np.int8)
     
-    def plot_performance_dashboard(self):
+    def _label_array(self, y_test):
+        """y_test as a contiguous array, converted once and reused while the same object is passed"""
+        if self._labels is None or self._labels[0] is not y_test:
+            self._labels = (y_test, np.ascontiguousarray(np.asarray(y_test)))
+        return self._labels[1]
+    
+    def plot_performance_dashboard(self, path='blackwall_performance.png', show=True, dpi=300):
         """Create a comprehensive performance dashboard"""
         if not self.results:
-            print("⚠️  No results to visualize")
+            report("⚠️  No results to visualize")
             return
-            
-        fig, axes = plt.subplots(2, 2, figsize=(15, 12))
-        fig.suptitle('🛡️ BlackWall Performance Dashboard', fontsize=16, fontweight='bold')
-        
-        # 1. Model Comparison Bar Chart
-        metrics_df = pd.DataFrame(self.results).T
-        if all(metric in metrics_df.columns for metric in ['accuracy', 'precision', 'recall', 'f1_score']):
-            metrics_df[['accuracy', 'precision', 'recall', 'f1_score']].plot(
-                kind='bar', ax=axes[0,0], title='Model Performance Comparison'
-            )
-            axes[0,0].tick_params(axis='x', rotation=45)
         
-        # 2. Confusion Matrix for Best Model
-        if self.results:
-            best_model = max(self.results.keys(), 
-                            key=lambda x: self.results[x]['f1_score'])
-            cm = self.results[best_model]['confusion_matrix']
-            sns.heatmap(cm, annot=True, fmt='d', cmap='RdYlBu_r', ax=axes[0,1])
-            axes[0,1].set_title(f'Confusion Matrix - {best_model}')
-            axes[0,1].set_ylabel('Actual')
-            axes[0,1].set_xlabel('Predicted')
-        
-        plt.tight_layout()
-        plt.savefig('blackwall_performance.png', dpi=300, bbox_inches='tight')
-        plt.show()
\ No newline at end of file
+        # Plotting libraries load on first use (see src/visualize.py)
+        from src.visualize import plot_performance_dashboard
+        plot_performance_dashboard(self.results, path=path, dpi=dpi, show=show)
+    
+    def export_report(self, prefix='blackwall_metrics'):
+        """Write <prefix>.json and <prefix>.html metric bundles without any plotting"""
+        from src.visualize import write_metrics_json, write_metrics_html
+        write_metrics_json(self.results, f"{prefix}.json")
+        write_metrics_html(self.results, f"{prefix}.html")
+        return f"{prefix}.json", f"{prefix}.html"
@@ -0,0 +1,104 @@
+import numpy as np
+from scipy import sparse as sp
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.feature_selection import mutual_info_classif
+
+from src.instrumentation import instrumented
+
+def column_variances(X):
+    """Per-column variance of a dense or CSR matrix without densifying it"""
+    if sp.issparse(X):
+        mean = np.asarray(X.mean(axis=0)).ravel()
+        return np.asarray(X.multiply(X).mean(axis=0)).ravel() - mean ** 2
+    return X.var(axis=0, dtype=np.float64)
+
+class FeatureSelector:
+    """Column mask over CyberPreprocessor output: constant, redundant and uninformative columns dropped"""
+    
+    def __init__(self, variance_threshold=0.0, correlation_threshold=0.98, importance='tree',
+                 min_importance=1e-3, max_features=None, sample_rows=50000, random_state=42):
+        # Columns are dropped in three passes: variance <= variance_threshold over all rows; then,
+        # ranked by importance (balanced random forest or mutual information on a sample_rows sample),
+        # any column with |correlation| > correlation_threshold to a higher-ranked kept column; then
+        # columns whose normalised importance is below min_importance or beyond the top max_features
+        if importance not in ('tree', 'mutual_info'):
+            raise ValueError(f"Unknown importance method: {importance}")
+        self.variance_threshold = variance_threshold
+        self.correlation_threshold = correlation_threshold
+        self.importance = importance
+        self.min_importance = min_importance
+        self.max_features = max_features
+        self.sample_rows = sample_rows
+        self.random_state = random_state
+        self.support_ = None
+        self.importances_ = None
+        self.dropped_ = {}
+    
+    @instrumented('select_features.fit', rows=lambda selector: int(selector.support_.sum()))
+    def fit(self, X, y, feature_names=None):
+        """Choose the columns to keep; dropped_ maps each dropped column to its reason"""
+        y = np.asarray(y)
+        n_features = X.shape[1]
+        names = feature_names if feature_names is not None else [f"x{j}" for j in range(n_features)]
+        reasons = {}
+        
+        constant = column_variances(X) <= self.variance_threshold
+        reasons.update(dict.fromkeys(np.flatnonzero(constant), 'zero variance'))
+        candidates = np.flatnonzero(~constant)
+        
+        rng = np.random.default_rng(self.random_state)
+        rows = np.arange(len(y))
+        if len(y) > self.sample_rows:
+            rows = np.sort(rng.choice(len(y), self.sample_rows, replace=False))
+        sample = X[rows][:, candidates]
+        sample = sample.toarray() if sp.issparse(sample) else np.asarray(sample)
+        
+        scores = self._importances(sample, y[rows])
+        self.importances_ = np.zeros(n_features)
+        self.importances_[candidates] = scores / scores.sum() if scores.sum() > 0 else scores
+        
+        # Greedy clustering: each column joins the cluster of a more important column it duplicates
+        order = np.argsort(-self.importances_[candidates], kind='stable')
+        with np.errstate(invalid='ignore', divide='ignore'):
+            corr = np.nan_to_num(np.abs(np.corrcoef(sample, rowvar=False)))
+        kept = []
+        for i in order:
+            twin = next((k for k in kept if corr[i, k] > self.correlation_threshold), None)
+            if twin is None:
+                kept.append(i)
+            else:
+                reasons[candidates[i]] = f"correlated with {names[candidates[twin]]}"
+        
+        ranked = candidates[kept]
+        strong = self.importances_[ranked] >= self.min_importance
+        weak = list(ranked[~strong])
+        if self.max_features is not None:
+            weak += list(ranked[strong][self.max_features:])
+        reasons.update(dict.fromkeys(weak, 'low importance'))
+        
+        self.support_ = np.ones(n_features, dtype=bool)
+        self.support_[list(reasons)] = False
+        self.dropped_ = {names[j]: reasons[j] for j in sorted(reasons)}
+        return self
+    
+    def _importances(self, X, y):
+        if self.importance == 'mutual_info':
+            return mutual_info_classif(X, y, random_state=self.random_state)
+        # Balanced class weights keep features that only matter for rare attack classes
+        forest = RandomForestClassifier(n_estimators=50, class_weight='balanced', n_jobs=-1,
+                                        random_state=self.random_state)
+        return forest.fit(X, y).feature_importances_
+    
+    def transform(self, X):
+        """Slice an already-encoded full-width matrix down to the kept columns"""
+        if self.support_ is None:
+            raise ValueError("FeatureSelector must be fitted before transform")
+        return X[:, self.support_]
+    
+    def summary(self):
+        """Dropped column counts per reason ('correlated with ...' grouped as 'correlated')"""
+        counts = {}
+        for reason in self.dropped_.values():
+            reason = 'correlated' if reason.startswith('correlated') else reason
+            counts[reason] = counts.get(reason, 0) + 1
+        return counts
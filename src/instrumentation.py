@@ -0,0 +1,252 @@
+import contextlib
+import cProfile
+import functools
+import io
+import json
+import marshal
+import os
+import pstats
+import resource
+import time
+import tracemalloc
+
+def reset_peak_rss():
+    """Reset the kernel's peak-RSS mark (Linux); ru_maxrss survives exec from the parent"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        pass
+
+def _status_mb(field):
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith(field):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB"""
+    peak = _status_mb('VmHWM:')
+    # ru_maxrss is KB on Linux
+    return peak if peak is not None else resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def current_rss_mb():
+    rss = _status_mb('VmRSS:')
+    return rss if rss is not None else peak_rss_mb()
+
+class StageProfile:
+    """cProfile stats and top tracemalloc lines of one block; plain data, so a worker can return it"""
+    
+    def __init__(self, stats, memory):
+        self.stats = stats
+        self.memory = memory
+    
+    def create_stats(self):
+        # pstats.Stats() accepts any object with create_stats() and a stats dict
+        pass
+    
+    def dump(self, path):
+        with open(path, 'wb') as f:
+            marshal.dump(self.stats, f)
+
+@contextlib.contextmanager
+def profiled(top=100):
+    """cProfile + tracemalloc a block; the yielded dict gets a StageProfile under 'profile' on exit"""
+    holder = {}
+    profiler = cProfile.Profile()
+    tracemalloc.start()
+    memory_before = tracemalloc.take_snapshot()
+    profiler.enable()
+    try:
+        yield holder
+    finally:
+        profiler.disable()
+        memory_diff = tracemalloc.take_snapshot().compare_to(memory_before, 'lineno')
+        tracemalloc.stop()
+        profiler.create_stats()
+        holder['profile'] = StageProfile(profiler.stats, [str(stat) for stat in memory_diff[:top]])
+
+class _NullStage:
+    """No-op stage used while instrumentation is off; each use yields a fresh, discarded record"""
+    
+    __slots__ = ()
+    
+    def __enter__(self):
+        return {}
+    
+    def __exit__(self, *exc):
+        return False
+
+# Stateless, so one instance serves every disabled stage() call
+_NULL_STAGE = _NullStage()
+
+class Instrumentation:
+    """Per-stage wall/CPU time, peak RSS delta and rows/sec, logged as JSON lines"""
+    
+    def __init__(self, enabled=True, log_path=None, prometheus_path=None, profile=False, quiet=False):
+        # profile=True keeps cProfile + tracemalloc data for top-level stages; the slowest is dumped.
+        # quiet=True stops report() printing to the console (its log records are still written)
+        self.enabled = enabled
+        self.log_path = log_path
+        self.prometheus_path = prometheus_path
+        self.profile = profile
+        self.quiet = quiet
+        self.records = []
+        self._stack = []
+        self._profiles = {}
+    
+    def stage(self, name, rows=None, profile=True, **fields):
+        """Time a block; set record['rows'] inside it when the row count is only known later.
+        
+        profile=False leaves a top-level stage out of --profile, e.g. one that only waits on
+        worker processes that profile themselves (see add_profile)
+        """
+        if not self.enabled:
+            return _NULL_STAGE
+        return self._stage(name, rows, profile, fields)
+    
+    @contextlib.contextmanager
+    def _stage(self, name, rows, profile, fields):
+        # A child resets the peak mark, so fold the parent's peak so far into its frame first
+        if self._stack:
+            self._stack[-1]['child_peak'] = max(self._stack[-1]['child_peak'], peak_rss_mb())
+        record = {'stage': name, 'rows': rows, 'depth': len(self._stack), **fields}
+        frame = {'stage': name, 'child_peak': 0.0}
+        self._stack.append(frame)
+        
+        profiling = profiled() if self.profile and profile and record['depth'] == 0 else None
+        holder = profiling.__enter__() if profiling is not None else None
+        
+        rss_start = current_rss_mb()
+        reset_peak_rss()
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        try:
+            yield record
+        finally:
+            wall = time.perf_counter() - wall_start
+            cpu = time.process_time() - cpu_start
+            peak = max(peak_rss_mb(), frame['child_peak'])
+            self._stack.pop()
+            if self._stack:
+                self._stack[-1]['child_peak'] = max(self._stack[-1]['child_peak'], peak)
+            
+            if profiling is not None:
+                profiling.__exit__(None, None, None)
+                self._profiles[name] = (wall, holder['profile'])
+            
+            record.update(wall_seconds=wall, cpu_seconds=cpu, peak_rss_mb=peak,
+                          peak_rss_delta_mb=peak - rss_start,
+                          rows_per_sec=record['rows'] / wall if record['rows'] and wall else None,
+                          timestamp=time.time())
+            self._emit(record)
+    
+    def record(self, name, wall_seconds, rows=None, **fields):
+        """Log a stage that was measured elsewhere (e.g. by a worker process)"""
+        if self.enabled:
+            self._emit({'stage': name, 'rows': rows, 'depth': len(self._stack), 'wall_seconds': wall_seconds,
+                        'rows_per_sec': rows / wall_seconds if rows and wall_seconds else None,
+                        'timestamp': time.time(), **fields})
+    
+    def add_profile(self, name, wall_seconds, profile):
+        """Keep a StageProfile measured elsewhere (e.g. a model fit in a worker) for --profile"""
+        if self.profile and profile is not None:
+            self._profiles[name] = (wall_seconds, profile)
+    
+    def report(self, message='', **fields):
+        """Progress message: printed unless quiet, and logged as an event record when logging"""
+        if not self.quiet:
+            print(message)
+        if self.enabled and self.log_path:
+            event = {'event': message.strip(), 'stage': self._stack[-1]['stage'] if self._stack else None,
+                     'timestamp': time.time(), **fields}
+            with open(self.log_path, 'a') as f:
+                f.write(json.dumps(event, default=str) + '\n')
+    
+    def _emit(self, record):
+        self.records.append(record)
+        if self.log_path:
+            with open(self.log_path, 'a') as f:
+                f.write(json.dumps(record, default=str) + '\n')
+        if self.prometheus_path and record['depth'] == 0:
+            self.write_prometheus(self.prometheus_path)
+    
+    def write_prometheus(self, path):
+        """Prometheus text exposition of the latest record per stage (textfile-collector format)"""
+        metrics = [
+            ('wall_seconds', 'Wall-clock time of the stage'),
+            ('cpu_seconds', 'CPU time of the stage'),
+            ('peak_rss_delta_mb', 'Peak RSS growth during the stage in MB'),
+            ('rows_per_sec', 'Rows processed per second'),
+        ]
+        latest = {}
+        for record in self.records:
+            latest[record['stage']] = record
+        lines = []
+        for key, help_text in metrics:
+            lines.append(f"# HELP blackwall_stage_{key} {help_text}")
+            lines.append(f"# TYPE blackwall_stage_{key} gauge")
+            for stage, record in latest.items():
+                if record.get(key) is not None:
+                    label = stage.replace('\\', '\\\\').replace('"', '\\"')
+                    lines.append(f'blackwall_stage_{key}{{stage="{label}"}} {record[key]:.6g}')
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write('\n'.join(lines) + '\n')
+        os.replace(tmp_path, path)
+    
+    def dump_slowest_profile(self, prefix='blackwall_profile', top=30):
+        """Write <prefix>.prof, <prefix>.txt (cumulative time) and <prefix>_memory.txt for the slowest stage"""
+        if not self._profiles:
+            return None
+        name = max(self._profiles, key=lambda stage: self._profiles[stage][0])
+        wall, profile = self._profiles[name]
+        profile.dump(f"{prefix}.prof")
+        
+        text = io.StringIO()
+        pstats.Stats(profile, stream=text).sort_stats('cumulative').print_stats(top)
+        with open(f"{prefix}.txt", 'w') as f:
+            f.write(f"Slowest stage: {name} ({wall:.2f}s)\n{text.getvalue()}")
+        with open(f"{prefix}_memory.txt", 'w') as f:
+            f.write(f"Top allocations during {name} (tracemalloc, by line)\n")
+            f.writelines(f"{line}\n" for line in profile.memory[:top])
+        return name
+
+# Library code reports through this instance; configure() switches it on
+_active = Instrumentation(enabled=False)
+
+def configure(enabled=True, log_path=None, prometheus_path=None, profile=False, quiet=False):
+    global _active
+    _active = Instrumentation(enabled, log_path, prometheus_path, profile, quiet)
+    return _active
+
+def get_instrumentation():
+    return _active
+
+def stage(name, rows=None, **fields):
+    """Context manager on the active instrumentation (a no-op until configure())"""
+    return _active.stage(name, rows, **fields)
+
+def report(message='', **fields):
+    """Progress message through the active instrumentation (a plain print until configure())"""
+    _active.report(message, **fields)
+
+def instrumented(name=None, rows=None):
+    """Decorator form of stage(); rows(result) gives the row count after the call"""
+    def decorate(fn):
+        stage_name = name or fn.__qualname__
+        
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _active.enabled:
+                return fn(*args, **kwargs)
+            with _active.stage(stage_name) as record:
+                result = fn(*args, **kwargs)
+                if rows is not None:
+                    record['rows'] = rows(result)
+                return result
+        return wrapper
+    return decorate
@@ -0,0 +1,216 @@
+import numpy as np
+
+def _safe_divide(num, den):
+    """Element-wise num / den with 0 where den is 0 (sklearn's zero_division=0)"""
+    num = np.asarray(num, dtype=np.float64)
+    den = np.asarray(den, dtype=np.float64)
+    return np.divide(num, den, out=np.zeros_like(num), where=den != 0)
+
+def encode_labels(y_true, y_pred, labels=None):
+    """Map both label arrays onto 0..k-1 codes; returns (true_codes, pred_codes, labels)"""
+    y_true = np.asarray(y_true)
+    y_pred = np.asarray(y_pred)
+    if labels is None:
+        if y_true.dtype.kind in 'iub' and y_pred.dtype.kind in 'iub' and len(y_true):
+            # Small non-negative integer labels index the count table directly: no sort needed.
+            # A stray large label would size the table by its value, so it takes the sorted path
+            low = min(y_true.min(), y_pred.min())
+            high = max(y_true.max(), y_pred.max(), 1)
+            if low >= 0 and high < 256:
+                labels = np.arange(high + 1)
+                return y_true.astype(np.intp), y_pred.astype(np.intp), labels
+        labels = np.union1d(y_true, y_pred)
+    labels = np.asarray(labels)
+    for name, values in (('y_true', y_true), ('y_pred', y_pred)):
+        unexpected = ~np.isin(values, labels)
+        if unexpected.any():
+            raise ValueError(f"{name} contains labels not in labels: {np.unique(values[unexpected])[:5].tolist()}")
+    order = np.argsort(labels, kind='stable')
+    true_codes = order[np.searchsorted(labels, y_true, sorter=order)]
+    pred_codes = order[np.searchsorted(labels, y_pred, sorter=order)]
+    return true_codes, pred_codes, labels
+
+def confusion_counts(y_true, y_pred, labels=None, sample_weight=None):
+    """Confusion matrix (rows actual, columns predicted) from a single bincount pass"""
+    # sample_weight gives float counts, e.g. rows standing for collapsed duplicates
+    true_codes, pred_codes, labels = encode_labels(y_true, y_pred, labels)
+    k = len(labels)
+    counts = np.bincount(true_codes * k + pred_codes, weights=sample_weight, minlength=k * k)
+    return counts.reshape(k, k), labels
+
+def metrics_from_confusion(cm, labels=None, positive=1):
+    """Accuracy, positive-class precision/recall/F1, per-class and macro scores from counts"""
+    # Weighted (float) counts stay float; casting to int would truncate them toward zero
+    cm = np.asarray(cm)
+    cm = cm.astype(np.float64 if np.issubdtype(cm.dtype, np.floating) else np.int64, copy=False)
+    labels = np.arange(len(cm)) if labels is None else np.asarray(labels)
+    tp = np.diag(cm)
+    support = cm.sum(axis=1)
+    predicted = cm.sum(axis=0)
+    
+    precision = _safe_divide(tp, predicted)
+    recall = _safe_divide(tp, support)
+    f1 = _safe_divide(2 * tp, support + predicted)
+    
+    per_class = {
+        label.item() if hasattr(label, 'item') else label: {
+            'precision': float(precision[i]), 'recall': float(recall[i]),
+            'f1_score': float(f1[i]), 'support': support[i].item()
+        }
+        for i, label in enumerate(labels)
+    }
+    
+    metrics = {
+        'accuracy': float(_safe_divide(tp.sum(), cm.sum())),
+        'macro_precision': float(precision.mean()),
+        'macro_recall': float(recall.mean()),
+        'macro_f1': float(f1.mean()),
+        'per_class': per_class,
+    }
+    # Binary headline metrics refer to the attack (positive) class
+    pos = np.flatnonzero(labels == positive)
+    if len(pos):
+        i = pos[0]
+        metrics.update(precision=float(precision[i]), recall=float(recall[i]), f1_score=float(f1[i]))
+    else:
+        metrics.update(precision=0.0, recall=0.0, f1_score=0.0)
+    return metrics
+
+def roc_auc_rank(y_true, y_score):
+    """Exact ROC-AUC from one sort of the scores (Mann-Whitney U with tied ranks averaged)"""
+    y_true = np.asarray(y_true) == 1
+    y_score = np.asarray(y_score)
+    n_pos = int(y_true.sum())
+    n_neg = len(y_true) - n_pos
+    if n_pos == 0 or n_neg == 0:
+        return float('nan')
+    
+    order = np.argsort(y_score, kind='mergesort')
+    sorted_scores = y_score[order]
+    # Tie groups get the mean of the 1-based ranks they span
+    starts = np.flatnonzero(np.r_[True, sorted_scores[1:] != sorted_scores[:-1]])
+    ends = np.r_[starts[1:], len(sorted_scores)]
+    group_rank = (starts + ends + 1) / 2.0
+    ranks = np.repeat(group_rank, ends - starts)
+    
+    rank_sum = ranks[y_true[order]].sum()
+    return float((rank_sum - n_pos * (n_pos + 1) / 2.0) / (n_pos * n_neg))
+
+class ScoreHistogram:
+    """Per-class counts of scores in fixed bins over [0, 1]: O(bins) memory for any row count"""
+    
+    def __init__(self, bins=1000):
+        self.bins = bins
+        self.counts = np.zeros((2, bins), dtype=np.int64)
+    
+    def add(self, y_true, y_score):
+        """Bin a batch of scores; scores outside [0, 1] are clipped into the edge bins"""
+        y_true = (np.asarray(y_true) == 1).astype(np.intp)
+        index = np.clip((np.asarray(y_score, dtype=np.float64) * self.bins).astype(np.intp), 0, self.bins - 1)
+        self.counts += np.bincount(y_true * self.bins + index, minlength=2 * self.bins).reshape(2, self.bins)
+        return self
+    
+    @property
+    def n_samples(self):
+        return int(self.counts.sum())
+    
+    def roc_auc(self):
+        """ROC-AUC with scores sharing a bin treated as ties (see roc_auc_error_bound)"""
+        neg, pos = self.counts
+        n_neg, n_pos = neg.sum(), pos.sum()
+        if n_pos == 0 or n_neg == 0:
+            return float('nan')
+        neg_below = np.cumsum(neg) - neg
+        return float((pos * (neg_below + 0.5 * neg)).sum() / (n_pos * n_neg))
+    
+    def roc_auc_error_bound(self):
+        """Largest possible gap between roc_auc() and the exact AUC: half the same-bin pairs"""
+        neg, pos = self.counts
+        n_pairs = neg.sum() * pos.sum()
+        return float((neg * pos).sum() / (2 * n_pairs)) if n_pairs else 0.0
+    
+    def roc_curve(self):
+        """(fpr, tpr, thresholds) at the bin edges, from the highest threshold down"""
+        neg, pos = self.counts
+        fp = np.r_[0, np.cumsum(neg[::-1])]
+        tp = np.r_[0, np.cumsum(pos[::-1])]
+        thresholds = np.r_[np.inf, np.arange(self.bins - 1, -1, -1) / self.bins]
+        return _safe_divide(fp, neg.sum()), _safe_divide(tp, pos.sum()), thresholds
+    
+    def pr_curve(self):
+        """(precision, recall, thresholds) at the bin edges, from the highest threshold down"""
+        neg, pos = self.counts
+        fp = np.cumsum(neg[::-1])
+        tp = np.cumsum(pos[::-1])
+        thresholds = np.arange(self.bins - 1, -1, -1) / self.bins
+        precision = np.where(tp + fp > 0, _safe_divide(tp, tp + fp), 1.0)
+        return precision, _safe_divide(tp, pos.sum()), thresholds
+    
+    def average_precision(self):
+        """Step-wise area under the PR curve (sklearn's average_precision definition)"""
+        precision, recall, _ = self.pr_curve()
+        return float(np.sum(np.diff(np.r_[0.0, recall]) * precision))
+    
+    def merge(self, other):
+        """Fold in a histogram built elsewhere (same bins), e.g. by another worker"""
+        if other.bins != self.bins:
+            raise ValueError(f"Cannot merge histograms with {other.bins} and {self.bins} bins")
+        self.counts += other.counts
+        return self
+
+class ConfusionAccumulator:
+    """Confusion counts over a fixed label set, updated batch by batch and mergeable"""
+    
+    def __init__(self, labels=(0, 1)):
+        self.labels = np.asarray(labels)
+        k = len(self.labels)
+        self.counts = np.zeros((k, k), dtype=np.int64)
+    
+    def update(self, y_true, y_pred):
+        cm, _ = confusion_counts(y_true, y_pred, self.labels)
+        self.counts += cm
+        return self
+    
+    def merge(self, other):
+        if not np.array_equal(other.labels, self.labels):
+            raise ValueError("Cannot merge confusion counts over different labels")
+        self.counts += other.counts
+        return self
+    
+    @property
+    def n_samples(self):
+        return int(self.counts.sum())
+    
+    def metrics(self, positive=1):
+        return metrics_from_confusion(self.counts, self.labels, positive)
+
+class StreamingMetrics:
+    """Confusion counts plus an optional score histogram; memory is fixed by labels and bins"""
+    
+    def __init__(self, labels=(0, 1), bins=1000):
+        self.confusion = ConfusionAccumulator(labels)
+        self.histogram = ScoreHistogram(bins)
+    
+    def update(self, y_true, y_pred, y_score=None):
+        self.confusion.update(y_true, y_pred)
+        if y_score is not None:
+            self.histogram.add(y_true, y_score)
+        return self
+    
+    def merge(self, other):
+        self.confusion.merge(other.confusion)
+        self.histogram.merge(other.histogram)
+        return self
+    
+    def result(self):
+        """Metrics in the CyberEvaluator.evaluate_model layout"""
+        metrics = self.confusion.metrics()
+        result = {key: metrics[key] for key in ('accuracy', 'precision', 'recall', 'f1_score', 'per_class')}
+        result['confusion_matrix'] = self.confusion.counts
+        result['n_samples'] = self.confusion.n_samples
+        if self.histogram.n_samples:
+            result['roc_auc'] = self.histogram.roc_auc()
+            result['roc_auc_error_bound'] = self.histogram.roc_auc_error_bound()
+            result['average_precision'] = self.histogram.average_precision()
+            result['score_histogram'] = self.histogram
+        return result
@@ -1,30 +1,99 @@
-from sklearn.linear_model import LogisticRegression
+from sklearn.linear_model import LogisticRegression, SGDClassifier
 from sklearn.tree import DecisionTreeClassifier
-from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
+from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier, HistGradientBoostingClassifier
 from sklearn.svm import SVC
 from sklearn.ensemble import IsolationForest
 from sklearn.model_selection import GridSearchCV
+from sklearn.base import clone
+from sklearn.metrics import get_scorer
+import sklearn
+import os
+import joblib
 import numpy as np
+from scipy import sparse as sp
+
+from src.tuning import SuccessiveHalvingSearch
+from src.instrumentation import report
 
 class BlackWallModels:
+    # Estimators that fit and predict on CSR input without densifying it
+    SPARSE_MODELS = {'LogisticRegression', 'DecisionTree', 'RandomForest',
+                     'GradientBoosting', 'IsolationForest'}
+    
+    # Estimators whose fit/predict parallelise internally (n_jobs or OpenMP threads)
+    PARALLEL_MODELS = {'RandomForest', 'IsolationForest', 'HistGradientBoosting'}
+    
+    # Estimators trained on CyberPreprocessor.transform_ordinal output (native categoricals)
+    ORDINAL_MODELS = {'HistGradientBoosting'}
+    
+    # Supervised one-hot models with predict_proba, usable as either stage of a CascadePredictor
+    CASCADE_MODELS = ('LogisticRegression', 'DecisionTree', 'RandomForest', 'GradientBoosting')
+    
     def __init__(self):
         self.models = {}
         self.best_params = {}
+        self.online_policies = {}
     
-    def initialize_models(self):
+    def initialize_models(self, gradient_boosting='exact', categorical_mask=None,
+                          multiclass=False, class_weight=None):
         """Initialize all ML models for BlackWall"""
+        # gradient_boosting: 'exact' (GradientBoosting), 'hist' (HistGradientBoosting) or 'both';
+        # categorical_mask marks the categorical columns of the ordinal matrix for 'hist';
+        # multiclass=True drops the unsupervised IsolationForest (it only separates normal/anomaly);
+        # class_weight (e.g. 'balanced') goes to every model that accepts it, i.e. not GradientBoosting
+        if gradient_boosting not in ('exact', 'hist', 'both'):
+            raise ValueError(f"Unknown gradient boosting engine: {gradient_boosting}")
+        
         self.models = {
-            'LogisticRegression': LogisticRegression(random_state=42, max_iter=1000),
-            'DecisionTree': DecisionTreeClassifier(random_state=42),
-            'RandomForest': RandomForestClassifier(random_state=42, n_estimators=100),
+            'LogisticRegression': LogisticRegression(random_state=42, max_iter=1000, class_weight=class_weight),
+            'DecisionTree': DecisionTreeClassifier(random_state=42, class_weight=class_weight),
+            'RandomForest': RandomForestClassifier(random_state=42, n_estimators=100, class_weight=class_weight),
             # 'SVM': SVC(random_state=42, probability=False),             # Checking the probability flag
-            'GradientBoosting': GradientBoostingClassifier(random_state=42),
-            'IsolationForest': IsolationForest(random_state=42, contamination=0.1)
+        }
+        if gradient_boosting in ('exact', 'both'):
+            self.models['GradientBoosting'] = GradientBoostingClassifier(random_state=42)
+        if gradient_boosting in ('hist', 'both'):
+            # Binned, multi-threaded splits with early stopping on a 10% validation split
+            self.models['HistGradientBoosting'] = HistGradientBoostingClassifier(
+                random_state=42, max_iter=500, early_stopping=True, validation_fraction=0.1,
+                n_iter_no_change=10, categorical_features=categorical_mask, class_weight=class_weight
+            )
+        if not multiclass:
+            self.models['IsolationForest'] = IsolationForest(random_state=42, contamination=0.1)
+        return self.models
+    
+    def initialize_online_models(self, trees_per_chunk=10, max_trees=200, window_chunks=5):
+        """Initialize models for incremental updates, each paired with its update policy"""
+        # 'partial_fit': one SGD pass per chunk; 'append': warm-start new trees on each chunk
+        # (oldest dropped past max_trees); 'window': refit on the last window_chunks chunks
+        self.models = {
+            'SGDLogistic': SGDClassifier(loss='log_loss', alpha=1e-4, random_state=42),
+            'RandomForest': RandomForestClassifier(random_state=42, n_estimators=trees_per_chunk,
+                                                   warm_start=True, n_jobs=-1),
+            'DecisionTree': DecisionTreeClassifier(random_state=42),
+        }
+        self.online_policies = {
+            'SGDLogistic': {'policy': 'partial_fit'},
+            'RandomForest': {'policy': 'append', 'trees_per_chunk': trees_per_chunk, 'max_trees': max_trees},
+            'DecisionTree': {'policy': 'window', 'window_chunks': window_chunks},
         }
         return self.models
     
-    def hyperparameter_tuning(self, model_name, model, X_train, y_train):
-        """Perform hyperparameter tuning for selected models"""
+    def prepare_input(self, model_name, X, X_ordinal=None):
+        """Pick the matrix a model trains on; densify sparse input for models that need it"""
+        if model_name in self.ORDINAL_MODELS:
+            if X_ordinal is None:
+                raise ValueError(f"{model_name} needs the ordinal feature matrix")
+            return X_ordinal
+        if sp.issparse(X) and model_name not in self.SPARSE_MODELS:
+            return X.toarray()
+        return X
+    
+    def hyperparameter_tuning(self, model_name, model, X_train, y_train, search='grid',
+                              time_budget=None, cache_dir=None, scoring='f1', n_jobs=-1, sample_weight=None):
+        """Perform hyperparameter tuning for selected models (search='grid' or 'halving')"""
+        # scoring='f1_macro' for the multi-class attack-category target; n_jobs is shared by both searches;
+        # sample_weight (e.g. from TrainingSetReducer) weights every fold fit and fold score of either search
         param_grids = {
             'RandomForest': {
                 'n_estimators': [50, 100, 200],
@@ -41,12 +110,85 @@ class BlackWallModels:
             }
         }
         
-        if model_name in param_grids:
-            print(f"🎯 Tuning {model_name}...")
-            grid_search = GridSearchCV(model, param_grids[model_name], 
-                                    cv=3, scoring='f1', n_jobs=-1)
-            grid_search.fit(X_train, y_train)
+        if model_name not in param_grids:
+            return model
+        
+        report(f"🎯 Tuning {model_name} ({search} search)...")
+        if search == 'grid':
+            if sample_weight is None:
+                grid_search = GridSearchCV(model, param_grids[model_name], 
+                                        cv=3, scoring=scoring, n_jobs=n_jobs)
+                grid_search.fit(X_train, y_train)
+            else:
+                # Metadata routing sends sample_weight to each fold's fit and to the scorer
+                with sklearn.config_context(enable_metadata_routing=True):
+                    estimator = clone(model).set_fit_request(sample_weight=True)
+                    scorer = get_scorer(scoring).set_score_request(sample_weight=True)
+                    grid_search = GridSearchCV(estimator, param_grids[model_name],
+                                               cv=3, scoring=scorer, n_jobs=n_jobs)
+                    grid_search.fit(X_train, y_train, sample_weight=sample_weight)
             self.best_params[model_name] = grid_search.best_params_
             return grid_search.best_estimator_
         
-        return model
\ No newline at end of file
+        if search != 'halving':
+            raise ValueError(f"Unknown search mode: {search}")
+        
+        cache_path = None
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            cache_path = os.path.join(cache_dir, f"{model_name}_folds.jsonl")
+        
+        # Halving on training-set size; fold scores cached under cache_dir make reruns resume
+        halving = SuccessiveHalvingSearch(model, param_grids[model_name], cv=3, scoring=scoring,
+                                          time_budget=time_budget, cache_path=cache_path, n_jobs=n_jobs)
+        halving.fit(X_train, y_train, sample_weight)
+        self.best_params[model_name] = halving.best_params_
+        
+        if cache_dir:
+            halving.save_best_params(os.path.join(cache_dir, f"{model_name}_best_params.json"))
+        if halving.budget_exhausted_:
+            report(f"   ⏱️  Budget reached; best of {halving.best_resources_:,}-row rung kept")
+        report(f"   Best params: {halving.best_params_} (CV F1 {halving.best_score_:.3f}, "
+               f"{halving.search_time_:.1f}s)")
+        return halving.best_estimator_
+    
+    def save_model(self, model_name, path, preprocessor=None):
+        """Save a fitted model together with its fitted preprocessor"""
+        bundle = {
+            'model_name': model_name,
+            'model': self.models[model_name],
+            'preprocessor': preprocessor,
+            'best_params': self.best_params.get(model_name),
+        }
+        joblib.dump(bundle, path)
+    
+    def save_to_store(self, store, preprocessor, results=None, names=None):
+        """Version fitted models (with preprocessor, best params, eval results) in an ArtifactStore"""
+        results = results or {}
+        versions = {}
+        for name in names or self.models:
+            versions[name] = store.save(name, self.models[name], preprocessor,
+                                        results=results.get(name), best_params=self.best_params.get(name))
+        return versions
+    
+    def load_from_store(self, store, names=None, version=None):
+        """Restore fitted models and best params from an ArtifactStore; returns the preprocessor"""
+        preprocessor = None
+        for name in names or store.model_names():
+            artifact = store.load(name, version)
+            self.models[name] = artifact['model']
+            if artifact['best_params'] is not None:
+                self.best_params[name] = artifact['best_params']
+            preprocessor = artifact['preprocessor']
+        return preprocessor
+    
+    @staticmethod
+    def load_model(path):
+        """Load a (model, preprocessor) pair saved with save_model"""
+        bundle = joblib.load(path)
+        return bundle['model'], bundle['preprocessor']
+    
+    @staticmethod
+    def load_bundle(path):
+        """Load everything saved with save_model (model, preprocessor, name, params)"""
+        return joblib.load(path)
\ No newline at end of file
@@ -1,3 +1,8 @@
+import numpy as np
+import pandas as pd
+
+from src.schema import PROTOCOL_TYPES, SERVICES, FLAGS
+
 class NSLKDDDecoder:
     """
     Decoder for NSL-KDD numeric labels and features
@@ -10,7 +15,7 @@ class NSLKDDDecoder:
         # DoS attacks
         'back': 'dos', 'land': 'dos', 'neptune': 'dos', 'pod': 'dos', 
         'smurf': 'dos', 'teardrop': 'dos', 'apache2': 'dos', 'udpstorm': 'dos',
-        'processtable': 'dos', 'worm': 'dos',
+        'processtable': 'dos', 'worm': 'dos', 'mailbomb': 'dos',
         # Probe attacks
         'satan': 'probe', 'ipsweep': 'probe', 'nmap': 'probe', 'portsweep': 'probe',
         'mscan': 'probe', 'saint': 'probe',
@@ -24,15 +29,18 @@ class NSLKDDDecoder:
         'sqlattack': 'u2r', 'xterm': 'u2r', 'ps': 'u2r'
     }
     
-    # Numeric to string label mapping (you might need to adjust these based on your data)
+    # Numeric to string label mapping; 1-23 follow the original KDD order, the rest are alphabetical
     NUMERIC_LABEL_MAPPING = {
         1: 'normal',
         2: 'back', 3: 'buffer_overflow', 4: 'ftp_write', 5: 'guess_passwd',
         6: 'imap', 7: 'ipsweep', 8: 'land', 9: 'loadmodule', 10: 'multihop',
         11: 'neptune', 12: 'nmap', 13: 'perl', 14: 'phf', 15: 'pod',
         16: 'portsweep', 17: 'rootkit', 18: 'satan', 19: 'smurf', 20: 'spy',
-        21: 'teardrop', 22: 'warezclient', 23: 'warezmaster'
-        # Add more mappings as needed based on your dataset
+        21: 'teardrop', 22: 'warezclient', 23: 'warezmaster',
+        24: 'apache2', 25: 'httptunnel', 26: 'mailbomb', 27: 'mscan', 28: 'named',
+        29: 'processtable', 30: 'ps', 31: 'saint', 32: 'sendmail', 33: 'snmpgetattack',
+        34: 'snmpguess', 35: 'sqlattack', 36: 'udpstorm', 37: 'worm', 38: 'xlock',
+        39: 'xsnoop', 40: 'xterm'
     }
     
     # Protocol types
@@ -42,19 +50,37 @@ class NSLKDDDecoder:
         3: 'icmp'
     }
     
-    # Service types (abbreviated - there are 70 services)
+    # Service types: the first ten keep their historical codes, the rest follow schema order
     SERVICE_MAPPING = {
         1: 'http', 2: 'smtp', 3: 'finger', 4: 'domain_u', 5: 'auth',
         6: 'telnet', 7: 'ftp', 8: 'eco_i', 9: 'ntp_u', 10: 'ecr_i',
-        # Add more as needed
+        11: 'IRC', 12: 'X11', 13: 'Z39_50', 14: 'aol', 15: 'bgp',
+        16: 'courier', 17: 'csnet_ns', 18: 'ctf', 19: 'daytime', 20: 'discard',
+        21: 'domain', 22: 'echo', 23: 'efs', 24: 'exec', 25: 'ftp_data',
+        26: 'gopher', 27: 'harvest', 28: 'hostnames', 29: 'http_2784', 30: 'http_443',
+        31: 'http_8001', 32: 'imap4', 33: 'iso_tsap', 34: 'klogin', 35: 'kshell',
+        36: 'ldap', 37: 'link', 38: 'login', 39: 'mtp', 40: 'name',
+        41: 'netbios_dgm', 42: 'netbios_ns', 43: 'netbios_ssn', 44: 'netstat', 45: 'nnsp',
+        46: 'nntp', 47: 'other', 48: 'pm_dump', 49: 'pop_2', 50: 'pop_3',
+        51: 'printer', 52: 'private', 53: 'red_i', 54: 'remote_job', 55: 'rje',
+        56: 'shell', 57: 'sql_net', 58: 'ssh', 59: 'sunrpc', 60: 'supdup',
+        61: 'systat', 62: 'tftp_u', 63: 'tim_i', 64: 'time', 65: 'urh_i',
+        66: 'urp_i', 67: 'uucp', 68: 'uucp_path', 69: 'vmnet', 70: 'whois'
     }
     
     # Flag types
     FLAG_MAPPING = {
         1: 'SF', 2: 'S1', 3: 'REJ', 4: 'S2', 5: 'S0',
-        6: 'S3', 7: 'RSTO', 8: 'RSTR', 9: 'RSTOS0', 10: 'OTH'
+        6: 'S3', 7: 'RSTO', 8: 'RSTR', 9: 'RSTOS0', 10: 'OTH', 11: 'SH'
     }
     
+    # 5-class target; column decoders return pandas Categoricals whose code for unmapped values is UNKNOWN_CODE
+    ATTACK_CATEGORIES = ['normal', 'dos', 'probe', 'r2l', 'u2r']
+    UNKNOWN_CODE = -1
+    
+    # Lookup arrays built on first use, keyed by mapping name
+    _tables = {}
+    
     @classmethod
     def decode_label(cls, numeric_label):
         """Convert numeric label to string label"""
@@ -70,4 +96,59 @@ class NSLKDDDecoder:
         """Categorize attack type"""
         if label == 'normal':
             return 'normal'
-        return cls.LABEL_MAPPING.get(label, 'unknown')
\ No newline at end of file
+        return cls.LABEL_MAPPING.get(label, 'unknown')
+    
+    @classmethod
+    def _numeric_table(cls, name, mapping, vocabulary):
+        """Array indexed by numeric code holding the value's position in vocabulary"""
+        if name not in cls._tables:
+            position = {value: i for i, value in enumerate(vocabulary)}
+            table = np.full(max(mapping) + 1, cls.UNKNOWN_CODE, dtype=np.int16)
+            for code, value in mapping.items():
+                table[code] = position[value]
+            cls._tables[name] = table
+        return cls._tables[name]
+    
+    @classmethod
+    def _decode_numeric(cls, values, name, mapping, vocabulary):
+        values = np.asarray(values)
+        table = cls._numeric_table(name, mapping, vocabulary)
+        codes = np.full(len(values), cls.UNKNOWN_CODE, dtype=np.int16)
+        # NaN, out-of-range and non-integer codes (1.5 would truncate to 1) stay unknown
+        with np.errstate(invalid='ignore'):
+            valid = (values >= 0) & (values < len(table)) & (values == np.floor(values))
+        codes[valid] = table[values[valid].astype(np.intp)]
+        return pd.Categorical.from_codes(codes, categories=vocabulary)
+    
+    @classmethod
+    def decode_labels(cls, numeric_labels):
+        """Decode a whole column of numeric labels into a Categorical of attack names"""
+        return cls._decode_numeric(numeric_labels, 'label', cls.NUMERIC_LABEL_MAPPING, list(cls.LABEL_MAPPING))
+    
+    @classmethod
+    def decode_protocols(cls, numeric_protocols):
+        return cls._decode_numeric(numeric_protocols, 'protocol_type', cls.PROTOCOL_MAPPING, PROTOCOL_TYPES)
+    
+    @classmethod
+    def decode_services(cls, numeric_services):
+        return cls._decode_numeric(numeric_services, 'service', cls.SERVICE_MAPPING, SERVICES)
+    
+    @classmethod
+    def decode_flags(cls, numeric_flags):
+        return cls._decode_numeric(numeric_flags, 'flag', cls.FLAG_MAPPING, FLAGS)
+    
+    @classmethod
+    def categorize_attacks(cls, labels):
+        """Attack category of a whole label column as a Categorical over ATTACK_CATEGORIES"""
+        # Typed loader columns are already categorical; anything else is coded against the known names
+        if isinstance(getattr(labels, 'dtype', None), pd.CategoricalDtype):
+            labels = pd.Categorical(labels)
+        else:
+            labels = pd.Categorical(np.asarray(labels, dtype=object), categories=list(cls.LABEL_MAPPING))
+        
+        # Map each distinct category once, then gather by code
+        position = {category: i for i, category in enumerate(cls.ATTACK_CATEGORIES)}
+        table = np.array([position.get(cls.LABEL_MAPPING.get(name), cls.UNKNOWN_CODE)
+                          for name in labels.categories] + [cls.UNKNOWN_CODE], dtype=np.int8)
+        # Missing labels have code -1, which indexes the trailing UNKNOWN_CODE entry
+        return pd.Categorical.from_codes(table[labels.codes], categories=cls.ATTACK_CATEGORIES)
@@ -0,0 +1,166 @@
+import copy
+import json
+import os
+import time
+from collections import deque
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.metrics import f1_score
+
+from src.preprocessor import CyberPreprocessor
+from src.instrumentation import report
+
+class OnlineTrainer:
+    """Update online models chunk by chunk, with a before/after F1 drift report per update"""
+    
+    def __init__(self, model_manager, preprocessor=None, holdout_fraction=0.2,
+                 checkpoint_path=None, checkpoint_every=5, report_path=None, random_state=42):
+        # model_manager must come from BlackWallModels.initialize_online_models()
+        self.model_manager = model_manager
+        self.preprocessor = preprocessor or CyberPreprocessor()
+        self.holdout_fraction = holdout_fraction
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_every = checkpoint_every
+        self.report_path = report_path
+        self.rng = np.random.RandomState(random_state)
+        
+        # Appended trees keep the scaling they were grown with; only SGD/window models track the running scaler
+        self.frozen_preprocessor = None
+        self.windows = {name: deque(maxlen=policy['window_chunks'])
+                        for name, policy in model_manager.online_policies.items()
+                        if policy['policy'] == 'window'}
+        self.fitted = set()
+        self.chunks_seen = 0
+        self.rows_seen = 0
+        self.report = []
+    
+    def consume(self, loader, paths, chunksize=100000, target_col='is_attack'):
+        """Stream labelled KDD files through update(), one chunk at a time"""
+        for path in paths:
+            for chunk in loader.iter_chunks(path, chunksize=chunksize):
+                chunk = loader.create_binary_labels(chunk, verbose=False)
+                self.update(chunk, target_col)
+        if self.checkpoint_path and self.chunks_seen % self.checkpoint_every:
+            self.checkpoint()
+        return self.report
+    
+    def update(self, df, target_col='is_attack'):
+        """Fold one labelled chunk into the scaler and every online model"""
+        holdout = self.rng.random_sample(len(df)) < self.holdout_fraction
+        train_df, eval_df = df[~holdout], df[holdout]
+        y_train = train_df[target_col].to_numpy()
+        y_eval = eval_df[target_col].to_numpy()
+        
+        if self.preprocessor.feature_columns is None:
+            self.preprocessor.fit(train_df, target_col)
+        else:
+            self.preprocessor.partial_fit(train_df, target_col)
+        if self.frozen_preprocessor is None:
+            self.frozen_preprocessor = copy.deepcopy(self.preprocessor)
+        
+        current = {'train': self.preprocessor.transform(train_df),
+                   'eval': self.preprocessor.transform(eval_df)}
+        frozen = {'train': self.frozen_preprocessor.transform(train_df),
+                  'eval': self.frozen_preprocessor.transform(eval_df)}
+        
+        report(f"🔄 Chunk {self.chunks_seen + 1}: {len(train_df):,} update rows, {len(eval_df):,} holdout rows")
+        for name, model in self.model_manager.models.items():
+            policy = self.model_manager.online_policies[name]
+            X = frozen if policy['policy'] == 'append' else current
+            
+            # F1 of the previous model on unseen traffic measures drift before the update
+            f1_before = self._score(name, model, X['eval'], y_eval)
+            start = time.perf_counter()
+            updated = self._apply_policy(name, model, policy, train_df, X['train'], y_train, target_col)
+            update_time = time.perf_counter() - start
+            f1_after = self._score(name, model, X['eval'], y_eval)
+            
+            record = {'chunk': self.chunks_seen + 1, 'model': name, 'policy': policy['policy'],
+                      'rows': len(train_df), 'updated': updated, 'update_time': update_time,
+                      'f1_before': f1_before, 'f1_after': f1_after}
+            self.report.append(record)
+            self._write_report(record)
+            
+            before = '   n/a' if f1_before is None else f"{f1_before:.4f}"
+            after = '   n/a' if f1_after is None else f"{f1_after:.4f}"
+            report(f"   {name:15} | {policy['policy']:11} | F1 {before} → {after} | {update_time:6.2f}s"
+                   f"{'' if updated else ' (skipped: one class)'}", **record)
+        
+        self.chunks_seen += 1
+        self.rows_seen += len(df)
+        if self.checkpoint_path and self.chunks_seen % self.checkpoint_every == 0:
+            self.checkpoint()
+    
+    def _apply_policy(self, name, model, policy, train_df, X, y, target_col):
+        """Update one model in place; returns False when the chunk cannot be used"""
+        if policy['policy'] == 'partial_fit':
+            model.partial_fit(X, y, classes=np.array([0, 1]))
+        
+        elif policy['policy'] == 'append':
+            if len(np.unique(y)) < 2:
+                return False
+            if name in self.fitted:
+                model.n_estimators = len(model.estimators_) + policy['trees_per_chunk']
+            # warm_start grows only the new trees, on this chunk alone
+            model.fit(X, y)
+            if len(model.estimators_) > policy['max_trees']:
+                model.estimators_ = model.estimators_[-policy['max_trees']:]
+                model.n_estimators = len(model.estimators_)
+        
+        elif policy['policy'] == 'window':
+            # Keep raw chunks so each refit uses the current scaler; cost is bounded by the window
+            self.windows[name].append(train_df)
+            window_df = pd.concat(self.windows[name], ignore_index=True)
+            y_window = window_df[target_col].to_numpy()
+            if len(np.unique(y_window)) < 2:
+                return False
+            model.fit(self.preprocessor.transform(window_df), y_window)
+        
+        else:
+            raise ValueError(f"Unknown online policy for {name}: {policy['policy']}")
+        
+        self.fitted.add(name)
+        return True
+    
+    def _score(self, name, model, X, y):
+        if name not in self.fitted or len(y) == 0:
+            return None
+        return float(f1_score(y, model.predict(X), zero_division=0))
+    
+    def _write_report(self, record):
+        if self.report_path:
+            with open(self.report_path, 'a') as f:
+                f.write(json.dumps(record) + '\n')
+    
+    def checkpoint(self, path=None):
+        """Atomically write models, scalers and stream position with joblib"""
+        path = path or self.checkpoint_path
+        state = {
+            'models': self.model_manager.models,
+            'online_policies': self.model_manager.online_policies,
+            'preprocessor': self.preprocessor,
+            'frozen_preprocessor': self.frozen_preprocessor,
+            'windows': self.windows,
+            'fitted': self.fitted,
+            'chunks_seen': self.chunks_seen,
+            'rows_seen': self.rows_seen,
+        }
+        tmp_path = f"{path}.tmp"
+        joblib.dump(state, tmp_path)
+        os.replace(tmp_path, path)
+        report(f"💾 Checkpoint after {self.chunks_seen} chunks ({self.rows_seen:,} rows) → {path}")
+    
+    @classmethod
+    def resume(cls, path, model_manager, **kwargs):
+        """Rebuild a trainer from a checkpoint written by checkpoint()"""
+        state = joblib.load(path)
+        model_manager.models = state['models']
+        model_manager.online_policies = state['online_policies']
+        trainer = cls(model_manager, preprocessor=state['preprocessor'], checkpoint_path=path, **kwargs)
+        trainer.frozen_preprocessor = state['frozen_preprocessor']
+        trainer.windows = state['windows']
+        trainer.fitted = state['fitted']
+        trainer.chunks_seen = state['chunks_seen']
+        trainer.rows_seen = state['rows_seen']
+        return trainer
@@ -1,69 +1,292 @@
-from sklearn.preprocessing import StandardScaler
+import joblib
 import pandas as pd
 import numpy as np
+from scipy import sparse as sp
+
+from src.instrumentation import instrumented, report
+
+def matrix_nbytes(X):
+    """Memory held by a dense or CSR feature matrix"""
+    if sp.issparse(X):
+        return X.data.nbytes + X.indices.nbytes + X.indptr.nbytes
+    return X.nbytes
 
 class CyberPreprocessor:
-    def __init__(self):
-        self.scaler = StandardScaler()
+    UNKNOWN = '__unknown__'
+    # Targets the loader can add plus the file's difficulty score; never used as features
+    NON_FEATURE_COLUMNS = ('label', 'is_attack', 'attack_category', 'difficulty')
+    # Class-level default so preprocessors pickled before feature selection existed load unmasked
+    feature_mask_ = None
+    
+    def __init__(self, sparse=False):
+        # sparse=True emits CSR: unit-variance numeric values plus unscaled one-hot cells
+        self.sparse = sparse
         self.feature_columns = None
+        self.numeric_columns = None
+        self.vocabularies = {}
+        self.n_samples_seen_ = 0
+        self.mean_ = None
+        self.var_ = None
+        self.scale_ = None
+        # Boolean mask over feature_columns set by select_features(); None keeps every column
+        self.feature_mask_ = None
     
-    def preprocess_features(self, train_df, test_df, target_col='is_attack'):
-        """Preprocess features for ML models - robust to mixed data types"""
-        print("🔧 Starting preprocessing...")
-        
-        # Identify feature columns (exclude target and label)
-        exclude_cols = [target_col, 'label']
-        feature_columns = [col for col in train_df.columns if col not in exclude_cols]
-        
-        print(f"   Using {len(feature_columns)} feature columns")
-        
-        # Separate features and target
-        X_train = train_df[feature_columns].copy()
-        X_test = test_df[feature_columns].copy()
-        y_train = train_df[target_col]
-        y_test = test_df[target_col]
-        
-        print(f"   Original shapes - Train: {X_train.shape}, Test: {X_test.shape}")
-        
-        # Identify categorical columns (non-numeric)
-        categorical_cols = X_train.select_dtypes(include=['object']).columns.tolist()
-        numeric_cols = X_train.select_dtypes(include=[np.number]).columns.tolist()
-        
-        print(f"   Numeric columns: {len(numeric_cols)}")
-        print(f"   Categorical columns: {categorical_cols}")
-        
-        # Handle categorical features with one-hot encoding
-        if categorical_cols:
-            X_train_encoded = pd.get_dummies(X_train, columns=categorical_cols)
-            X_test_encoded = pd.get_dummies(X_test, columns=categorical_cols)
-            
-            print(f"   After encoding - Train: {X_train_encoded.shape}, Test: {X_test_encoded.shape}")
-            
-            # Align columns
-            X_train_final, X_test_final = X_train_encoded.align(
-                X_test_encoded, join='left', axis=1, fill_value=0
-            )
-        else:
-            X_train_final = X_train.copy()
-            X_test_final = X_test.copy()
+    @instrumented('preprocess.fit', rows=lambda fitted: fitted.n_samples_seen_)
+    def fit(self, df, target_col='is_attack'):
+        """Freeze the feature layout, category vocabularies and scaling statistics"""
+        exclude_cols = [target_col, *self.NON_FEATURE_COLUMNS]
+        columns = [col for col in df.columns if col not in exclude_cols]
+        
+        categorical_cols = df[columns].select_dtypes(include=['object', 'category', 'string']).columns.tolist()
+        self.numeric_columns = [col for col in columns if col not in categorical_cols]
+        
+        # Vocabularies are frozen here; later batches map unseen values to the unknown bucket
+        self.vocabularies = {}
+        for col in categorical_cols:
+            counts = df[col].value_counts(sort=False)
+            self.vocabularies[col] = counts[counts > 0].sort_index().index.tolist()
+        
+        self.feature_columns = list(self.numeric_columns)
+        for col, vocab in self.vocabularies.items():
+            self.feature_columns.extend(f"{col}_{value}" for value in vocab)
+            self.feature_columns.append(f"{col}_{self.UNKNOWN}")
+        
+        self.n_samples_seen_, self.mean_, self.var_ = self._batch_statistics(df)
+        self._update_scale()
+        self.feature_mask_ = None
+        
+        return self
+    
+    def partial_fit(self, df, target_col='is_attack'):
+        """Fold a new batch into the running scaling statistics (vocabularies stay frozen)"""
+        if self.feature_columns is None:
+            return self.fit(df, target_col)
         
-        # Ensure all data is numeric
-        X_train_final = X_train_final.apply(pd.to_numeric, errors='coerce')
-        X_test_final = X_test_final.apply(pd.to_numeric, errors='coerce')
+        # Chan et al. pairwise update of mean and variance
+        n_b, mean_b, var_b = self._batch_statistics(df)
+        n_a, mean_a = self.n_samples_seen_, self.mean_
+        n = n_a + n_b
+        delta = mean_b - mean_a
+        self.mean_ = mean_a + delta * n_b / n
+        self.var_ = (self.var_ * n_a + var_b * n_b + delta ** 2 * n_a * n_b / n) / n
+        self.n_samples_seen_ = n
+        self._update_scale()
+        return self
+    
+    def _batch_statistics(self, df):
+        """Row count plus per-feature mean and variance of one batch"""
+        n = len(df)
+        means, variances = [], []
         
-        # Fill any remaining NaN values with 0
-        X_train_final = X_train_final.fillna(0)
-        X_test_final = X_test_final.fillna(0)
+        for col in self.numeric_columns:
+            values = self._numeric_values(df[col])
+            means.append(values.mean(dtype=np.float64))
+            variances.append(values.var(dtype=np.float64))
         
-        print(f"   Final shapes - Train: {X_train_final.shape}, Test: {X_test_final.shape}")
+        # One-hot statistics follow from category frequencies; no dummy matrix is built
+        for col, vocab in self.vocabularies.items():
+            counts = np.bincount(self._category_codes(df[col], vocab), minlength=len(vocab) + 1)
+            freq = counts / n
+            means.extend(freq)
+            variances.extend(freq * (1 - freq))
         
-        # Scale features
-        X_train_scaled = self.scaler.fit_transform(X_train_final)
-        X_test_scaled = self.scaler.transform(X_test_final)
+        return n, np.asarray(means, dtype=np.float64), np.asarray(variances, dtype=np.float64)
+    
+    def _update_scale(self):
+        self.scale_ = np.sqrt(self.var_)
+        self.scale_[self.scale_ == 0] = 1.0
+    
+    def select_features(self, mask):
+        """Keep only the feature_columns where mask is True; later transforms skip the rest"""
+        mask = np.asarray(mask, dtype=bool)
+        if self.feature_columns is None or len(mask) != len(self.feature_columns):
+            raise ValueError("Feature mask must match the fitted feature_columns")
+        self.feature_mask_ = None if mask.all() else mask
+        return self
+    
+    @property
+    def selected_columns(self):
+        """Names of the columns transform() emits"""
+        if self.feature_mask_ is None:
+            return self.feature_columns
+        return [col for col, keep in zip(self.feature_columns, self.feature_mask_) if keep]
+    
+    def _layout(self):
+        """Kept numeric column indices and each categorical column's kept one-hot positions"""
+        mask = self.feature_mask_
+        n_numeric = len(self.numeric_columns)
+        numeric = np.arange(n_numeric) if mask is None else np.flatnonzero(mask[:n_numeric])
+        blocks = {}
+        offset = n_numeric
+        for col, vocab in self.vocabularies.items():
+            width = len(vocab) + 1
+            kept = np.arange(width) if mask is None else np.flatnonzero(mask[offset:offset + width])
+            # Columns with no kept dummy are never read
+            if len(kept):
+                blocks[col] = (offset, kept)
+            offset += width
+        return numeric, blocks
+    
+    @property
+    def input_columns(self):
+        """Raw columns transform() reads; dropped features need not be present"""
+        numeric, blocks = self._layout()
+        return [self.numeric_columns[j] for j in numeric] + list(blocks)
+    
+    @instrumented('preprocess.transform', rows=lambda X: X.shape[0])
+    def transform(self, df):
+        """Encode and scale a batch into one preallocated float32 matrix"""
+        if self.feature_columns is None:
+            raise ValueError("CyberPreprocessor must be fitted before transform")
+        
+        numeric, blocks = self._layout()
+        if self.sparse:
+            return self._transform_sparse(df, numeric, blocks)
         
-        # Store feature columns for reference
-        self.feature_columns = X_train_final.columns.tolist()
+        width = len(numeric) + sum(len(kept) for _, kept in blocks.values())
+        X = np.empty((len(df), width), dtype=np.float32)
         
-        print("✅ Preprocessing complete!")
+        for out, j in enumerate(numeric):
+            values = self._numeric_values(df[self.numeric_columns[j]])
+            np.subtract(values, self.mean_[j], out=X[:, out], casting='unsafe')
+            X[:, out] /= self.scale_[j]
         
-        return X_train_scaled, X_test_scaled, y_train, y_test
\ No newline at end of file
+        # Each one-hot block is filled with its scaled "0" then the hot cell set to its scaled "1"
+        out = len(numeric)
+        rows = np.arange(len(df))
+        for col, (offset, kept) in blocks.items():
+            vocab = self.vocabularies[col]
+            block = offset + kept
+            zero = -self.mean_[block] / self.scale_[block]
+            one = (1 - self.mean_[block]) / self.scale_[block]
+            # Output position of each category code; dropped dummies map to -1
+            position = np.full(len(vocab) + 1, -1)
+            position[kept] = np.arange(len(kept))
+            hot = position[self._category_codes(df[col], vocab)]
+            X[:, out:out + len(kept)] = zero
+            if len(kept) == len(vocab) + 1:
+                X[rows, out + hot] = one[hot]
+            else:
+                is_hot = hot >= 0
+                X[rows[is_hot], out + hot[is_hot]] = one[hot[is_hot]]
+            out += len(kept)
+        
+        return X
+    
+    def _transform_sparse(self, df, numeric, blocks):
+        """Build CSR rows directly: numeric cells then one hot cell per categorical column"""
+        n_numeric = len(numeric)
+        row_width = n_numeric + len(blocks)
+        data = np.empty((len(df), row_width), dtype=np.float32)
+        indices = np.empty((len(df), row_width), dtype=np.int32)
+        
+        # Scaling without centring keeps zero counts as structural zeros
+        for out, j in enumerate(numeric):
+            np.divide(self._numeric_values(df[self.numeric_columns[j]]), self.scale_[j],
+                      out=data[:, out], casting='unsafe')
+        indices[:, :n_numeric] = np.arange(n_numeric, dtype=np.int32)
+        data[:, n_numeric:] = 1.0
+        
+        out = n_numeric
+        for k, (col, (offset, kept)) in enumerate(blocks.items()):
+            vocab = self.vocabularies[col]
+            position = np.full(len(vocab) + 1, -1)
+            position[kept] = np.arange(len(kept))
+            hot = position[self._category_codes(df[col], vocab)]
+            # A dropped dummy becomes an explicit zero at the block start, removed below
+            data[hot < 0, n_numeric + k] = 0.0
+            indices[:, n_numeric + k] = out + np.maximum(hot, 0)
+            out += len(kept)
+        
+        indptr = np.arange(0, data.size + 1, row_width, dtype=np.int64)
+        X = sp.csr_matrix((data.ravel(), indices.ravel(), indptr), shape=(len(df), out))
+        X.eliminate_zeros()
+        return X
+    
+    @instrumented('preprocess.transform_ordinal', rows=lambda X: X.shape[0])
+    def transform_ordinal(self, df):
+        """Raw numeric values plus one integer code column per categorical feature"""
+        if self.feature_columns is None:
+            raise ValueError("CyberPreprocessor must be fitted before transform")
+        
+        # For histogram-binned trees: no scaling, categories stay single columns
+        # A categorical column stays whole while any of its one-hot dummies is selected
+        numeric, blocks = self._layout()
+        X = np.empty((len(df), len(numeric) + len(blocks)), dtype=np.float32)
+        for out, j in enumerate(numeric):
+            X[:, out] = self._numeric_values(df[self.numeric_columns[j]])
+        for k, col in enumerate(blocks):
+            X[:, len(numeric) + k] = self._category_codes(df[col], self.vocabularies[col])
+        return X
+    
+    @property
+    def ordinal_columns(self):
+        return self.input_columns
+    
+    @property
+    def ordinal_categorical_mask(self):
+        """Boolean mask marking the categorical columns of transform_ordinal output"""
+        return np.array([col in self.vocabularies for col in self.ordinal_columns])
+    
+    def preprocess_features(self, train_df, test_df, target_col='is_attack'):
+        """Preprocess features for ML models - robust to mixed data types"""
+        report("🔧 Starting preprocessing...")
+        
+        self.fit(train_df, target_col)
+        
+        report(f"   Numeric columns: {len(self.numeric_columns)}")
+        report(f"   Categorical columns: {list(self.vocabularies)}")
+        
+        X_train_scaled = self.transform(train_df)
+        X_test_scaled = self.transform(test_df)
+        y_train = self.target_values(train_df[target_col])
+        y_test = self.target_values(test_df[target_col])
+        
+        report(f"   Final shapes - Train: {X_train_scaled.shape}, Test: {X_test_scaled.shape}")
+        report(f"   {'Sparse' if self.sparse else 'Dense'} matrix size - "
+               f"Train: {matrix_nbytes(X_train_scaled) / 1e6:.1f} MB, "
+               f"Test: {matrix_nbytes(X_test_scaled) / 1e6:.1f} MB")
+        report("✅ Preprocessing complete!")
+        
+        return X_train_scaled, X_test_scaled, y_train, y_test
+    
+    @staticmethod
+    def target_values(series):
+        """Target column as an array; categorical targets (attack_category) become integer codes"""
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            return series.cat.codes.to_numpy()
+        return series.to_numpy()
+    
+    def save(self, path):
+        """Persist the fitted preprocessor"""
+        joblib.dump(self, path)
+    
+    @classmethod
+    def load(cls, path):
+        """Load a fitted preprocessor saved with save()"""
+        preprocessor = joblib.load(path)
+        if not isinstance(preprocessor, cls):
+            raise ValueError(f"{path} does not contain a {cls.__name__}")
+        return preprocessor
+    
+    def _numeric_values(self, series):
+        """Column as a float64-compatible array with non-numeric values as 0"""
+        # Object and pandas str columns (the default for strings from pandas 3) are parsed
+        if not pd.api.types.is_numeric_dtype(series):
+            series = pd.to_numeric(series, errors='coerce')
+        values = series.to_numpy()
+        if values.dtype.kind == 'f' and np.isnan(values).any():
+            values = np.nan_to_num(values)
+        return values
+    
+    def _category_codes(self, series, vocab):
+        """Positions of values in the frozen vocabulary, unknowns in the last slot"""
+        vocab_index = pd.Index(vocab)
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            # Look up each category once and gather by the per-row codes
+            lookup = np.append(vocab_index.get_indexer(series.cat.categories), -1)
+            codes = lookup[series.cat.codes.to_numpy()]
+        else:
+            codes = vocab_index.get_indexer(series)
+        codes[codes < 0] = len(vocab)
+        return codes
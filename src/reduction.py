@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse as sp
+
+from src.instrumentation import instrumented
+
+def row_hashes(X):
+    """64-bit hash of every row of a dense or CSR feature matrix"""
+    if sp.issparse(X):
+        X = X.tocsr()
+        # Each stored cell hashes its (column, value) pair; a row is the wrapping sum of its cells
+        cells = pd.util.hash_array(pd.util.hash_array(X.indices.astype(np.int64)) * np.uint64(0x9E3779B97F4A7C15)
+                                   + pd.util.hash_array(X.data))
+        sums = np.r_[np.uint64(0), np.cumsum(cells, dtype=np.uint64)]
+        return sums[X.indptr[1:]] - sums[X.indptr[:-1]]
+    return pd.util.hash_pandas_object(pd.DataFrame(X, copy=False), index=False).to_numpy()
+
+def rows_differ(X, rows, block=65536):
+    """Mask of rows i where X[i] differs from X[rows[i]]; dense input is compared in blocks"""
+    if sp.issparse(X):
+        X = X.tocsr()
+        return (X[rows] != X).getnnz(axis=1) > 0
+    differ = np.empty(X.shape[0], dtype=bool)
+    for start in range(0, X.shape[0], block):
+        stop = start + block
+        differ[start:stop] = (X[rows[start:stop]] != X[start:stop]).any(axis=1)
+    return differ
+
+class TrainingSetReducer:
+    """Collapse identical encoded training rows into weighted ones, optionally capping rows per class"""
+    
+    def __init__(self, max_per_class=None, random_state=42):
+        # max_per_class: after collapsing, keep a uniform random sample of at most this many distinct
+        # rows per class; their weights are scaled up so each class keeps its total weight
+        self.max_per_class = max_per_class
+        self.random_state = random_state
+        self.rows_ = None
+        self.sample_weight_ = None
+        self.n_rows_in_ = 0
+        self.n_unique_ = 0
+    
+    @instrumented('reduce.fit', rows=lambda reducer: reducer.n_rows_in_)
+    def fit(self, X, y, sample_weight=None):
+        """Choose the rows to train on and the sample_weight each one stands for"""
+        y = np.asarray(y)
+        n = X.shape[0]
+        weights = np.ones(n) if sample_weight is None else np.asarray(sample_weight, dtype=np.float64)
+        
+        # Identical features with different labels stay separate rows
+        keys = pd.util.hash_array(row_hashes(X) + pd.util.hash_array(y))
+        codes = pd.factorize(keys)[0]
+        first = np.unique(codes, return_index=True)[1]
+        # A 64-bit collision would merge distinct rows; any such row is split back out
+        clash = rows_differ(X, first[codes]) | (y[first[codes]] != y)
+        if clash.any():
+            # The few affected rows are grouped exactly instead
+            part = X[clash].toarray() if sp.issparse(X) else X[clash]
+            part = np.column_stack([part, pd.factorize(y[clash])[0]])
+            codes[clash] = codes.max() + 1 + np.unique(part, axis=0, return_inverse=True)[1].ravel()
+            first = np.unique(codes, return_index=True)[1]
+        weights = np.bincount(codes, weights=weights)
+        self.n_unique_ = len(first)
+        
+        if self.max_per_class:
+            rng = np.random.default_rng(self.random_state)
+            labels = y[first]
+            keep = []
+            for label in np.unique(labels):
+                group = np.flatnonzero(labels == label)
+                if len(group) > self.max_per_class:
+                    # Smallest random keys = a reservoir sample of the class's distinct rows
+                    picked = group[np.argpartition(rng.random(len(group)), self.max_per_class)[:self.max_per_class]]
+                    weights[picked] *= weights[group].sum() / weights[picked].sum()
+                    group = picked
+                keep.append(group)
+            keep = np.concatenate(keep)
+            first, weights = first[keep], weights[keep]
+        
+        # Original row order is kept so chunked/time-ordered data stays in sequence
+        order = np.argsort(first)
+        self.rows_ = first[order]
+        self.sample_weight_ = weights[order]
+        self.n_rows_in_ = n
+        return self
+    
+    def take(self, X):
+        """The kept rows of X (a feature matrix, ordinal matrix or target aligned with fit's X)"""
+        if self.rows_ is None:
+            raise ValueError("TrainingSetReducer must be fitted before take")
+        return X[self.rows_]
+    
+    @property
+    def n_rows_out_(self):
+        return 0 if self.rows_ is None else len(self.rows_)
@@ -0,0 +1,90 @@
+import numpy as np
+
+# NSL-KDD record layout (41 features + attack label), in file order
+COLUMNS = [
+    'duration', 'protocol_type', 'service', 'flag', 'src_bytes', 'dst_bytes',
+    'land', 'wrong_fragment', 'urgent', 'hot', 'num_failed_logins', 'logged_in',
+    'num_compromised', 'root_shell', 'su_attempted', 'num_root', 'num_file_creations',
+    'num_shells', 'num_access_files', 'num_outbound_cmds', 'is_host_login',
+    'is_guest_login', 'count', 'srv_count', 'serror_rate', 'srv_serror_rate',
+    'rerror_rate', 'srv_rerror_rate', 'same_srv_rate', 'diff_srv_rate',
+    'srv_diff_host_rate', 'dst_host_count', 'dst_host_srv_count', 'dst_host_same_srv_rate',
+    'dst_host_diff_srv_rate', 'dst_host_same_src_port_rate', 'dst_host_srv_diff_host_rate',
+    'dst_host_serror_rate', 'dst_host_srv_serror_rate', 'dst_host_rerror_rate',
+    'dst_host_srv_rerror_rate', 'label'
+]
+
+FEATURE_COLUMNS = COLUMNS[:-1]
+
+# The official KDDTrain+/KDDTest+ files append a 43rd field: the difficulty score (0-21)
+DIFFICULTY_COLUMN = 'difficulty'
+DIFFICULTY_DTYPE = np.int8
+
+# Fixed vocabularies so every chunk shares the same category codes
+PROTOCOL_TYPES = ['icmp', 'tcp', 'udp']
+
+SERVICES = [
+    'IRC', 'X11', 'Z39_50', 'aol', 'auth', 'bgp', 'courier', 'csnet_ns', 'ctf',
+    'daytime', 'discard', 'domain', 'domain_u', 'echo', 'eco_i', 'ecr_i', 'efs',
+    'exec', 'finger', 'ftp', 'ftp_data', 'gopher', 'harvest', 'hostnames', 'http',
+    'http_2784', 'http_443', 'http_8001', 'imap4', 'iso_tsap', 'klogin', 'kshell',
+    'ldap', 'link', 'login', 'mtp', 'name', 'netbios_dgm', 'netbios_ns',
+    'netbios_ssn', 'netstat', 'nnsp', 'nntp', 'ntp_u', 'other', 'pm_dump', 'pop_2',
+    'pop_3', 'printer', 'private', 'red_i', 'remote_job', 'rje', 'shell', 'smtp',
+    'sql_net', 'ssh', 'sunrpc', 'supdup', 'systat', 'telnet', 'tftp_u', 'tim_i',
+    'time', 'urh_i', 'urp_i', 'uucp', 'uucp_path', 'vmnet', 'whois'
+]
+
+FLAGS = ['OTH', 'REJ', 'RSTO', 'RSTOS0', 'RSTR', 'S0', 'S1', 'S2', 'S3', 'SF', 'SH']
+
+CATEGORICAL_VOCABULARIES = {
+    'protocol_type': PROTOCOL_TYPES,
+    'service': SERVICES,
+    'flag': FLAGS,
+}
+
+CATEGORICAL_COLUMNS = list(CATEGORICAL_VOCABULARIES)
+
+# Smallest dtype that holds each numeric feature's documented range
+NUMERIC_DTYPES = {
+    'duration': np.int32,
+    'src_bytes': np.int64,
+    'dst_bytes': np.int64,
+    'land': np.int8,
+    'wrong_fragment': np.int8,
+    'urgent': np.int16,
+    'hot': np.int16,
+    'num_failed_logins': np.int8,
+    'logged_in': np.int8,
+    'num_compromised': np.int16,
+    'root_shell': np.int8,
+    'su_attempted': np.int8,
+    'num_root': np.int16,
+    'num_file_creations': np.int16,
+    'num_shells': np.int16,
+    'num_access_files': np.int16,
+    'num_outbound_cmds': np.int16,
+    'is_host_login': np.int8,
+    'is_guest_login': np.int8,
+    'count': np.int16,
+    'srv_count': np.int16,
+    'serror_rate': np.float32,
+    'srv_serror_rate': np.float32,
+    'rerror_rate': np.float32,
+    'srv_rerror_rate': np.float32,
+    'same_srv_rate': np.float32,
+    'diff_srv_rate': np.float32,
+    'srv_diff_host_rate': np.float32,
+    'dst_host_count': np.int16,
+    'dst_host_srv_count': np.int16,
+    'dst_host_same_srv_rate': np.float32,
+    'dst_host_diff_srv_rate': np.float32,
+    'dst_host_same_src_port_rate': np.float32,
+    'dst_host_srv_diff_host_rate': np.float32,
+    'dst_host_serror_rate': np.float32,
+    'dst_host_srv_serror_rate': np.float32,
+    'dst_host_rerror_rate': np.float32,
+    'dst_host_srv_rerror_rate': np.float32,
+}
+
+NUMERIC_COLUMNS = [col for col in FEATURE_COLUMNS if col in NUMERIC_DTYPES]
@@ -0,0 +1,260 @@
+import asyncio
+import json
+import time
+from collections import deque
+import numpy as np
+import pandas as pd
+
+from src.compiled_trees import CompiledForest
+from src.models import BlackWallModels
+from src.schema import FEATURE_COLUMNS
+
+class BlackWallScorer:
+    """Vectorized scoring of NSL-KDD records with a saved model and its preprocessor"""
+    
+    def __init__(self, model, preprocessor, model_name=None, compiled=False):
+        # compiled=True swaps tree models for flattened node arrays (same probabilities)
+        if compiled and CompiledForest.supports(model):
+            model = CompiledForest.from_model(model)
+        self.model = model
+        self.preprocessor = preprocessor
+        self.model_name = model_name
+        self.ordinal = model_name in BlackWallModels.ORDINAL_MODELS
+    
+    @classmethod
+    def from_bundle(cls, path, compiled=False):
+        bundle = BlackWallModels.load_bundle(path)
+        if bundle['preprocessor'] is None:
+            raise ValueError(f"{path} was saved without a fitted preprocessor")
+        return cls(bundle['model'], bundle['preprocessor'], bundle['model_name'], compiled)
+    
+    @classmethod
+    def from_store(cls, root, model_name, version=None, compiled=False):
+        """Scorer over an ArtifactStore version; compiled trees are memory-mapped and shared"""
+        from src.artifacts import ArtifactStore
+        artifact = ArtifactStore(root).load(model_name, version, compiled=compiled)
+        return cls(artifact['model'], artifact['preprocessor'], model_name, compiled)
+    
+    def normalize(self, records):
+        """Validate records and return them as dicts; lists must hold all 41 features in order"""
+        if not isinstance(records, list) or not records:
+            raise ValueError("records must be a non-empty list")
+        # Only the columns the preprocessor reads are required (feature selection may drop some)
+        required = set(self.preprocessor.input_columns)
+        normalized = []
+        for i, record in enumerate(records):
+            if isinstance(record, (list, tuple)):
+                if len(record) != len(FEATURE_COLUMNS):
+                    raise ValueError(f"Record {i} has {len(record)} values, expected {len(FEATURE_COLUMNS)}")
+                record = dict(zip(FEATURE_COLUMNS, record))
+            elif not isinstance(record, dict):
+                raise ValueError(f"Record {i} must be an object or a list, not {type(record).__name__}")
+            elif not required.issubset(record):
+                raise ValueError(f"Record {i} is missing features: {sorted(required - set(record))[:5]}")
+            normalized.append(record)
+        return normalized
+    
+    def score(self, records):
+        """Score a list of records (dicts keyed by feature name or 41-value lists)"""
+        df = pd.DataFrame.from_records(self.normalize(records))
+        
+        X = self.preprocessor.transform_ordinal(df) if self.ordinal else self.preprocessor.transform(df)
+        if hasattr(self.model, 'predict_scored'):
+            # CascadePredictor: band thresholds, not argmax, decide the label
+            predictions, probabilities = self.model.predict_scored(X)
+        elif hasattr(self.model, 'predict_proba'):
+            proba = self.model.predict_proba(X)
+            # Class 0 is normal for both targets; multi-class models report 1 - P(normal)
+            probabilities = proba[:, 1] if proba.shape[1] == 2 else 1.0 - proba[:, 0]
+            predictions = self.model.classes_[proba.argmax(axis=1)]
+        else:
+            probabilities = None
+            predictions = self.model.predict(X)
+            if self.model_name == 'IsolationForest':
+                predictions = (predictions == -1).astype(int)
+        return predictions, probabilities
+
+class ServingStats:
+    """Request latency percentiles and throughput over a sliding window"""
+    
+    def __init__(self, window=10000):
+        self.latencies = deque(maxlen=window)
+        self.requests = 0
+        self.records = 0
+        self.batches = 0
+        self.errors = 0
+        self.started = None
+    
+    def record_batch(self, n_records):
+        self.batches += 1
+        self.records += n_records
+    
+    def record_request(self, latency):
+        if self.started is None:
+            self.started = time.perf_counter() - latency
+        self.requests += 1
+        self.latencies.append(latency)
+    
+    def snapshot(self):
+        latencies = np.fromiter(self.latencies, dtype=np.float64)
+        elapsed = time.perf_counter() - self.started if self.started else 0.0
+        return {
+            'requests': self.requests,
+            'records': self.records,
+            'batches': self.batches,
+            'errors': self.errors,
+            'mean_batch_records': self.records / self.batches if self.batches else 0.0,
+            'p50_ms': float(np.percentile(latencies, 50) * 1e3) if len(latencies) else None,
+            'p99_ms': float(np.percentile(latencies, 99) * 1e3) if len(latencies) else None,
+            'records_per_sec': self.records / elapsed if elapsed else 0.0,
+        }
+
+class MicroBatcher:
+    """Collect concurrent requests into one predict call per batch or deadline"""
+    
+    def __init__(self, scorer, max_batch_records=1024, max_wait_ms=5.0, stats=None):
+        self.scorer = scorer
+        self.max_batch_records = max_batch_records
+        self.max_wait = max_wait_ms / 1000
+        self.stats = stats or ServingStats()
+        self.queue = asyncio.Queue()
+        self._worker = None
+    
+    def start(self):
+        self._worker = asyncio.get_running_loop().create_task(self._run())
+    
+    async def stop(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+    
+    async def submit(self, records):
+        """Queue records and wait for their (predictions, probabilities)"""
+        # Malformed requests fail here, alone, instead of inside a batch shared with others
+        records = self.scorer.normalize(records)
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((records, future))
+        return await future
+    
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            n_records = len(batch[0][0])
+            deadline = loop.time() + self.max_wait
+            
+            # Keep collecting until the batch is full or the oldest request hits its deadline
+            while n_records < self.max_batch_records:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                batch.append(item)
+                n_records += len(item[0])
+            
+            records = [record for request, _ in batch for record in request]
+            try:
+                # Scoring runs off the event loop so new requests keep queueing meanwhile
+                predictions, probabilities = await loop.run_in_executor(None, self.scorer.score, records)
+            except Exception:
+                # Score the requests one at a time so only the one that fails gets the error
+                for request, future in batch:
+                    try:
+                        result = await loop.run_in_executor(None, self.scorer.score, request)
+                    except Exception as e:
+                        self.stats.errors += 1
+                        if not future.done():
+                            future.set_exception(e)
+                        continue
+                    self.stats.record_batch(len(request))
+                    if not future.done():
+                        future.set_result(result)
+                continue
+            
+            self.stats.record_batch(n_records)
+            offset = 0
+            for request, future in batch:
+                end = offset + len(request)
+                probs = None if probabilities is None else probabilities[offset:end]
+                if not future.done():
+                    future.set_result((predictions[offset:end], probs))
+                offset = end
+
+class ScoringServer:
+    """Minimal asyncio HTTP/1.1 front end: POST /score, GET /metrics, GET /health"""
+    
+    def __init__(self, batcher, host='127.0.0.1', port=8080):
+        self.batcher = batcher
+        self.host = host
+        self.port = port
+    
+    async def serve_forever(self):
+        self.batcher.start()
+        server = await asyncio.start_server(self._handle, self.host, self.port)
+        print(f"🛡️  BlackWall scoring on http://{self.host}:{self.port} "
+              f"(batch ≤{self.batcher.max_batch_records} records, wait ≤{self.batcher.max_wait * 1e3:.1f} ms)")
+        async with server:
+            await server.serve_forever()
+    
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode('latin-1').split(' ', 2)
+                
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    key, _, value = line.decode('latin-1').partition(':')
+                    headers[key.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get('content-length', 0)))
+                
+                status, payload = await self._route(method, path, body)
+                data = json.dumps(payload).encode()
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                writer.write(f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n"
+                             f"Content-Length: {len(data)}\r\n"
+                             f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + data)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+    
+    async def _route(self, method, path, body):
+        if method == 'GET' and path == '/health':
+            return '200 OK', {'status': 'ok', 'model': self.batcher.scorer.model_name}
+        if method == 'GET' and path == '/metrics':
+            return '200 OK', self.batcher.stats.snapshot()
+        if method != 'POST' or path != '/score':
+            return '404 Not Found', {'error': f"{method} {path} not found"}
+        
+        start = time.perf_counter()
+        try:
+            request = json.loads(body)
+            records = request['records'] if isinstance(request, dict) else request
+            if not records:
+                return '400 Bad Request', {'error': "no records"}
+            predictions, probabilities = await self.batcher.submit(records)
+        except (ValueError, KeyError, TypeError) as e:
+            return '400 Bad Request', {'error': str(e)}
+        except Exception as e:
+            return '500 Internal Server Error', {'error': str(e)}
+        self.batcher.stats.record_request(time.perf_counter() - start)
+        
+        response = {'predictions': predictions.tolist()}
+        if probabilities is not None:
+            response['probabilities'] = probabilities.tolist()
+        return '200 OK', response
@@ -0,0 +1,227 @@
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+
+from src.schema import FEATURE_COLUMNS, CATEGORICAL_VOCABULARIES, NUMERIC_DTYPES, SERVICES, FLAGS, PROTOCOL_TYPES
+from src.nsld_kdd_decoder import NSLKDDDecoder
+
+RATE_STRINGS = np.array([f"{i / 100:.2f}" for i in range(101)], dtype=object)
+
+def _write_shard(generator, path, n_rows, seed, chunk_rows):
+    """Worker entry point: one shard file from its own seed"""
+    generator.write(path, n_rows, seed=seed, chunk_rows=chunk_rows)
+    return path
+
+class SyntheticTrafficGenerator:
+    """NSL-KDD-shaped traffic sampled from class-conditional distributions fitted on a sample"""
+    
+    # Quantiles kept per numeric column and class; the top TAIL_FRACTION gets a Pareto tail
+    N_QUANTILES = 256
+    TAIL_FRACTION = 0.01
+    
+    def __init__(self, class_mix=None):
+        # class_mix: optional {'normal': 0.5, 'dos': 0.3, ...} overriding the sample's class mix
+        self.class_mix = class_mix
+        self.classes = None
+    
+    @staticmethod
+    def attack_classes(labels):
+        """Attack category of each label via NSLKDDDecoder (unknown names → 'unknown')"""
+        categories = NSLKDDDecoder.categorize_attacks(labels).add_categories('unknown').fillna('unknown')
+        return np.asarray(categories, dtype=object)
+    
+    def fit(self, df):
+        """Fit per-class label, categorical and numeric distributions from a loaded sample"""
+        classes = self.attack_classes(df['label'].astype('object').to_numpy())
+        names, counts = np.unique(classes, return_counts=True)
+        self.classes = names.tolist()
+        self.class_p = counts / counts.sum()
+        
+        self.labels = {}
+        self.categorical = {}
+        self.numeric = {}
+        self.difficulty = {}
+        probs = np.linspace(0, 1 - self.TAIL_FRACTION, self.N_QUANTILES)
+        for cls in self.classes:
+            part = df[classes == cls]
+            labels = part['label'].astype('object').value_counts()
+            self.labels[cls] = (labels.index.tolist(), (labels / labels.sum()).tolist())
+            
+            self.categorical[cls] = {}
+            for col, vocab in CATEGORICAL_VOCABULARIES.items():
+                freq = part[col].astype('object').value_counts().reindex(vocab, fill_value=0).to_numpy(np.float64)
+                self.categorical[cls][col] = (freq / freq.sum()).tolist()
+            
+            self.numeric[cls] = {}
+            for col in FEATURE_COLUMNS:
+                if col in CATEGORICAL_VOCABULARIES:
+                    continue
+                values = part[col].to_numpy(np.float64)
+                self.numeric[cls][col] = {'quantiles': np.quantile(values, probs).tolist(),
+                                          'tail': self._pareto_tail(values)}
+            
+            if 'difficulty' in part:
+                self.difficulty[cls] = np.quantile(part['difficulty'].to_numpy(np.float64), probs).tolist()
+        return self
+    
+    def _pareto_tail(self, values):
+        """(threshold, alpha) of a Hill-estimated Pareto tail above the top quantile, or None"""
+        threshold = np.quantile(values, 1 - self.TAIL_FRACTION)
+        tail = values[values > threshold]
+        # Bounded features (counts, flags) keep the plain quantile table
+        if threshold <= 0 or len(tail) < 10 or values.max() < 10 * threshold:
+            return None
+        alpha = 1.0 / np.mean(np.log(tail / threshold))
+        return [float(threshold), float(alpha)]
+    
+    def sample(self, n, rng):
+        """n rows as a dict of numpy columns (features, label, difficulty)"""
+        if self.classes is None:
+            raise ValueError("Call fit() or load() before sampling")
+        class_p = self.class_p
+        if self.class_mix is not None:
+            class_p = np.array([self.class_mix.get(cls, 0.0) for cls in self.classes], dtype=np.float64)
+            class_p /= class_p.sum()
+        
+        class_idx = rng.choice(len(self.classes), n, p=class_p)
+        columns = {col: np.empty(n, dtype=object if col in CATEGORICAL_VOCABULARIES else NUMERIC_DTYPES[col])
+                   for col in FEATURE_COLUMNS}
+        columns['label'] = np.empty(n, dtype=object)
+        columns['difficulty'] = np.empty(n, dtype=np.int8)
+        probs = np.linspace(0, 1 - self.TAIL_FRACTION, self.N_QUANTILES)
+        
+        for i, cls in enumerate(self.classes):
+            rows = np.flatnonzero(class_idx == i)
+            m = len(rows)
+            if m == 0:
+                continue
+            labels, label_p = self.labels[cls]
+            columns['label'][rows] = np.asarray(labels, dtype=object)[rng.choice(len(labels), m, p=label_p)]
+            for col, vocab in CATEGORICAL_VOCABULARIES.items():
+                columns[col][rows] = np.asarray(vocab, dtype=object)[rng.choice(len(vocab), m, p=self.categorical[cls][col])]
+            
+            for col, spec in self.numeric[cls].items():
+                values = self._inverse_cdf(rng.random(m), probs, spec)
+                dtype = NUMERIC_DTYPES[col]
+                if dtype == np.float32:
+                    # Rate features stay in [0, 1] at the file's two-decimal precision
+                    values = np.round(np.clip(values, 0.0, 1.0), 2)
+                else:
+                    values = np.clip(np.round(values), 0, np.iinfo(dtype).max)
+                columns[col][rows] = values
+            
+            quantiles = self.difficulty.get(cls)
+            if quantiles is None:
+                columns['difficulty'][rows] = rng.integers(0, 22, m)
+            else:
+                columns['difficulty'][rows] = np.round(np.interp(rng.random(m) * (1 - self.TAIL_FRACTION),
+                                                                 probs, quantiles))
+        return columns
+    
+    def _inverse_cdf(self, u, probs, spec):
+        """Map uniforms through the quantile table, switching to the Pareto tail at the top"""
+        values = np.interp(np.minimum(u, probs[-1]), probs, spec['quantiles'])
+        tail = spec['tail']
+        in_tail = u > probs[-1]
+        if tail is not None and in_tail.any():
+            threshold, alpha = tail
+            v = (u[in_tail] - probs[-1]) / (1 - probs[-1])
+            values[in_tail] = threshold * (1 - v) ** (-1 / alpha)
+        return values
+    
+    def write(self, path, n_rows, seed=0, chunk_rows=50000):
+        """Write n_rows as a 43-field KDD file; memory is bounded by chunk_rows"""
+        rng = np.random.default_rng(seed)
+        with open(path, 'w') as f:
+            for start in range(0, n_rows, chunk_rows):
+                f.write(self.format_rows(self.sample(min(chunk_rows, n_rows - start), rng)))
+        return path
+    
+    @staticmethod
+    def format_rows(columns):
+        """Comma-separated text for sampled columns (about 4x faster than DataFrame.to_csv)"""
+        fields = []
+        for col in FEATURE_COLUMNS + ['label', 'difficulty']:
+            values = columns[col]
+            if values.dtype == object:
+                fields.append(values.tolist())
+            elif values.dtype == np.float32:
+                # Rates are multiples of 0.01, so a 101-entry lookup replaces float formatting
+                fields.append(RATE_STRINGS[np.rint(values * 100).astype(np.intp)].tolist())
+            else:
+                fields.append(values.astype(str).tolist())
+        return '\n'.join(map(','.join, zip(*fields))) + '\n'
+    
+    def write_shards(self, prefix, n_rows, n_shards=1, n_jobs=1, seed=0, chunk_rows=50000):
+        """Split n_rows over n_shards files written by n_jobs processes; returns the paths"""
+        os.makedirs(os.path.dirname(prefix) or '.', exist_ok=True)
+        seeds = np.random.SeedSequence(seed).spawn(n_shards)
+        sizes = [n_rows // n_shards + (i < n_rows % n_shards) for i in range(n_shards)]
+        paths = [f"{prefix}-{i:05d}.txt" for i in range(n_shards)]
+        
+        if n_jobs == 1 or n_shards == 1:
+            return [self.write(path, size, seed_seq, chunk_rows)
+                    for path, size, seed_seq in zip(paths, sizes, seeds)]
+        
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=n_jobs, mp_context=context) as pool:
+            futures = [pool.submit(_write_shard, self, path, size, seed_seq, chunk_rows)
+                       for path, size, seed_seq in zip(paths, sizes, seeds)]
+            return [future.result() for future in futures]
+    
+    def save(self, path):
+        """Store the fitted distributions as JSON"""
+        state = {key: getattr(self, key) for key in
+                 ('class_mix', 'classes', 'labels', 'categorical', 'numeric', 'difficulty')}
+        state['class_p'] = np.asarray(self.class_p).tolist()
+        with open(path, 'w') as f:
+            json.dump(state, f)
+    
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            state = json.load(f)
+        generator = cls(state.pop('class_mix'))
+        state['class_p'] = np.asarray(state['class_p'])
+        for key, value in state.items():
+            setattr(generator, key, value)
+        return generator
+    
+    @staticmethod
+    def prior_sample(n=20000, seed=0):
+        """Hand-set NSL-KDD-like sample for fitting when no real data is available"""
+        rng = np.random.default_rng(seed)
+        attacks = np.array([label for label in NSLKDDDecoder.LABEL_MAPPING if label != 'normal'])
+        service_p = np.ones(len(SERVICES))
+        service_p[SERVICES.index('http')] = 60
+        service_p[SERVICES.index('private')] = 30
+        service_p /= service_p.sum()
+        
+        attack = rng.random(n) < 0.47
+        frame = {
+            'protocol_type': rng.choice(PROTOCOL_TYPES, n, p=[0.07, 0.82, 0.11]),
+            'service': rng.choice(SERVICES, n, p=service_p),
+            'flag': np.where(attack & (rng.random(n) < 0.6), 'S0',
+                             np.where(rng.random(n) < 0.9, 'SF', rng.choice(FLAGS, n))),
+        }
+        for col in FEATURE_COLUMNS:
+            if col in frame:
+                continue
+            if NUMERIC_DTYPES[col] == np.float32:
+                values = np.where(rng.random(n) < 0.8, 0.0, np.round(rng.random(n), 2))
+                if 'serror' in col:
+                    values = np.where(attack & (rng.random(n) < 0.6), 1.0, values)
+            elif col in ('count', 'srv_count', 'dst_host_count', 'dst_host_srv_count'):
+                values = rng.integers(1, 255, n)
+            elif col in ('src_bytes', 'dst_bytes'):
+                # Log-normal payload sizes give the heavy right tail seen in real captures
+                values = np.where(rng.random(n) < 0.4, 0, rng.lognormal(6, 2, n).astype(np.int64))
+            else:
+                values = np.where(rng.random(n) < 0.95, 0, rng.integers(0, 3, n))
+            frame[col] = values
+        frame['label'] = np.where(attack, rng.choice(attacks, n), 'normal')
+        frame['difficulty'] = rng.integers(0, 22, n)
+        return pd.DataFrame(frame)
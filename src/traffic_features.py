@@ -0,0 +1,220 @@
+from collections import deque
+import numpy as np
+import pandas as pd
+
+from src.schema import FEATURE_COLUMNS, CATEGORICAL_VOCABULARIES, NUMERIC_DTYPES
+
+# KDD error classes: half-open/unanswered SYNs and rejected connections
+SERROR_FLAGS = frozenset({'S0', 'S1', 'S2', 'S3'})
+RERROR_FLAGS = frozenset({'REJ'})
+
+# Fallback service names for logs that only carry a destination port
+PORT_SERVICES = {
+    ('tcp', 20): 'ftp_data', ('tcp', 21): 'ftp', ('tcp', 22): 'ssh', ('tcp', 23): 'telnet',
+    ('tcp', 25): 'smtp', ('tcp', 53): 'domain', ('udp', 53): 'domain_u', ('tcp', 79): 'finger',
+    ('tcp', 80): 'http', ('tcp', 110): 'pop_3', ('tcp', 113): 'auth', ('udp', 123): 'ntp_u',
+    ('tcp', 143): 'imap4', ('tcp', 443): 'http_443', ('tcp', 6667): 'IRC',
+}
+
+# Features computed from the windows; every other feature is copied from the connection
+TIME_FEATURES = ['count', 'srv_count', 'serror_rate', 'srv_serror_rate', 'rerror_rate',
+                 'srv_rerror_rate', 'same_srv_rate', 'diff_srv_rate', 'srv_diff_host_rate']
+HOST_FEATURES = ['dst_host_count', 'dst_host_srv_count', 'dst_host_same_srv_rate',
+                 'dst_host_diff_srv_rate', 'dst_host_same_src_port_rate', 'dst_host_srv_diff_host_rate',
+                 'dst_host_serror_rate', 'dst_host_srv_serror_rate', 'dst_host_rerror_rate',
+                 'dst_host_srv_rerror_rate']
+
+# Copied from the connection when present (0 otherwise); the window features are computed
+PASSTHROUGH_FEATURES = frozenset(FEATURE_COLUMNS) - set(TIME_FEATURES) - set(HOST_FEATURES)
+
+# KDD'99 saturates the 2-second counts at 511; the host counts can't exceed their int16 column
+COUNT_CAP = 511
+HOST_COUNT_CAP = int(np.iinfo(NUMERIC_DTYPES['dst_host_count']).max)
+
+def _cap(n, cap):
+    # Rates still use the true counts; only the reported counts saturate
+    return np.minimum(n, cap) if isinstance(n, np.ndarray) else min(n, cap)
+
+def _rate(num, den):
+    # KDD files carry rates at two decimals; integer half-up rounding is exact for ints and arrays
+    return (200 * num + den) // (2 * den) / 100
+
+def window_features(counts):
+    """Time- and host-window features from the 15 window counts (ints, or arrays of them)"""
+    (count, srv_count, same_srv, serror, srv_serror, rerror, srv_rerror,
+     host_count, host_srv_count, host_same_srv, host_same_port, host_serror,
+     host_srv_serror, host_rerror, host_srv_rerror) = counts
+    return {
+        'count': _cap(count, COUNT_CAP),
+        'srv_count': _cap(srv_count, COUNT_CAP),
+        'serror_rate': _rate(serror, count),
+        'srv_serror_rate': _rate(srv_serror, srv_count),
+        'rerror_rate': _rate(rerror, count),
+        'srv_rerror_rate': _rate(srv_rerror, srv_count),
+        'same_srv_rate': _rate(same_srv, count),
+        'diff_srv_rate': _rate(count - same_srv, count),
+        'srv_diff_host_rate': _rate(srv_count - same_srv, srv_count),
+        'dst_host_count': _cap(host_count, HOST_COUNT_CAP),
+        'dst_host_srv_count': _cap(host_srv_count, HOST_COUNT_CAP),
+        'dst_host_same_srv_rate': _rate(host_same_srv, host_count),
+        'dst_host_diff_srv_rate': _rate(host_count - host_same_srv, host_count),
+        'dst_host_same_src_port_rate': _rate(host_same_port, host_count),
+        'dst_host_srv_diff_host_rate': _rate(host_srv_count - host_same_srv, host_srv_count),
+        'dst_host_serror_rate': _rate(host_serror, host_count),
+        'dst_host_srv_serror_rate': _rate(host_srv_serror, host_srv_count),
+        'dst_host_rerror_rate': _rate(host_rerror, host_count),
+        'dst_host_srv_rerror_rate': _rate(host_srv_rerror, host_srv_count),
+    }
+
+class _WindowCounts:
+    """Connection counts per host, service, host+service, host+source port and error class"""
+    
+    def __init__(self):
+        self.counts = {}
+    
+    def add(self, keys):
+        counts = self.counts
+        for key in keys:
+            counts[key] = counts.get(key, 0) + 1
+    
+    def remove(self, keys):
+        counts = self.counts
+        for key in keys:
+            n = counts[key] - 1
+            # Dropping zero entries keeps memory proportional to the window, not to hosts ever seen
+            if n:
+                counts[key] = n
+            else:
+                del counts[key]
+
+class TrafficFeatureExtractor:
+    """NSL-KDD features for a time-ordered stream of connection records, one O(1) update each"""
+    
+    def __init__(self, time_window=2.0, host_window=100):
+        # Time-based features cover connections in the last time_window seconds, host-based ones
+        # the last host_window connections (KDD's definitions); both windows include the current one
+        self.time_window = time_window
+        self.host_window = host_window
+        self._time_queue = deque()
+        self._host_queue = deque()
+        self._time_counts = _WindowCounts()
+        self._host_counts = _WindowCounts()
+        self._last_ts = float('-inf')
+        self._template = dict.fromkeys(FEATURE_COLUMNS, 0)
+    
+    @staticmethod
+    def service_of(connection):
+        service = connection.get('service')
+        if service:
+            return service
+        return PORT_SERVICES.get((connection['protocol_type'], connection.get('dst_port')), 'other')
+    
+    @staticmethod
+    def window_keys(dst, service, src_port, flag):
+        """Counter keys one connection contributes to both windows"""
+        keys = [('h', dst), ('s', service), ('hs', dst, service), ('hp', dst, src_port)]
+        if flag in SERROR_FLAGS:
+            keys += [('hse', dst), ('sse', service)]
+        elif flag in RERROR_FLAGS:
+            keys += [('hre', dst), ('sre', service)]
+        return keys
+    
+    def update(self, connection):
+        """Add one connection and return its 41 features as a dict in FEATURE_COLUMNS order"""
+        # connection: ts, src, src_port, dst, dst_port, protocol_type, flag, plus optional service
+        # and any basic/content feature (duration, src_bytes, hot, ...; missing ones are 0)
+        service, counts = self.push(connection)
+        features = self._template.copy()
+        for col in PASSTHROUGH_FEATURES.intersection(connection):
+            features[col] = connection[col]
+        features['service'] = service
+        if 'land' not in connection:
+            features['land'] = int(connection.get('src') == connection['dst']
+                                   and connection.get('src_port') == connection.get('dst_port'))
+        features.update(window_features(counts))
+        return features
+    
+    def push(self, connection):
+        """Slide both windows forward by one connection; returns (service, window counts)"""
+        ts = connection['ts']
+        if ts < self._last_ts:
+            raise ValueError(f"Connections must arrive in time order ({ts} after {self._last_ts})")
+        self._last_ts = ts
+        
+        dst, service, flag = connection['dst'], self.service_of(connection), connection['flag']
+        src_port = connection.get('src_port')
+        keys = self.window_keys(dst, service, src_port, flag)
+        
+        time_queue, time_counts = self._time_queue, self._time_counts
+        horizon = ts - self.time_window
+        while time_queue and time_queue[0][0] < horizon:
+            time_counts.remove(time_queue.popleft()[1])
+        time_queue.append((ts, keys))
+        time_counts.add(keys)
+        
+        host_queue, host_counts = self._host_queue, self._host_counts
+        if len(host_queue) == self.host_window:
+            host_counts.remove(host_queue.popleft())
+        host_queue.append(keys)
+        host_counts.add(keys)
+        return service, self.window_counts(dst, service, src_port)
+    
+    def window_counts(self, dst, service, src_port):
+        """The 15 window counts behind the time and host features of the latest connection"""
+        get = self._time_counts.counts.get
+        time_counts = (get(('h', dst), 0), get(('s', service), 0), get(('hs', dst, service), 0),
+                       get(('hse', dst), 0), get(('sse', service), 0), get(('hre', dst), 0),
+                       get(('sre', service), 0))
+        get = self._host_counts.counts.get
+        return time_counts + (get(('h', dst), 0), get(('s', service), 0), get(('hs', dst, service), 0),
+                              get(('hp', dst, src_port), 0), get(('hse', dst), 0), get(('sse', service), 0),
+                              get(('hre', dst), 0), get(('sre', service), 0))
+    
+    def extract(self, connections):
+        """Feature dicts for an iterable of connections, lazily"""
+        for connection in connections:
+            yield self.update(connection)
+    
+    def extract_frame(self, connections):
+        """Features as a DataFrame typed like NSLKDDLoader output (ready for CyberPreprocessor)"""
+        # Only the window bookkeeping runs per connection; rates and columns are built vectorized
+        connections = list(connections)
+        services, counts = [], []
+        for connection in connections:
+            service, window = self.push(connection)
+            services.append(service)
+            counts.append(window)
+        records = pd.DataFrame.from_records(connections)
+        counts = np.array(counts, dtype=np.int64).reshape(-1, 15).T
+        
+        columns = window_features(counts)
+        columns['service'] = services
+        if 'land' not in records and {'src', 'src_port', 'dst_port'} <= set(records.columns):
+            columns['land'] = ((records['src'] == records['dst'])
+                               & (records['src_port'] == records['dst_port'])).to_numpy()
+        
+        data = {}
+        for col in FEATURE_COLUMNS:
+            if col in columns:
+                values = columns[col]
+            elif col in records:
+                # Fields missing from some records default to 0 like in update()
+                values = records[col].fillna(0).to_numpy()
+            else:
+                values = np.zeros(len(connections))
+            if col in CATEGORICAL_VOCABULARIES:
+                data[col] = pd.Categorical(values, categories=CATEGORICAL_VOCABULARIES[col])
+            else:
+                values = np.asarray(values)
+                dtype = np.dtype(NUMERIC_DTYPES[col])
+                # Window counts are capped above; a passthrough field too large for its column is an error
+                if dtype.kind == 'i' and len(values) and (values.min() < np.iinfo(dtype).min
+                                                          or values.max() > np.iinfo(dtype).max):
+                    raise ValueError(f"{col} values outside the {dtype.name} range of the loader schema")
+                data[col] = values.astype(dtype)
+        return pd.DataFrame(data)
+    
+    @property
+    def n_tracked(self):
+        """Connections currently held in the time and host windows"""
+        return len(self._time_queue), len(self._host_queue)
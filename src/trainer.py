@@ -0,0 +1,169 @@
+import contextlib
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import numpy as np
+from scipy import sparse as sp
+from threadpoolctl import threadpool_limits
+
+from src.instrumentation import reset_peak_rss, peak_rss_mb, profiled, report
+
+def _share_array(path, X):
+    """Write X under path so workers can memory-map it instead of unpickling a copy"""
+    if sp.issparse(X):
+        X = X.tocsr()
+        for part in ('data', 'indices', 'indptr'):
+            np.save(f"{path}.{part}.npy", getattr(X, part))
+        return ('csr', path, X.shape)
+    np.save(f"{path}.npy", np.asarray(X))
+    return ('dense', path, None)
+
+def _open_shared(ref):
+    """Reopen an array written by _share_array as a read-only memmap"""
+    kind, path, shape = ref
+    if kind == 'csr':
+        parts = [np.load(f"{path}.{part}.npy", mmap_mode='r') for part in ('data', 'indices', 'indptr')]
+        return sp.csr_matrix(tuple(parts), shape=shape, copy=False)
+    return np.load(f"{path}.npy", mmap_mode='r')
+
+def _fit_model(name, model, model_manager, inputs, n_threads, profile=False):
+    """Fit one model and predict the test set; errors are returned, not raised.
+    
+    profile=True runs the fit under cProfile + tracemalloc and returns result['profile']
+    """
+    result = {'name': name, 'model': None, 'y_pred': None, 'error': None, 'n_threads': n_threads,
+              'profile': None}
+    reset_peak_rss()
+    start = time.perf_counter()
+    try:
+        if name in model_manager.PARALLEL_MODELS and 'n_jobs' in model.get_params():
+            model.set_params(n_jobs=n_threads)
+        X_fit = model_manager.prepare_input(name, inputs['X_train'], inputs.get('X_train_ordinal'))
+        X_eval = model_manager.prepare_input(name, inputs['X_test'], inputs.get('X_test_ordinal'))
+        y_train = inputs['y_train']
+        # Weighted rows (collapsed duplicates, subsampled classes) count sample_weight times
+        fit_params = {'sample_weight': inputs['sample_weight']} if 'sample_weight' in inputs else {}
+        
+        with threadpool_limits(limits=n_threads), \
+                (profiled() if profile else contextlib.nullcontext({})) as profiling:
+            if name == 'IsolationForest':
+                # IsolationForest is unsupervised
+                model.fit(X_fit, **fit_params)
+                y_pred = (model.predict(X_eval) == -1).astype(int)  # Convert to binary
+            else:
+                model.fit(X_fit, y_train, **fit_params)
+                y_pred = model.predict(X_eval)
+        
+        result['model'] = model
+        result['y_pred'] = y_pred
+        result['profile'] = profiling.get('profile')
+    except Exception as e:
+        result['error'] = f"{e}\n{traceback.format_exc()}"
+    result['wall_time'] = time.perf_counter() - start
+    result['peak_rss_mb'] = peak_rss_mb()
+    return result
+
+def _failed_result(name, error, n_threads):
+    return {'name': name, 'model': None, 'y_pred': None, 'error': error,
+            'wall_time': None, 'peak_rss_mb': None, 'n_threads': n_threads, 'profile': None}
+
+def _fit_worker(name, model, model_manager, refs, n_threads, profile=False):
+    """Process-pool entry point: reopen the shared inputs and fit one model"""
+    inputs = {key: _open_shared(ref) for key, ref in refs.items()}
+    return _fit_model(name, model, model_manager, inputs, n_threads, profile)
+
+class ParallelTrainer:
+    """Fit BlackWall models concurrently across worker processes"""
+    
+    def __init__(self, n_jobs=-1, tmp_dir=None):
+        self.n_jobs = n_jobs
+        self.tmp_dir = tmp_dir
+    
+    def plan(self, models, parallel_models=()):
+        """Split cores between concurrent models and threads inside each model"""
+        cores = os.cpu_count() or 1
+        total = cores if self.n_jobs is None or self.n_jobs < 1 else min(self.n_jobs, cores)
+        n_workers = max(1, min(len(models), total))
+        
+        threads = {name: max(1, total // n_workers) for name in models}
+        # Hand leftover cores to models that can use them (e.g. RandomForest trees)
+        spare = total - n_workers * (total // n_workers)
+        for name in models:
+            if spare <= 0:
+                break
+            if name in parallel_models:
+                threads[name] += 1
+                spare -= 1
+        return n_workers, threads
+    
+    def train(self, models, model_manager, X_train, y_train, X_test,
+              X_train_ordinal=None, X_test_ordinal=None, sample_weight=None, profile=False):
+        """Fit every model and return {name: result} with timing and memory per model.
+        
+        profile=True profiles each fit where it runs (in its worker) into result['profile']
+        """
+        inputs = {'X_train': X_train, 'y_train': np.asarray(y_train), 'X_test': X_test}
+        if X_train_ordinal is not None:
+            inputs.update(X_train_ordinal=X_train_ordinal, X_test_ordinal=X_test_ordinal)
+        if sample_weight is not None:
+            inputs['sample_weight'] = np.asarray(sample_weight)
+        
+        n_workers, threads = self.plan(models, model_manager.PARALLEL_MODELS)
+        report(f"   🧵 Training {len(models)} models on {n_workers} worker(s): "
+              f"{', '.join(f'{name}={n}' for name, n in threads.items())} thread(s)")
+        
+        if n_workers == 1:
+            results = {name: _fit_model(name, model, model_manager, inputs, threads[name], profile)
+                       for name, model in models.items()}
+            self._collect(model_manager, results)
+            return results
+        
+        shared_dir = tempfile.mkdtemp(prefix='blackwall_', dir=self.tmp_dir)
+        try:
+            refs = {key: _share_array(os.path.join(shared_dir, key), value)
+                    for key, value in inputs.items()}
+            results, broken = self._run_pool(models, model_manager, refs, threads, n_workers, profile)
+            # A dead worker breaks the whole pool and every unfinished future with it; rerun those
+            # models one per pool so only the model whose own worker dies is marked failed
+            for name in broken:
+                solo, crashed = self._run_pool({name: models[name]}, model_manager, refs, threads, 1, profile)
+                results.update(solo)
+                if crashed:
+                    results[name] = _failed_result(name, "worker process died (e.g. out of memory)",
+                                                   threads[name])
+        finally:
+            shutil.rmtree(shared_dir, ignore_errors=True)
+        
+        results = {name: results[name] for name in models}
+        self._collect(model_manager, results)
+        return results
+    
+    def _run_pool(self, models, model_manager, refs, threads, n_workers, profile=False):
+        """Fit models on one spawn pool; returns (results, names left unfinished by a broken pool)"""
+        results, broken = {}, []
+        # One task per process so each model's peak RSS is its own
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=n_workers, mp_context=context,
+                                 max_tasks_per_child=1) as pool:
+            futures = {name: pool.submit(_fit_worker, name, model, model_manager, refs,
+                                         threads[name], profile)
+                       for name, model in models.items()}
+            for name, future in futures.items():
+                try:
+                    results[name] = future.result()
+                except BrokenProcessPool:
+                    broken.append(name)
+                except Exception as e:
+                    results[name] = _failed_result(name, str(e), threads[name])
+        return results, broken
+    
+    def _collect(self, model_manager, results):
+        """Replace the manager's unfitted models with the fitted copies"""
+        for name, result in results.items():
+            if result['model'] is not None:
+                model_manager.models[name] = result['model']
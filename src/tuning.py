@@ -0,0 +1,166 @@
+import hashlib
+import json
+import os
+import time
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.metrics import get_scorer
+from sklearn.model_selection import ParameterGrid, StratifiedKFold
+
+def _fit_and_score(model, scorer, X, y, train_idx, val_idx, sample_weight=None):
+    """Fit one candidate on one fold and score it on the held-out part (both weighted if given)"""
+    if sample_weight is None:
+        model.fit(X[train_idx], y[train_idx])
+        return float(scorer(model, X[val_idx], y[val_idx]))
+    model.fit(X[train_idx], y[train_idx], sample_weight=sample_weight[train_idx])
+    return float(scorer(model, X[val_idx], y[val_idx], sample_weight=sample_weight[val_idx]))
+
+class SuccessiveHalvingSearch:
+    """Budget-aware successive halving over training-set size with resumable fold results"""
+    
+    def __init__(self, estimator, param_grid, factor=3, min_resources=2000, cv=3,
+                 scoring='f1', n_candidates=None, time_budget=None, cache_path=None,
+                 random_state=42, n_jobs=None):
+        # n_jobs: folds of one candidate are fitted in parallel (joblib semantics, -1 = all cores)
+        self.estimator = estimator
+        self.param_grid = param_grid
+        self.factor = factor
+        self.min_resources = min_resources
+        self.cv = cv
+        self.scoring = scoring
+        self.n_candidates = n_candidates
+        self.time_budget = time_budget
+        self.cache_path = cache_path
+        self.random_state = random_state
+        self.n_jobs = n_jobs
+    
+    def fit(self, X, y, sample_weight=None):
+        """Run halving rounds until one candidate is left, data runs out or the budget is spent"""
+        # sample_weight (e.g. TrainingSetReducer counts) weights every fold fit, fold score and the final fit
+        y = np.asarray(y)
+        if sample_weight is not None:
+            sample_weight = np.asarray(sample_weight, dtype=np.float64)
+        rng = np.random.RandomState(self.random_state)
+        scorer = get_scorer(self.scoring)
+        start = time.perf_counter()
+        
+        candidates = list(ParameterGrid(self.param_grid))
+        if self.n_candidates is not None and self.n_candidates < len(candidates):
+            keep = rng.choice(len(candidates), self.n_candidates, replace=False)
+            candidates = [candidates[i] for i in sorted(keep)]
+        
+        # One fixed stratified ordering so every rung's subsample nests inside the next
+        order = self._stratified_order(y, rng)
+        fingerprint = self._fingerprint(X, y, sample_weight)
+        cache = self._read_cache()
+        
+        self.history_ = []
+        self.budget_exhausted_ = False
+        n_samples = len(y)
+        resources = min(self.min_resources, n_samples)
+        best_scores = {}
+        
+        while True:
+            rows = np.sort(order[:resources])
+            X_rung, y_rung = X[rows], y[rows]
+            w_rung = None if sample_weight is None else sample_weight[rows]
+            folds = list(StratifiedKFold(self.cv, shuffle=True, random_state=self.random_state).split(X_rung, y_rung))
+            
+            rung_scores = []
+            parallel = Parallel(n_jobs=self.n_jobs)
+            for params in candidates:
+                keys = [self._cache_key(fingerprint, params, resources, fold) for fold in range(len(folds))]
+                missing = [fold for fold, key in enumerate(keys) if key not in cache]
+                if missing:
+                    # The budget is checked per candidate; its missing folds are fitted together
+                    if self._out_of_budget(start):
+                        break
+                    fold_scores = parallel(
+                        delayed(_fit_and_score)(clone(self.estimator).set_params(**params), scorer,
+                                                X_rung, y_rung, *folds[fold], w_rung)
+                        for fold in missing)
+                    for fold, score in zip(missing, fold_scores):
+                        cache[keys[fold]] = score
+                        self._append_cache(keys[fold], score)
+                scores = [cache[key] for key in keys]
+                rung_scores.append((float(np.mean(scores)), params))
+                self.history_.append({'resources': resources, 'params': params,
+                                      'mean_score': float(np.mean(scores))})
+            
+            if len(rung_scores) < len(candidates):
+                # Budget ran out mid-rung: fall back to the last complete rung
+                self.budget_exhausted_ = True
+                break
+            
+            rung_scores.sort(key=lambda item: item[0], reverse=True)
+            best_scores = {'resources': resources, 'score': rung_scores[0][0], 'params': rung_scores[0][1]}
+            candidates = [params for _, params in rung_scores[:max(1, len(rung_scores) // self.factor)]]
+            if len(candidates) == 1 or resources >= n_samples:
+                break
+            
+            resources = min(resources * self.factor, n_samples)
+        
+        if not best_scores:
+            raise RuntimeError("Time budget exhausted before the first rung completed")
+        
+        self.best_params_ = best_scores['params']
+        self.best_score_ = best_scores['score']
+        self.best_resources_ = best_scores['resources']
+        self.search_time_ = time.perf_counter() - start
+        
+        self.best_estimator_ = clone(self.estimator).set_params(**self.best_params_)
+        if sample_weight is None:
+            self.best_estimator_.fit(X, y)
+        else:
+            self.best_estimator_.fit(X, y, sample_weight=sample_weight)
+        return self
+    
+    def save_best_params(self, path):
+        """Write the winning parameters and search summary as JSON"""
+        with open(path, 'w') as f:
+            json.dump({'best_params': self.best_params_, 'best_score': self.best_score_,
+                       'resources': self.best_resources_, 'search_time': self.search_time_,
+                       'budget_exhausted': self.budget_exhausted_}, f, indent=2)
+    
+    def _out_of_budget(self, start):
+        return self.time_budget is not None and time.perf_counter() - start > self.time_budget
+    
+    def _stratified_order(self, y, rng):
+        """Row order whose every prefix keeps the class proportions of y"""
+        positions = np.empty(len(y))
+        for cls in np.unique(y):
+            idx = np.flatnonzero(y == cls)
+            rng.shuffle(idx)
+            positions[idx] = (np.arange(len(idx)) + rng.random_sample()) / len(idx)
+        return np.argsort(positions, kind='stable')
+    
+    def _fingerprint(self, X, y, sample_weight=None):
+        """Cheap identity of the training data: shape, labels, weights and a strided row sample"""
+        digest = hashlib.sha1()
+        digest.update(repr((X.shape, type(self.estimator).__name__, sorted(self.estimator.get_params().items()),
+                            self.cv, self.scoring, self.random_state)).encode())
+        digest.update(np.ascontiguousarray(y).tobytes())
+        if sample_weight is not None:
+            digest.update(np.ascontiguousarray(sample_weight).tobytes())
+        sample = X[::max(1, X.shape[0] // 1000)]
+        sample = sample.toarray() if hasattr(sample, 'toarray') else np.asarray(sample)
+        digest.update(np.ascontiguousarray(sample).tobytes())
+        return digest.hexdigest()
+    
+    def _cache_key(self, fingerprint, params, resources, fold):
+        return f"{fingerprint}|{json.dumps(params, sort_keys=True, default=str)}|{resources}|{fold}"
+    
+    def _read_cache(self):
+        cache = {}
+        if self.cache_path and os.path.exists(self.cache_path):
+            with open(self.cache_path) as f:
+                for line in f:
+                    record = json.loads(line)
+                    cache[record['key']] = record['score']
+        return cache
+    
+    def _append_cache(self, key, score):
+        if self.cache_path:
+            with open(self.cache_path, 'a') as f:
+                f.write(json.dumps({'key': key, 'score': score}) + '\n')
@@ -0,0 +1,148 @@
+import html
+import json
+import numpy as np
+
+# matplotlib/seaborn are imported inside the plotting function only, so metrics-only
+# runs (and anything importing the evaluator) never pay their import time
+
+METRIC_KEYS = ['accuracy', 'precision', 'recall', 'f1_score']
+
+def _downsample(x, y, max_points):
+    """Drop repeated points, then keep at most max_points evenly spaced ones (ends included)"""
+    x, y = np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64)
+    keep = np.r_[True, (np.diff(x) != 0) | (np.diff(y) != 0)]
+    x, y = x[keep], y[keep]
+    if len(x) > max_points:
+        index = np.unique(np.linspace(0, len(x) - 1, max_points).round().astype(int))
+        x, y = x[index], y[index]
+    return x, y
+
+def curve_points(result, max_points=200):
+    """Downsampled ROC and PR points from a result's score histogram (None without scores)"""
+    histogram = result.get('score_histogram')
+    if histogram is None or not histogram.n_samples:
+        return None
+    fpr, tpr, _ = histogram.roc_curve()
+    precision, recall, _ = histogram.pr_curve()
+    fpr, tpr = _downsample(fpr, tpr, max_points)
+    recall, precision = _downsample(recall, precision, max_points)
+    return {'roc': {'fpr': fpr.tolist(), 'tpr': tpr.tolist()},
+            'pr': {'recall': recall.tolist(), 'precision': precision.tolist()}}
+
+def metrics_bundle(results, max_points=200):
+    """JSON-ready summary of evaluator results: scalar metrics, confusion matrices, curve points"""
+    bundle = {}
+    for name, result in results.items():
+        entry = {key: float(result[key]) for key in METRIC_KEYS + ['roc_auc'] if key in result}
+        entry['confusion_matrix'] = np.asarray(result['confusion_matrix']).tolist()
+        if 'per_class' in result:
+            entry['per_class'] = {str(label): scores for label, scores in result['per_class'].items()}
+        curves = curve_points(result, max_points)
+        if curves is not None:
+            entry['curves'] = curves
+        bundle[name] = entry
+    return bundle
+
+def json_safe(value):
+    """Replace NaN/inf floats (e.g. ROC AUC of a single-class set) with None for strict JSON"""
+    if isinstance(value, dict):
+        return {key: json_safe(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [json_safe(item) for item in value]
+    if isinstance(value, float) and not np.isfinite(value):
+        return None
+    return value
+
+def write_metrics_json(results, path, max_points=200):
+    with open(path, 'w') as f:
+        json.dump(json_safe(metrics_bundle(results, max_points)), f, indent=2, allow_nan=False)
+
+def _svg_curve(points, x_key, y_key, width=220, height=220):
+    """Inline SVG polyline for one curve in the unit square"""
+    coords = ' '.join(f"{x * width:.1f},{(1 - y) * height:.1f}"
+                      for x, y in zip(points[x_key], points[y_key]))
+    return (f'<svg width="{width}" height="{height}" style="border:1px solid #888">'
+            f'<polyline fill="none" stroke="#c0392b" stroke-width="2" points="{coords}"/></svg>')
+
+def write_metrics_html(results, path, max_points=200):
+    """Standalone HTML report (metric table, confusion matrices, SVG curves) without matplotlib"""
+    bundle = metrics_bundle(results, max_points)
+    rows, details = [], []
+    for name, entry in bundle.items():
+        cells = ''.join(f"<td>{entry[key]:.4f}</td>" if key in entry else "<td>-</td>"
+                        for key in METRIC_KEYS + ['roc_auc'])
+        rows.append(f"<tr><th>{html.escape(name)}</th>{cells}</tr>")
+        
+        matrix = ''.join('<tr>' + ''.join(f"<td>{value:,}</td>" for value in row) + '</tr>'
+                         for row in entry['confusion_matrix'])
+        curves = ''
+        if 'curves' in entry:
+            curves = (_svg_curve(entry['curves']['roc'], 'fpr', 'tpr') + ' ' +
+                      _svg_curve(entry['curves']['pr'], 'recall', 'precision'))
+        details.append(f"<h2>{html.escape(name)}</h2><table border=\"1\">{matrix}</table>"
+                       f"<p>{curves}</p>")
+    
+    header = ''.join(f"<th>{key}</th>" for key in ['model'] + METRIC_KEYS + ['roc_auc'])
+    with open(path, 'w') as f:
+        f.write(f"<!DOCTYPE html><html><head><meta charset=\"utf-8\"><title>BlackWall metrics</title></head>"
+                f"<body><h1>🛡️ BlackWall Performance</h1><table border=\"1\"><tr>{header}</tr>"
+                f"{''.join(rows)}</table>{''.join(details)}"
+                f"<p>Curves: ROC (FPR → TPR) and precision-recall (recall → precision).</p></body></html>")
+
+def plot_performance_dashboard(results, path='blackwall_performance.png', dpi=300, show=False,
+                               max_points=200):
+    """2×2 dashboard: metric bars, best confusion matrix, ROC and PR curves"""
+    # show=False renders on a bare Agg figure: no pyplot state, no GUI backend, nothing blocks
+    if show:
+        import matplotlib.pyplot as plt
+        fig, axes = plt.subplots(2, 2, figsize=(15, 12))
+    else:
+        from matplotlib.figure import Figure
+        fig = Figure(figsize=(15, 12))
+        axes = fig.subplots(2, 2)
+    import seaborn as sns
+    
+    fig.suptitle('🛡️ BlackWall Performance Dashboard', fontsize=16, fontweight='bold')
+    names = list(results)
+    
+    # 1. Model Comparison Bar Chart
+    width = 0.8 / len(METRIC_KEYS)
+    x = np.arange(len(names))
+    for i, key in enumerate(METRIC_KEYS):
+        axes[0, 0].bar(x + (i - (len(METRIC_KEYS) - 1) / 2) * width,
+                       [results[name][key] for name in names], width, label=key)
+    axes[0, 0].set_xticks(x)
+    axes[0, 0].set_xticklabels(names, rotation=45, ha='right')
+    axes[0, 0].set_title('Model Performance Comparison')
+    axes[0, 0].legend()
+    
+    # 2. Confusion Matrix for Best Model
+    best_model = max(names, key=lambda name: results[name]['f1_score'])
+    # Class names (multi-class mode) or 0/1 along both axes
+    class_labels = list(results[best_model].get('per_class', {})) or 'auto'
+    sns.heatmap(np.asarray(results[best_model]['confusion_matrix']), annot=True, fmt='d',
+                cmap='RdYlBu_r', ax=axes[0, 1], xticklabels=class_labels, yticklabels=class_labels)
+    axes[0, 1].set_title(f'Confusion Matrix - {best_model}')
+    axes[0, 1].set_ylabel('Actual')
+    axes[0, 1].set_xlabel('Predicted')
+    
+    # 3./4. ROC and PR curves from histogram points, not per-row probabilities
+    for name in names:
+        curves = curve_points(results[name], max_points)
+        if curves is None:
+            continue
+        auc = results[name].get('roc_auc')
+        axes[1, 0].plot(curves['roc']['fpr'], curves['roc']['tpr'],
+                        label=name if auc is None else f"{name} (AUC {auc:.3f})")
+        axes[1, 1].plot(curves['pr']['recall'], curves['pr']['precision'], label=name)
+    axes[1, 0].plot([0, 1], [0, 1], linestyle='--', color='grey')
+    axes[1, 0].set(title='ROC Curves', xlabel='False Positive Rate', ylabel='True Positive Rate')
+    axes[1, 1].set(title='Precision-Recall Curves', xlabel='Recall', ylabel='Precision')
+    for ax in (axes[1, 0], axes[1, 1]):
+        if ax.get_legend_handles_labels()[0]:
+            ax.legend(loc='lower right' if ax is axes[1, 0] else 'lower left')
+    
+    fig.tight_layout()
+    fig.savefig(path, dpi=dpi, bbox_inches='tight')
+    if show:
+        plt.show()
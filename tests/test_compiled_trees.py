@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import IsolationForest, RandomForestClassifier
+from sklearn.tree import DecisionTreeClassifier
+
+from src import compiled_trees
+from src.compiled_trees import CompiledForest
+from src.data_loader import NSLKDDLoader
+from src.preprocessor import CyberPreprocessor
+
+TRAIN_PATH = "data/NSL_KDD99/KDDTrain+.txt"
+TEST_PATH = "data/NSL_KDD99/KDDTest+.txt"
+
+@pytest.fixture(scope='module')
+def kdd():
+    loader = NSLKDDLoader(cache_dir=None)
+    frames = {}
+    for split, path in (('train', TRAIN_PATH), ('test', TEST_PATH)):
+        df = loader.create_binary_labels(loader.load_file(path), verbose=False)
+        frames[split] = loader.create_category_labels(df, verbose=False)
+    return frames
+
+def encoded(kdd, target_col):
+    train_df, test_df = (df[df[target_col].notna()] for df in (kdd['train'], kdd['test']))
+    preprocessor = CyberPreprocessor().fit(train_df, target_col)
+    return (preprocessor.transform(train_df), preprocessor.target_values(train_df[target_col]),
+            preprocessor.transform(test_df))
+
+@pytest.mark.parametrize('target_col', ['is_attack', 'attack_category'])
+@pytest.mark.parametrize('make_model', [
+    lambda: DecisionTreeClassifier(random_state=42),
+    lambda: RandomForestClassifier(n_estimators=20, random_state=42, n_jobs=1),
+], ids=['DecisionTree', 'RandomForest'])
+@pytest.mark.parametrize('use_numba', [True, False], ids=['numba', 'numpy'])
+def test_predict_proba_matches_sklearn_on_kddtest(kdd, target_col, make_model, use_numba, monkeypatch):
+    if use_numba and not compiled_trees.NUMBA_AVAILABLE:
+        pytest.skip("numba is not installed")
+    monkeypatch.setattr(compiled_trees, 'NUMBA_AVAILABLE', use_numba)
+    X_train, y_train, X_test = encoded(kdd, target_col)
+    model = make_model().fit(X_train, y_train)
+    compiled = CompiledForest.from_model(model)
+    
+    np.testing.assert_array_equal(compiled.predict_proba(X_test), model.predict_proba(X_test))
+    np.testing.assert_array_equal(compiled.predict(X_test), model.predict(X_test))
+
+def test_save_load_roundtrip_is_exact(kdd, tmp_path):
+    X_train, y_train, X_test = encoded(kdd, 'attack_category')
+    model = RandomForestClassifier(n_estimators=10, random_state=42, n_jobs=1).fit(X_train, y_train)
+    CompiledForest.from_model(model).save(tmp_path)
+    loaded = CompiledForest.load(tmp_path)
+    np.testing.assert_array_equal(loaded.predict_proba(X_test), model.predict_proba(X_test))
+
+def test_isolation_forest_is_not_supported(kdd):
+    X_train, _, _ = encoded(kdd, 'is_attack')
+    model = IsolationForest(n_estimators=10, random_state=42).fit(X_train)
+    assert not CompiledForest.supports(model)
+    with pytest.raises(ValueError):
+        CompiledForest.from_model(model)
@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from src.data_loader import NSLKDDLoader
+from src.schema import COLUMNS
+
+TRAIN_PATH = "data/NSL_KDD99/KDDTrain+.txt"
+
+def write_kdd(path, n_rows=150, overrides=()):
+    """The first n_rows of the bundled training file with (row, column, value) cells replaced"""
+    with open(TRAIN_PATH) as f:
+        rows = [next(f).rstrip('\n').split(',') for _ in range(n_rows)]
+    for row, col, value in overrides:
+        rows[row][COLUMNS.index(col)] = str(value)
+    path.write_text(''.join(','.join(row) + '\n' for row in rows))
+    return path
+
+@pytest.mark.parametrize('cached', [False, True], ids=['direct', 'cached'])
+def test_out_of_range_integer_past_the_sampled_rows_is_rejected(tmp_path, cached):
+    # Row 130 is beyond detect_schema's 100-row sample; 40000 would wrap to -25536 as int16
+    path = write_kdd(tmp_path / 'wide.txt', overrides=[(130, 'count', 40000)])
+    loader = NSLKDDLoader(cache_dir=str(tmp_path / 'cache') if cached else None)
+    with pytest.raises(ValueError, match=r"wide\.txt: column count has value 40000 outside the int16 range"):
+        loader.load_file(str(path))
+
+def test_integer_columns_keep_their_schema_dtypes_up_to_the_limit(tmp_path):
+    path = write_kdd(tmp_path / 'edge.txt', overrides=[(130, 'count', 32767), (140, 'land', -128)])
+    df = NSLKDDLoader(cache_dir=None).load_file(str(path))
+    assert df['count'].dtype == np.int16 and df['land'].dtype == np.int8
+    assert df['count'].iloc[130] == 32767 and df['land'].iloc[140] == -128
+
+def test_failed_cache_build_leaves_nothing_behind(tmp_path):
+    path = write_kdd(tmp_path / 'wide.txt', overrides=[(130, 'count', 40000)])
+    cache_dir = tmp_path / 'cache'
+    with pytest.raises(ValueError):
+        NSLKDDLoader(cache_dir=str(cache_dir)).load_file(str(path))
+    assert not cache_dir.exists() or list(cache_dir.iterdir()) == []
@@ -0,0 +1,9 @@
+from src.instrumentation import Instrumentation
+
+def test_disabled_stages_do_not_share_records():
+    instr = Instrumentation(enabled=False)
+    with instr.stage('first') as record:
+        record['rows'] = 10
+    with instr.stage('second') as record:
+        assert record == {}
+    assert instr.records == []
@@ -0,0 +1,97 @@
+from decimal import Decimal, ROUND_HALF_UP
+
+import numpy as np
+import pytest
+
+from src.schema import NUMERIC_DTYPES
+from src.traffic_features import TrafficFeatureExtractor, TIME_FEATURES, HOST_FEATURES, COUNT_CAP
+
+def synthetic_connections(n=400, seed=0):
+    """Connections on a quarter-second grid, so many are exactly time_window apart or simultaneous"""
+    rng = np.random.default_rng(seed)
+    # Steps of 0 (ties) to 0.75s; quarter seconds are exact in binary, so ts - 2.0 hits earlier ts exactly
+    ts = np.cumsum(rng.choice([0.0, 0.25, 0.5, 0.75], n, p=[0.4, 0.3, 0.2, 0.1]))
+    services = ['http', 'smtp', 'private', 'domain_u']
+    flags = ['SF', 'SF', 'S0', 'REJ', 'S1', 'RSTO']
+    return [{'ts': float(ts[i]), 'src': f"10.0.0.{rng.integers(3)}", 'src_port': int(rng.integers(1024, 1028)),
+             'dst': f"192.168.1.{rng.integers(6)}", 'dst_port': 0, 'protocol_type': 'tcp',
+             'service': services[rng.integers(len(services))], 'flag': flags[rng.integers(len(flags))]}
+            for i in range(n)]
+
+def rate(num, den):
+    return float((Decimal(num) / Decimal(den)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP))
+
+def brute_force(connections, time_window, host_window):
+    """Each connection's window features recounted from its full window: O(n * window)"""
+    serror, rerror = {'S0', 'S1', 'S2', 'S3'}, {'REJ'}
+    rows = []
+    for i, current in enumerate(connections):
+        recent = [c for c in connections[:i + 1] if c['ts'] >= current['ts'] - time_window]
+        last = connections[max(0, i - host_window + 1):i + 1]
+        row = {}
+        for prefix, window in (('', recent), ('dst_host_', last)):
+            host = [c for c in window if c['dst'] == current['dst']]
+            srv = [c for c in window if c['service'] == current['service']]
+            host_srv = sum(c['service'] == current['service'] for c in host)
+            count, srv_count = ('count', 'srv_count') if not prefix else ('dst_host_count', 'dst_host_srv_count')
+            cap = COUNT_CAP if not prefix else np.iinfo(NUMERIC_DTYPES[count]).max
+            row[count], row[srv_count] = min(len(host), cap), min(len(srv), cap)
+            row[f'{prefix}serror_rate'] = rate(sum(c['flag'] in serror for c in host), len(host))
+            row[f'{prefix}srv_serror_rate'] = rate(sum(c['flag'] in serror for c in srv), len(srv))
+            row[f'{prefix}rerror_rate'] = rate(sum(c['flag'] in rerror for c in host), len(host))
+            row[f'{prefix}srv_rerror_rate'] = rate(sum(c['flag'] in rerror for c in srv), len(srv))
+            row[f'{prefix}same_srv_rate'] = rate(host_srv, len(host))
+            row[f'{prefix}diff_srv_rate'] = rate(len(host) - host_srv, len(host))
+            row[f'{prefix}srv_diff_host_rate'] = rate(len(srv) - host_srv, len(srv))
+        row['dst_host_same_src_port_rate'] = rate(
+            sum(c['dst'] == current['dst'] and c['src_port'] == current['src_port'] for c in last),
+            sum(c['dst'] == current['dst'] for c in last))
+        rows.append(row)
+    return rows
+
+@pytest.fixture(scope='module')
+def connections():
+    return synthetic_connections()
+
+def test_synthetic_log_has_ties_at_the_window_boundary(connections):
+    ts = np.array([c['ts'] for c in connections])
+    assert len(np.unique(ts)) < len(ts)
+    assert np.isin(ts - 2.0, ts).sum() > 50
+
+@pytest.mark.parametrize('host_window', [100, 7])
+def test_update_matches_brute_force(connections, host_window):
+    extractor = TrafficFeatureExtractor(time_window=2.0, host_window=host_window)
+    expected = brute_force(connections, 2.0, host_window)
+    for i, (features, reference) in enumerate(zip(extractor.extract(connections), expected)):
+        assert {col: features[col] for col in TIME_FEATURES + HOST_FEATURES} == reference, f"connection {i}"
+
+def test_extract_frame_matches_brute_force(connections):
+    frame = TrafficFeatureExtractor().extract_frame(connections)
+    expected = brute_force(connections, 2.0, 100)
+    for col in TIME_FEATURES + HOST_FEATURES:
+        # Exact at the loader's dtype (rates are float32 in NSLKDDLoader output)
+        assert frame[col].dtype == NUMERIC_DTYPES[col]
+        np.testing.assert_array_equal(frame[col].to_numpy(),
+                                      np.array([row[col] for row in expected], dtype=NUMERIC_DTYPES[col]),
+                                      err_msg=col)
+
+def test_out_of_order_connection_is_rejected(connections):
+    extractor = TrafficFeatureExtractor()
+    extractor.update(connections[10])
+    with pytest.raises(ValueError, match="time order"):
+        extractor.update(connections[0] | {'ts': connections[10]['ts'] - 0.25})
+
+def test_flood_counts_saturate_identically_in_both_paths():
+    # 40k SYNs to one host inside 0.4s: more than int16 holds within a single 2-second window
+    flood = [{'ts': i * 1e-5, 'src': '10.0.0.1', 'src_port': 1024 + i % 50000, 'dst': '192.168.1.1',
+              'dst_port': 80, 'protocol_type': 'tcp', 'service': 'http', 'flag': 'S0'} for i in range(40000)]
+    streamed = list(TrafficFeatureExtractor().extract(flood))
+    frame = TrafficFeatureExtractor().extract_frame(flood)
+    for col in TIME_FEATURES + HOST_FEATURES:
+        np.testing.assert_array_equal(frame[col].to_numpy(),
+                                      np.array([f[col] for f in streamed], dtype=NUMERIC_DTYPES[col]),
+                                      err_msg=col)
+    assert frame['count'].min() == 1 and frame['count'].max() == COUNT_CAP
+    assert streamed[-1]['count'] == streamed[-1]['srv_count'] == COUNT_CAP
+    assert streamed[-1]['serror_rate'] == streamed[-1]['same_srv_rate'] == 1.0
+    assert streamed[-1]['dst_host_count'] == 100